@@ -5,57 +5,95 @@ The MIT License (MIT)
 Copyright © 2025 Walkline Wang <walkline@gmail.com>
 """
 #region Imports
-# 标准库导入
+# 标准库导入，asyncio、sqlite3、json 等启动时用不到的模块由 lazy_import() 导入
 import os
+import io
 import sys
 import time
-import json
 import re
 import argparse
+import builtins
+import threading
+import contextlib
+import functools
+import itertools
+import struct
+import weakref
+import unicodedata
 from pathlib import Path
 import urllib.parse
 from datetime import datetime, timedelta
-from dataclasses import dataclass, field
+from dataclasses import dataclass, FrozenInstanceError
+from types import SimpleNamespace
+from collections.abc import Iterable, Sized
 import locale
 import gettext
 
-# 第三方库导入，其它第三方库由 lazy_import() 导入
-from lxml import etree as ET
-from rich_argparse import RawTextRichHelpFormatter
-from colorama import Fore, Style
+# 第三方库均由 lazy_import() 或在使用时导入
 
 import warnings
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 #endregion
 
 
-#region Setup Console
-sys.stdout.reconfigure(encoding='utf-8', errors='replace')
-sys.stderr.reconfigure(encoding='utf-8', errors='replace')
-#endregion
-
-
 __version__ = '0.0.9.3'
 __version_info__ = tuple(int(x) for x in __version__.split('.'))
 
 
-def set_language(lang: str = 'zh_CN'):
-	gettext.install('dvhelper')
+def setup_console():
+	"""将标准输出和标准错误的编码设置为 UTF-8"""
+	for stream in (sys.stdout, sys.stderr):
+		if hasattr(stream, 'reconfigure'):
+			stream.reconfigure(encoding='utf-8', errors='replace')
+
+def load_translation(lang: str):
+	"""
+	加载指定语言的翻译，找不到时使用英文翻译
+
+	Args:
+		lang: 语言代码，如 en_US
 
+	Returns:
+		翻译对象，默认语言或找不到翻译文件时返回None
+	"""
 	i18n_dir = Path(__file__).parent / 'i18n'
 	if not i18n_dir.exists():
 		return
 
 	if lang != 'zh_CN': # default language
-		try:
-			gettext.translation('dvhelper', localedir=str(i18n_dir), languages=[lang]).install()
-		except FileNotFoundError:
+		for languages in ([lang], ['en_US']):
 			try:
-				gettext.translation('dvhelper', localedir=str(i18n_dir), languages=['en_US']).install()
+				return gettext.translation('dvhelper', localedir=str(i18n_dir), languages=languages)
 			except FileNotFoundError:
-				pass
+				continue
+
+def set_language(lang: str = 'zh_CN'):
+	gettext.install('dvhelper')
+
+	translation = load_translation(lang)
+	if translation:
+		translation.install()
+
+def lazy_translation(message: str):
+	"""
+	第一次翻译文本时按系统语言安装 _()，导入模块时不再查找和加载翻译文件
+
+	set_language() 会用已加载的翻译替换 _()，之后的调用不再经过这里
+	"""
+	set_language(locale.getdefaultlocale()[0])
+	return _(message)
+
+def N_(message: str):
+	"""标记需要翻译的文本，实际翻译推迟到使用时由 _() 完成"""
+	return message
 
-set_language(locale.getdefaultlocale()[0])
+builtins._ = lazy_translation
+
+
+class lazy_pattern(functools.cached_property):
+	"""第一次读取时才编译的正则表达式，编译结果缓存在实例中"""
+	def __init__(self, pattern: str, flags: int=0):
+		super().__init__(lambda config: re.compile(pattern, flags))
 
 
 @dataclass
@@ -68,13 +106,20 @@ class Config:
 	#region File & Path names
 	fanart_image:        str = 'fanart.jpg'
 	poster_image:        str = 'poster.jpg'
+	thumbnail_image:     str = 'poster-{width}.jpg'
+	# 剧照和预告片全部下载完成后写入的标记文件，影片页面没有剧照时也会写入
+	gallery_marker:      str = '.gallery'
 	cookies_file:       Path = Path(__file__).parent / 'cookies.json'
 	actress_alias_file: Path = Path(__file__).parent / 'actress_alias.json'
-	completed_path:      str = _('#整理完成#')
+	cache_file:         Path = Path(__file__).parent / 'http_cache.db'
+	journal_file:       Path = Path(__file__).parent / 'journal.jsonl'
+	library_file:       Path = Path(__file__).parent / 'library.db'
+	catalog_file:       Path = Path(__file__).parent / 'catalog.db'
+	server_token_file:  Path = Path(__file__).parent / 'server.token'
+	completed_path:      str = N_('#整理完成#')
 	ignored_file_prefix: str = '##'
-	exclude_path: tuple[str] = (
-		completed_path,
-	)
+	# 默认包含completed_path及其各语言的翻译，创建实例时生成
+	exclude_path: tuple[str] = None
 	#endregion
 
 	#region Regex pattern
@@ -85,13 +130,37 @@ class Config:
 		r'Carib(beancom)?',
 		r'[^a-z\d](f?hd|lt)[^a-z\d]',
 	)
-	ignored_movie_pattern:  re.Pattern = re.compile('|'.join(ignored_keyword_pattern))
-	normal_movie_pattern:   re.Pattern = re.compile(r'([A-Z]{2,10})[-_](\d{2,5})', re.I)
-	normal_movie_pattern2:  re.Pattern = re.compile(r'([A-Z]{2,})(\d{2,5})', re.I)
-	fc2_movie_pattern:      re.Pattern = re.compile(r'FC2[^A-Z\d]{0,5}(PPV[^A-Z\d]{0,5})?(\d{5,7})', re.I)
-	_259luxu_movie_pattern: re.Pattern = re.compile(r'259LUXU-(\d+)', re.I)
-	_200gana_movie_pattern: re.Pattern = re.compile(r'200GANA-(\d+)', re.I)
-	_300mium_movie_pattern: re.Pattern = re.compile(r'300MIUM-(\d+)', re.I)
+	normal_movie_pattern   = lazy_pattern(r'([A-Z]{2,10})[-_](\d{2,5})', re.I)
+	normal_movie_pattern2  = lazy_pattern(r'([A-Z]{2,})(\d{2,5})', re.I)
+	fc2_movie_pattern      = lazy_pattern(r'FC2[^A-Z\d]{0,5}(PPV[^A-Z\d]{0,5})?(\d{5,7})', re.I)
+	_259luxu_movie_pattern = lazy_pattern(r'259LUXU-(\d+)', re.I)
+	_200gana_movie_pattern = lazy_pattern(r'200GANA-(\d+)', re.I)
+	_300mium_movie_pattern = lazy_pattern(r'300MIUM-(\d+)', re.I)
+	# 整理后的影片目录名 [影片编号](年份)
+	movie_dir_pattern      = lazy_pattern(r'\[(.+)\]\((\d*)\)')
+	# 旧版本生成的NFO文件中没有转义的 & 字符
+	bare_ampersand_pattern = lazy_pattern(rb'&(?!(?:[A-Za-z][\w.-]*|#\d+|#x[\dA-Fa-f]+);)')
+
+	@functools.cached_property
+	def ignored_movie_pattern(self) -> re.Pattern:
+		return re.compile('|'.join(self.ignored_keyword_pattern))
+
+	@functools.cached_property
+	def movie_id_rules(self) -> tuple[tuple[str, re.Pattern, str]]:
+		"""
+		影片ID识别规则 (触发关键词, 匹配规则, 影片ID格式)，按优先级排列
+
+		关键词中包含触发关键词时只使用对应的规则，格式中的 {n} 表示匹配规则的第 n 个分组，
+		触发关键词为None的通用规则在所有触发关键词都未出现时依次尝试
+		"""
+		return (
+			('FC2',     self.fc2_movie_pattern,      'FC2-{2}'),
+			('259LUXU', self._259luxu_movie_pattern, '259LUXU-{1}'),
+			('200GANA', self._200gana_movie_pattern, '200GANA-{1}'),
+			('300MIUM', self._300mium_movie_pattern, '300MIUM-{1}'),
+			(None,      self.normal_movie_pattern,   '{1}-{2}'),
+			(None,      self.normal_movie_pattern2,  '{1}-{2}'),
+		)
 	#endregion
 
 	# File extensions
@@ -102,21 +171,61 @@ class Config:
 		'.mpg',
 	)
 
+	# Network
+	http_pool_size:             int = 16
+	http_retries:               int = 2
+	http_retry_backoff:       float = 0.5
+	media_download_workers:     int = 8
+	media_connections_per_host: int = 4
+	async_connections_per_host: int = 8
+	rate_limit:               float = 2.0
+	rate_burst:                 int = 8
+	watch_poll_interval:      float = 10.0
+	watch_settle_time:        float = 5.0
+	cache_ttl:                  int = 7 * 24 * 60 * 60
+	cache_max_size:             int = 256 * 1024 * 1024
+
+	# Server
+	serve_host: str = '127.0.0.1'
+	serve_port: int = 8730
+
+	# Images
+	image_workers:          int = min(os.cpu_count() or 1, 4)
+	image_queue_size:       int = 16
+	thumbnail_widths: tuple[int] = ()
+
 	# CSS selectors
 	search_target_class: str = 'flex flex-col relative hover:bg-zinc-100 hover:dark:bg-zinc-800'
 	movie_target_class:  str = 'flex flex-col gap-2'
 
 	# Actress name map
-	actress_alias: dict[str, list[str]] = field(default_factory=dict)
+	actress_alias_index:          'ActressAliasIndex' = None
+	actress_alias_check_interval: float = 5.0
 
 	#region argparse help messages
-	description:   str = f'[b]DV Helper (version [i]{__version__}[/]) - ' + _('影片信息搜索工具\n\n  自动搜索影片信息，下载封面、剧照图片以及预告片，生成NFO文件，\n  并按演员分类整理影片，支持在线搜索影片信息和批量处理本地影片目录。')
-	keywords_help: str = _('搜索关键词（如影片编号）或本地影片目录路径\n可以使用逗号分隔多个关键词，或指定一个包含影片文件的目录进行批量处理')
-	depth_help:    str = _('目录搜索深度（默认: %(default)s，表示仅搜索当前目录）')
-	gallery_help:  str = _('下载影片剧照和预告片')
-	login_help:    str = _('忽略已保存的 Cookie 强制进行新的登录操作')
-	organize_help: str = _('整理并重命名指定目录下的影片文件夹')
-	epilog:        str = '''
+	description:       str = N_('影片信息搜索工具\n\n  自动搜索影片信息，下载封面、剧照图片以及预告片，生成NFO文件，\n  并按演员分类整理影片，支持在线搜索影片信息和批量处理本地影片目录。')
+	keywords_help:     str = N_('搜索关键词（如影片编号）或本地影片目录路径\n可以使用逗号分隔多个关键词，或指定一个包含影片文件的目录进行批量处理')
+	depth_help:        str = N_('目录搜索深度（默认: %(default)s，表示仅搜索当前目录）')
+	gallery_help:      str = N_('下载影片剧照和预告片')
+	login_help:        str = N_('忽略已保存的 Cookie 强制进行新的登录操作')
+	jobs_help:         str = N_('同时处理的影片数量（默认: %(default)s，表示逐部处理）')
+	no_cache_help:     str = N_('不使用本地页面缓存')
+	refresh_help:      str = N_('忽略缓存有效期，向服务器重新验证所有已缓存的页面')
+	resume_help:       str = N_('从上次中断的位置继续处理，跳过已完成的影片和步骤')
+	async_help:        str = N_('使用异步引擎执行网络请求（需要安装 aiohttp）')
+	rate_help:         str = N_('每秒允许向网站发出的请求数（默认：%(default)s，0 表示不限速，服务器要求时仍会暂停）')
+	changed_only_help: str = N_('只处理上次运行之后新增、发生变化或处理失败的影片文件')
+	refresh_meta_help: str = N_('忽略已整理影片目录中的 NFO 文件，重新获取影片信息')
+	watch_help:        str = N_('持续监视目录，新增的影片文件写入完成后立即处理')
+	serve_help:        str = N_('以常驻服务方式运行，保持登录会话、缓存和演员别名索引，接收 --submit 提交的任务')
+	submit_help:       str = N_('将关键词或目录提交给正在运行的常驻服务处理，并输出每部影片的处理结果')
+	port_help:         str = N_('常驻服务监听的本机端口（默认: %(default)s）')
+	thumbnails_help:   str = N_('生成指定宽度的海报缩略图，多个宽度使用逗号分隔，如 200,400')
+	query_help:        str = N_('在影片信息目录中查询影片，条件格式为 字段=值，字段可以是 number、actress、studio、tag 或 premiered，\n可以多次使用，查询同时符合全部条件的影片')
+	rebuild_help:      str = N_('从指定目录中已有的 NFO 文件补充影片信息目录')
+	export_help:       str = N_('将影片信息目录导出为 JSON Lines、CSV、Parquet 或 Arrow 文件，格式由扩展名确定，\n可以使用 --query 筛选导出的影片')
+	organize_help:     str = N_('整理并重命名指定目录下的影片文件夹')
+	epilog:            str = '''
 [argparse.groups]Examples:[/]
   [b]搜索影片编号[/]
     [argparse.prog]%(prog)s[/] [argparse.args]ABCDE-123[/]
@@ -143,6 +252,20 @@ class Config:
 '''
 	#endregion
 
+	def __post_init__(self):
+		# 整理完成的目录名按系统语言翻译，不随 --lang 改变
+		completed_path = self.completed_path
+		translation = load_translation(locale.getdefaultlocale()[0])
+		self.completed_path = translation.gettext(completed_path) if translation else completed_path
+
+		if self.exclude_path is None:
+			# 系统语言改变之前生成的中文或英文目录同样需要排除
+			translation = load_translation('en_US')
+			self.exclude_path = tuple(dict.fromkeys((
+				self.completed_path, completed_path,
+				translation.gettext(completed_path) if translation else completed_path
+			)))
+
 
 #region Base Classes
 class TqdmOut:
@@ -154,6 +277,8 @@ class TqdmOut:
 
 class HelpOnErrorParser(argparse.ArgumentParser):
 	def error(self, message):
+		from colorama import Fore, Style
+
 		sys.stderr.write(f'{Style.BRIGHT}{Fore.RED}' + _('错误: ') + message + f'{Style.RESET_ALL}\n\n')
 		self.print_help()
 		sys.exit(2)
@@ -162,7 +287,10 @@ class HelpOnErrorParser(argparse.ArgumentParser):
 class MovieInfo():
 	"""
 	影片信息数据类，统一管理影片相关信息
-	
+
+	字段保存在__slots__中，对象没有__dict__，也不保留创建时的源字典；
+	制作商、标签等在影片间重复较多的字符串在创建时驻留，相同的值只保存一份
+
 	Attributes:
 		detail_url : 影片详情页URL
 		fanart_url : 封面图片URL
@@ -181,24 +309,126 @@ class MovieInfo():
 		mpaa       : 分级
 		country    : 国家/地区
 	"""
+	__slots__ = (
+		'detail_url', 'fanart_url', 'trailer_url', 'galleries', 'number', 'title', 'year', 'runtime',
+		'tags', 'actresses', 'director', 'studio', 'publisher', 'premiered', 'mpaa', 'country',
+	)
+
+	detail_url:      str
+	fanart_url:      str
+	trailer_url:     str
+	galleries: list[str]
+	number:          str
+	title:           str
+	year:            str
+	runtime:         str
+	tags:      list[str]
+	actresses: list[str]
+	director:        str
+	studio:          str
+	publisher:       str
+	premiered:       str
+	mpaa:            str
+	country:         str
+
+	LIST_FIELDS     = frozenset(('galleries', 'tags', 'actresses'))
+	# 创建时驻留的字段，列表字段驻留其中的每个元素
+	INTERNED_FIELDS = frozenset(('year', 'runtime', 'tags', 'actresses', 'director', 'studio',
+								 'publisher', 'premiered', 'mpaa', 'country'))
+	# 列表字段的类型，列表字段不需要驻留时直接使用源字典中的列表对象
+	SEQUENCE_TYPE   = list
+
+	# (字段名, 是否驻留, 是否为列表字段)，避免创建每个对象时重复判断字段类型
+	__fields = tuple(zip(__slots__, map(INTERNED_FIELDS.__contains__, __slots__), map(LIST_FIELDS.__contains__, __slots__)))
+
 	def __init__(self, info: dict):
-		self.info = info
-		self.detail_url:      str = info.get('detail_url', '')
-		self.fanart_url:      str = info.get('fanart_url', '')
-		self.trailer_url:     str = info.get('trailer_url', '')
-		self.galleries: list[str] = info.get('galleries', [])
-		self.number:          str = info.get('number', '')
-		self.title:           str = info.get('title', '')
-		self.year:            str = info.get('year', '')
-		self.runtime:         str = info.get('runtime', '')
-		self.tags:      list[str] = info.get('tags', [])
-		self.actresses: list[str] = info.get('actresses', [])
-		self.director:        str = info.get('director', '')
-		self.studio:          str = info.get('studio', '')
-		self.publisher:       str = info.get('publisher', '')
-		self.premiered:       str = info.get('premiered', '')
-		self.mpaa:            str = info.get('mpaa', 'NC-17')
-		self.country:         str = info.get('country', _('日本'))
+		"""
+		Args:
+			info: 影片信息字典，缺少的字段使用默认值
+		"""
+		intern = sys.intern
+		sequence_type = self.SEQUENCE_TYPE
+
+		for name, interned, is_list in MovieInfo.__fields:
+			value = info.get(name)
+
+			if value is None:
+				value = sequence_type() if is_list else MovieInfo.__default(name)
+			elif is_list:
+				# 解析器可能返回str的子类，需要先转换为str才能驻留
+				if interned:
+					value = [intern(str(item)) for item in value]
+
+				if type(value) is not sequence_type:
+					value = sequence_type(value)
+			elif interned:
+				value = intern(str(value))
+
+			# 不可修改的子类禁止了属性赋值，初始化时直接写入槽位
+			object.__setattr__(self, name, value)
+
+	@staticmethod
+	def __default(name: str):
+		if name == 'mpaa':
+			return 'NC-17'
+		elif name == 'country':
+			return _('日本')
+
+		return ''
+
+	@classmethod
+	def from_dict(cls, info: dict):
+		"""
+		从影片信息字典创建对象
+
+		Args:
+			info: 影片信息字典
+
+		Returns:
+			cls的实例
+		"""
+		return cls(info)
+
+	def to_dict(self):
+		"""
+		转换为影片信息字典，列表字段返回新的列表
+
+		Returns:
+			可以传给from_dict还原对象的字典
+		"""
+		return {name: list(getattr(self, name)) if name in MovieInfo.LIST_FIELDS else getattr(self, name)
+				for name in MovieInfo.__slots__}
+
+	def __eq__(self, other):
+		if not isinstance(other, MovieInfo):
+			return NotImplemented
+
+		return all(getattr(self, name) == getattr(other, name) for name in MovieInfo.__slots__)
+
+	# 按字段比较的可变对象不能作为字典键或集合元素，需要时使用FrozenMovieInfo
+	__hash__ = None
+
+	def __reduce__(self):
+		return type(self), (self.to_dict(),)
+
+	def __repr__(self):
+		return f'{type(self).__name__}(number={self.number!r}, title={self.title!r})'
+
+
+class FrozenMovieInfo(MovieInfo):
+	"""不可修改的影片信息，列表字段保存为元组，可以作为字典的键或放入集合中去重"""
+	__slots__ = ()
+
+	SEQUENCE_TYPE = tuple
+
+	def __setattr__(self, name, value):
+		raise FrozenInstanceError(f'cannot assign to field {name!r}')
+
+	def __delattr__(self, name):
+		raise FrozenInstanceError(f'cannot delete field {name!r}')
+
+	def __hash__(self):
+		return hash(tuple(getattr(self, name) for name in MovieInfo.__slots__))
 
 
 class NFOGenerator():
@@ -259,322 +489,2798 @@ class NFOGenerator():
 		if movie_info.trailer_url:
 			ET.SubElement(self.root, 'trailer').text = movie_info.trailer_url
 
-	def save(self, output_path: Path):
+	def serialize(self, output: io.BufferedIOBase):
 		"""
-		将XML结构保存为格式化的NFO文件
+		将XML结构逐个元素序列化到二进制文件对象，文本和属性按XML规则转义
 
 		Args:
-			output_path: 输出文件路径
+			output: 以二进制模式打开的文件对象
 		"""
 		ET.indent(self.root, space='    ')
-		pretty_xml = ET.tostring(
-			self.root,
-			encoding='utf-8',
-			pretty_print=True,
-			xml_declaration=True,
-			standalone=True
-		).replace(b'&amp;', b'&')
 
-		with open(output_path, 'w', encoding='utf-8') as f:
-			f.write(pretty_xml.decode('utf-8'))
+		with ET.xmlfile(output, encoding='utf-8') as xf:
+			xf.write_declaration(standalone=True)
 
+			with xf.element(self.root.tag, self.root.attrib):
+				xf.write(self.root.text)
 
-class MovieParser():
-	"""影片信息解析器，从HTML内容提取影片相关信息"""
-	@staticmethod
-	def parse_search_results(html: str, keyword: str):
+				for element in self.root:
+					xf.write(element)
+
+		output.write(b'\n')
+
+	def save(self, output_path: Path):
 		"""
-		解析搜索结果页面，提取匹配的影片信息
+		将XML结构保存为格式化的NFO文件
+
+		先序列化到内存中的缓冲区，再与已有的NFO文件比较：内容相同时不写入，
+		避免修改时间变化触发媒体服务器重新扫描；否则先写入临时文件，再替换原文件
 
 		Args:
-			html: 搜索结果页面HTML内容
-			keyword: 搜索关键词
+			output_path: 输出文件路径
 
 		Returns:
-			包含影片URL、标题和封面图片URL的字典，未找到则返回None
+			写入了文件返回True，内容未变化返回False
 		"""
-		if not html:
-			return
+		output_path = Path(output_path)
+		buffer = io.BytesIO()
+		self.serialize(buffer)
+		content = buffer.getvalue()
 
-		parser = ET.HTMLParser()
-		tree = ET.fromstring(html, parser)
-		xpath = f'//div[contains(@class, "{config.search_target_class}")]'
-		elements = tree.xpath(xpath)
+		try:
+			with open(output_path, 'rb') as f:
+				if f.read() == content:
+					return False
+		except OSError:
+			pass
 
-		for element in elements:
-			a_tag = element.findall('./a')
+		temp_path = output_path.with_name(f'{output_path.name}.tmp')
 
-			if a_tag is None:
-				continue
+		with open(temp_path, 'wb') as f:
+			f.write(content)
 
-			href:    str = a_tag[0].get('href', '')
-			title:   str = a_tag[1].get('title', '').strip()
-			img_tag      = a_tag[0].find('./img')
-			img_src: str = img_tag.get('src', '') if img_tag is not None else ''
-
-			if keyword.lower() in title.lower():
-				return {
-					'detail_url': f'{config.base_url}{href}',
-					'title'     : title,
-					'fanart_url': img_src
-				}
-		return
+		os.replace(temp_path, output_path)
+		return True
 
+class NFOParser():
+	"""NFO文件解析器，从NFOGenerator生成的NFO文件中还原影片信息"""
 	@staticmethod
-	def parse_movie_details(html: str):
+	def parse(nfo_file: Path):
 		"""
-		解析影片详情页面，提取详细信息
+		解析NFO文件
 
 		Args:
-			html: 影片详情页HTML内容
+			nfo_file: NFO文件路径
 
 		Returns:
-			包含影片详细信息的字典，未找到则返回空字典
+			MovieInfo对象，文件不存在、无法解析或缺少影片编号时返回None
 		"""
-		results = {}
+		try:
+			content = config.bare_ampersand_pattern.sub(b'&amp;', Path(nfo_file).read_bytes())
+			root = ET.fromstring(content)
+		except (OSError, ET.XMLSyntaxError):
+			return None
 
-		if not html:
-			return results
+		number = root.findtext('uniqueid[@type="num"]')
 
-		parser = ET.HTMLParser()
-		tree = ET.fromstring(html, parser)
-		xpath = f'//ul[contains(@class, "{config.movie_target_class}")]'
-		ul_elements = tree.xpath(xpath)
+		if root.tag != 'movie' or not number:
+			return None
 
-		for ul_element in ul_elements:
-			li_elements = ul_element.findall('./li')
+		info = {'number': number}
 
-			li_contents = []
-			for li in li_elements:
-				male_elements = li.xpath('./a[@class="male"]')
-				for male_a in male_elements:
-					li.remove(male_a)
-				text_content = ''.join(li.xpath('.//text()')).strip()
-				li_contents.append(text_content)
+		for key in ('title', 'year', 'runtime', 'mpaa', 'country', 'director', 'studio', 'publisher', 'premiered'):
+			info[key] = root.findtext(key, '')
 
-			results = MovieParser.__extract_info_from_list(li_contents)
+		info.update({
+			'tags'       : [tag.text for tag in root.iterfind('tag') if tag.text],
+			'actresses'  : [name.text for name in root.iterfind('actress/name') if name.text],
+			'fanart_url' : root.findtext('fanart/thumb', ''),
+			'trailer_url': root.findtext('trailer', ''),
+		})
 
-		results['galleries'] = []
-		a_elements = tree.xpath('//a[@data-fancybox="gallery"]')
+		return MovieInfo(info)
 
-		for a_tag in a_elements:
-			href: str = a_tag.get('href', '')
-			data_caption: str = a_tag.get('data-caption', '').strip()
 
-			if data_caption == '预告片':
-				results['trailer_url'] = href
-			else:
-				results['galleries'].append(href)
+class ActressAliasIndex():
+	"""
+	演员别名反向索引，由actress_alias.json构建从别名到固定名字的映射
 
-		return results
+	别名和待查找的名字都会先做规范化处理（NFKC、繁简及日文新字形、大小写、空白），
+	写法略有差异的名字也能命中同一个键，查找时间与别名总数无关。与别名完全一致的
+	名字优先按原样匹配，规范化后相同的别名不会互相覆盖。
+	别名文件有变化时只更新改动过的条目，解析器和目录整理共用同一个索引
+	"""
+	# 每组为同一个字的旧字体、新字体和简体写法，统一为最后一个字。
+	# 在日文人名中作为独立汉字使用的写法不做合并（如 葉/叶、雲/云、萬/万、
+	# 長/长、門/门、豐/丰），人名中可以区分的异体字也不做合并（如 島/嶋、憐/怜）
+	VARIANT_CHARS = (
+		'亞亜亚', '戀恋', '櫻桜樱', '結结', '愛爱', '綺绮', '羅罗', '涼凉', '夢梦', '園园',
+		'麗丽', '繪絵绘', '織织', '寶宝', '實実实', '優优', '瀨瀬濑', '鈴铃', '澤沢泽', '廣広广',
+		'濱浜滨', '邊辺邉边', '齋斎斋', '龍竜龙', '鳥鸟', '島岛', '橋桥', '陽阳', '蘭兰', '蓮莲',
+		'恵惠', '榮栄荣', '條条', '與与', '紗纱', '華华', '風风', '絢绚', '紀纪', '純纯',
+		'綾绫', '詩诗', '譽誉', '雙双', '國国', '圓円圆', '輝辉', '間间', '東东', '體体',
+		'來来', '見见', '貴贵', '鄉郷乡', '黒黑', '綠緑绿', '戶戸户', '滿満满', '藍蓝', '豐豊',
+		'飛飞', '鳳凤', '燈灯', '陳陈', '張张', '劉刘', '楊杨', '黃黄', '趙赵', '吳呉吴',
+		'鄭郑', '關関关', '馬马', '顏顔颜', '聖圣', '學学', '氣気气', '靜静', '澁渋涩', '齊斉齐',
+		'壽寿', '彌弥', '鷹鹰', '鶴鹤', '櫛栉', '瑤瑶', '紅红', '緒绪', '線线', '嶺岭',
+		'蘇苏', '晝昼', '頭头', '須须',
+	)
+	VARIANT_TABLE = str.maketrans({char: group[-1] for group in VARIANT_CHARS for char in group[:-1]})
 
-	@staticmethod
-	def __extract_info_from_list(content_list: list[str]):
+	def __init__(self, alias_file: Path=None, aliases: dict[str, list[str]]=None, check_interval: float=5.0):
 		"""
-		从列表内容提取影片信息
-
 		Args:
-			content_list: 包含影片信息的字符串列表
-
-		Returns:
-			提取的影片信息字典
+			alias_file: 别名文件路径，默认为None
+			aliases: 直接提供的 {固定名字: [别名, ...]} 映射，默认为None
+			check_interval: 检查别名文件是否变化的最小间隔（秒），默认5秒
 		"""
-		result = {}
+		self.alias_file = alias_file
+		self.aliases: dict[str, list[str]] = {}
+		self.__index: dict[str, str] = {}
+		self.__exact: dict[str, str] = {}
+		self.__keys: dict[str, set[str]] = {}
+		self.__lock = threading.Lock()
+		self.__signature = None
+		self.__checked_at = 0.0
+		self.__check_interval = check_interval
 
-		for item in content_list:
-			if item.startswith('番号:'):
-				result['number'] = item.replace('番号:', '').replace('复制', '').strip()
-			elif item.startswith('发行日期:'):
-				result['premiered'] = item.replace('发行日期:', '').strip()
-				if len(result['premiered']) >= 4:
-					result['year'] = result['premiered'][:4]
-			elif item.startswith('片长:'):
-				result['runtime'] = item.replace('片长:', '').replace(' 分钟', '').strip()
-			elif item.startswith('导演:'):
-				result['director'] = item.replace('导演:', '').strip()
-			elif item.startswith('制作商:'):
-				result['studio'] = item.replace('制作商:', '').strip()
-			elif item.startswith('发行商:'):
-				result['publisher'] = item.replace('发行商:', '').strip()
-			elif item.startswith('标签:'):
-				result['tags'] = [tag.strip() for tag in item.replace('标签:', '').replace('--', '').split(',') if tag.strip()]
-			elif item.startswith('演员:'):
-				result['actresses'] = [actress.strip() for actress in item.replace('演员:', '').replace('--', '').split(',') if actress.strip()]
+		if aliases:
+			self.update(aliases)
 
-				if len(config.actress_alias):
-					result['actresses'] = [MovieParser.__resolve_actress_alias(actress) for actress in result['actresses']]
+		if alias_file:
+			self.refresh(force=True)
 
-		return result
+	def __len__(self):
+		return len(self.aliases)
 
-	@staticmethod
-	# https://github.com/Yuukiy/JavSP/blob/master/javsp/__main__.py#L53
-	def __resolve_actress_alias(name: str):
-		"""将别名解析为固定的名字"""
-		for fixed_name, aliases in config.actress_alias.items():
-			if name in aliases:
-				return fixed_name
+	@classmethod
+	def normalize(cls, name: str):
+		"""
+		规范化演员名字，作为索引的键
 
-		return name
+		Args:
+			name: 演员名字或别名
 
+		Returns:
+			规范化后的名字
+		"""
+		# NFKC 同时处理全角/半角字母数字和半角片假名
+		name = unicodedata.normalize('NFKC', name).translate(cls.VARIANT_TABLE).casefold()
+		return ''.join(name.split())
 
-class MovieScraper():
-	"""影片信息抓取器，实现登录管理、数据和图片的抓取流程"""
-	REQUESTS_HEADERS = {
-		'Accept-Language': 'zh-CN,zh;q=0.9',
-		'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-	}
+	def update(self, aliases: dict[str, list[str]]):
+		"""
+		用新的别名映射更新索引，只处理新增、删除或别名有变化的固定名字
 
-	def __init__(self):
-		self.__session = None
+		Args:
+			aliases: {固定名字: [别名, ...]} 映射
 
-	def initialize_session(self):
-		self.__session = self.check_cookies()
+		Returns:
+			发生变化的固定名字数量
+		"""
+		with self.__lock:
+			changed = [name for name in self.aliases.keys() - aliases.keys()]
+			changed += [name for name, names in aliases.items() if self.aliases.get(name) != names]
+			orphaned_keys = set()
+			orphaned_names = set()
+
+			for fixed_name in changed:
+				for key in self.__keys.pop(fixed_name, ()):
+					if self.__index.get(key) == fixed_name:
+						del self.__index[key]
+						orphaned_keys.add(key)
+
+				for alias in (fixed_name, *self.aliases.get(fixed_name, ())):
+					if self.__exact.get(alias) == fixed_name:
+						del self.__exact[alias]
+						orphaned_names.add(alias)
+
+			for fixed_name in changed:
+				if fixed_name not in aliases:
+					continue
 
-		if not self.__session:
-			logger.warning(_('未找到有效Cookies，将使用匿名会话，或使用 -l 参数重新登录'))
+				names = (fixed_name, *aliases[fixed_name])
+				keys = {self.normalize(alias) for alias in names}
+				self.__keys[fixed_name] = keys
 
-	def check_cookies(self):
-		"""
-		检查并加载Cookie，验证有效性
+				for alias in names:
+					self.__exact.setdefault(alias, fixed_name)
 
-		Returns:
-			有效的requests会话对象，Cookies过期或不存在则返回None
-		"""
-		if not config.cookies_file.exists():
-			return
+				for key in keys:
+					owner = self.__index.setdefault(key, fixed_name)
 
-		session = requests.Session()
+					if owner != fixed_name:
+						logger.warning(_('演员 {name} 和 {owner} 的别名规范化后都是 {key}，只有写法完全一致时才会匹配到 {name}')
+							.format(name=fixed_name, owner=owner, key=key))
 
-		try:
-			with open(config.cookies_file, 'r', encoding='utf-8') as f:
-				cookies: list[dict] = json.load(f)
+			# 被删除条目占用的键如果仍属于其它固定名字，交还给它们
+			for key in orphaned_keys - self.__index.keys():
+				owner = next((name for name, keys in self.__keys.items() if key in keys), None)
 
-			for cookie in cookies:
-				if 'expiry' in cookie and cookie['name'] == 'remember_token':
-					expiry_time = datetime.fromtimestamp(cookie['expiry'])
+				if owner:
+					self.__index[key] = owner
 
-					if expiry_time < datetime.now() - timedelta(seconds=60):
-						logger.warning(_('当前 Cookie 已过期'))
+			for alias in orphaned_names - self.__exact.keys():
+				owner = next((name for name, names in aliases.items() if alias == name or alias in names), None)
 
-						return
+				if owner:
+					self.__exact[alias] = owner
 
-				session.cookies.set(
-					cookie['name'],
-					cookie['value'],
-					domain=cookie.get('domain'),
-					path=cookie.get('path', '/'),
-					secure=cookie.get('secure', False)
-				)
+			self.aliases = dict(aliases)
 
-			return session
-		except Exception as e:
-			logger.error(_('Cookies 文件处理失败: ') + str(e))
-			return
+			return len(changed)
 
-	def perform_login(self):
+	def refresh(self, force: bool=False):
 		"""
-		通过浏览器模拟登录，获取Cookie
+		检查别名文件，有变化时增量更新索引
+
+		Args:
+			force: 是否忽略检查间隔立即检查，默认为False
 
 		Returns:
-			登录后的requests会话对象，登录失败则返回None
+			索引发生更新返回True，否则返回False
 		"""
-		from selenium import webdriver
-		from selenium.webdriver.support.ui import WebDriverWait
-		from selenium.webdriver.support import expected_conditions as EC
-		from selenium.webdriver.chrome.options import Options
-		from webdriver_manager.chrome import ChromeDriverManager
-		from selenium.webdriver.chrome.service import Service
+		if self.alias_file is None:
+			return False
 
-		# 配置Chrome选项
-		chrome_options = Options()
-		chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
+		now = time.monotonic()
 
-		# 使用webdriver-manager自动管理ChromeDriver
-		driver = None
-		try:
-			service = Service(ChromeDriverManager().install())
-			driver = webdriver.Chrome(service=service, options=chrome_options)
-		except:
-			driver = webdriver.Chrome(options=chrome_options)
+		if not force and now - self.__checked_at < self.__check_interval:
+			return False
+
+		self.__checked_at = now
 
 		try:
-			logger.info(_('正在启动 Chrome 浏览器...'))
+			stat = self.alias_file.stat()
+			signature = (stat.st_mtime_ns, stat.st_size)
+		except OSError:
+			signature = None
 
-			print(_('在弹出的网页中完成登录操作，等待浏览器自动关闭！\n')*3)
-			driver.get(config.sign_in_url)
+		if signature == self.__signature:
+			return False
 
-			# 等待用户完成登录并重定向
-			WebDriverWait(driver, 3 * 60).until(
-				EC.url_to_be(f'{config.base_url}/')
-			)
+		aliases = {}
 
-			# 获取并保存Cookie
-			cookies = driver.get_cookies()
-			with open(config.cookies_file, 'w', encoding='utf-8') as f:
-				json.dump(cookies, f, ensure_ascii=False, indent=2)
+		if signature:
+			try:
+				with open(self.alias_file, 'r', encoding='utf-8') as file:
+					aliases = json.load(file)
+			except (OSError, json.JSONDecodeError) as e:
+				# 文件可能正在被编辑，保留现有索引，下次检查时重试
+				logger.warning(_('读取演员别名文件失败: ') + str(e))
+				return False
 
-			logger.info(_('已保存 {count} 个 Cookie 到 {file}')
-				.format(count=len(cookies), file=config.cookies_file))
+		self.__signature = signature
 
-			# 创建会话并加载Cookie
-			session = requests.Session()
+		return self.update(aliases) > 0
 
-			for cookie in cookies:
-				session.cookies.set(
-					cookie['name'],
-					cookie['value'],
-					domain=cookie.get('domain'),
-					path=cookie.get('path', '/'),
-					secure=cookie.get('secure', False)
-				)
-		except Exception:
-			session = None
-			logger.error(_('用户登录失败'))
-		finally:
-			time.sleep(2)
-			driver.quit()
+	def get(self, name: str):
+		"""
+		查找别名对应的固定名字
 
-		return session
+		Args:
+			name: 演员名字或别名
 
-	def fetch_data(self, url: str, max_retries: int=3, initial_timeout: int=30, backoff_factor: int=2):
+		Returns:
+			固定名字，未收录则返回None
 		"""
-		获取指定网站的文本内容，支持重试操作
+		self.refresh()
+		key = self.normalize(name)
+
+		with self.__lock:
+			return self.__exact.get(name) or self.__index.get(key)
+
+	def resolve(self, name: str):
+		"""
+		将别名解析为固定名字
 
 		Args:
-			url: 目标网址
-			max_retries: 最大重试次数，默认3次
-			initial_timeout: 初始超时时间（秒），默认30秒
-			backoff_factor: 退避因子，默认2
+			name: 演员名字或别名
 
 		Returns:
-			响应内容文本，所有重试失败则返回None
+			固定名字，未收录则返回原名字
 		"""
-		for retry in range(1, max_retries + 1):
-			current_timeout = initial_timeout * (backoff_factor ** (retry - 1))
+		return self.get(name) or name
 
-			if retry > 1:
-				print(_('第 {retry}/{retries} 次尝试（超时时间: {timeout} 秒）')
-					.format(retry=retry, retries=max_retries, timeout=current_timeout))
+
+class MovieParser():
+	"""影片信息解析器，从HTML内容提取影片相关信息"""
+	SEARCH_CARD_XPATH = '//div[contains(@class, $target_class)]'
+	INFO_LIST_XPATH   = '//ul[contains(@class, $target_class)]'
+	GALLERY_XPATH     = '//a[@data-fancybox="gallery"]'
+	MALE_ACTOR_XPATH  = './a[@class="male"]'
+	TEXT_XPATH        = './/text()'
+	STREAM_CHUNK_SIZE = 16 * 1024
+
+	@staticmethod
+	@functools.cache
+	def xpath(expression: str):
+		"""编译并缓存 XPath 表达式，lxml 在第一次解析页面之前已由 lazy_import() 导入"""
+		return ET.XPath(expression)
+
+	@staticmethod
+	def parse_search_results(html, keyword: str, stream: bool=True):
+		"""
+		解析搜索结果页面，提取匹配的影片信息
+
+		标题中包含完整影片ID的结果会立即返回，不再解析页面的剩余部分；
+		没有完整匹配时返回第一个标题包含关键词的结果
+
+		Args:
+			html: 搜索结果页面内容，可以是文本、字节内容或按顺序产生字节块的可迭代对象
+			keyword: 搜索关键词
+			stream: 是否使用增量解析，默认True
+
+		Returns:
+			包含影片URL、标题和封面图片URL的字典，未找到则返回None
+		"""
+		if not html:
+			return
+
+		exact_pattern, partial_pattern = MovieParser.__keyword_patterns(keyword)
+		fallback = None
+
+		for title, card in MovieParser.__iter_search_cards(html, stream):
+			if not partial_pattern.search(title):
+				continue
+
+			if exact_pattern.search(title):
+				return MovieParser.__read_search_card(card, title)
+
+			if fallback is None:
+				fallback = MovieParser.__read_search_card(card, title)
+
+		return fallback
+
+	@staticmethod
+	def __keyword_patterns(keyword: str):
+		"""生成匹配完整影片ID和匹配子串的正则表达式，都忽略大小写"""
+		keyword = re.escape(keyword.strip())
+		return re.compile(rf'(?<![A-Z\d]){keyword}(?![A-Z\d])', re.I), re.compile(keyword, re.I)
+
+	@staticmethod
+	def __iter_search_cards(html, stream: bool):
+		"""
+		依次产生搜索结果页面中有详情页链接的影片卡片，调用方停止迭代后不再解析剩余内容
+
+		增量解析时卡片元素在下一次迭代时释放，需要的内容应在此之前读取
+
+		Returns:
+			(标题, 卡片元素) 的生成器
+		"""
+		target_class = config.search_target_class
+
+		if not stream:
+			parser = ET.HTMLParser(encoding='utf-8' if isinstance(html, bytes) else None)
+			tree = ET.fromstring(html, parser)
+
+			for card in MovieParser.xpath(MovieParser.SEARCH_CARD_XPATH)(tree, target_class=target_class):
+				title = MovieParser.__read_card_title(card)
+				if title is not None:
+					yield title, card
+			return
+
+		card = None
+
+		# 影片卡片之外的内容不需要读取，只处理 div 标签的事件
+		for event, element in MovieParser.__iter_parse_events(html, 'div'):
+			if event == 'start':
+				if card is None and target_class in element.get('class', ''):
+					card = element
+				continue
+
+			if element is card:
+				card = None
+				title = MovieParser.__read_card_title(element)
+
+				if title is not None:
+					yield title, element
+			elif card is not None:
+				continue
+
+			MovieParser.__release(element)
+
+	@staticmethod
+	def __read_card_title(card):
+		"""读取影片卡片的标题，卡片中没有详情页链接时返回None"""
+		title = None
+
+		for a_tag in card.iter('a'):
+			if title is None and a_tag.get('href') is not None:
+				title = ''
+
+			if title is not None and a_tag.get('title') is not None:
+				return a_tag.get('title').strip()
+
+		return title
+
+	@staticmethod
+	def __read_search_card(card, title: str):
+		"""读取影片卡片中的详情页链接和封面图片"""
+		href = next(a_tag.get('href') for a_tag in card.iter('a') if a_tag.get('href') is not None)
+		img_tag = next(card.iter('img'), None)
+
+		return {
+			'detail_url': f'{config.base_url}{href}',
+			'title'     : title,
+			'fanart_url': img_tag.get('src', '') if img_tag is not None else ''
+		}
+
+	@staticmethod
+	def __iter_parse_events(html, tag: str=None):
+		"""
+		增量解析HTML，依次产生 (事件, 元素)，调用方停止迭代后不再读取剩余内容
+
+		Args:
+			html: 文本、字节内容或按顺序产生字节块的可迭代对象
+			tag: 只产生指定标签的事件，默认产生所有标签的事件
+		"""
+		if isinstance(html, str):
+			html = html.encode('utf-8')
+
+		chunks = html
+
+		if isinstance(html, bytes):
+			chunk_size = MovieParser.STREAM_CHUNK_SIZE
+			chunks = (html[i:i + chunk_size] for i in range(0, len(html), chunk_size))
+
+		parser = ET.HTMLPullParser(events=('start', 'end'), tag=tag, encoding='utf-8')
+
+		for chunk in chunks:
+			parser.feed(chunk)
+			yield from parser.read_events()
+
+		parser.close()
+		yield from parser.read_events()
+
+	@staticmethod
+	def __release(element):
+		"""释放已经处理完的元素及其之前的兄弟元素"""
+		element.clear(keep_tail=True)
+
+		while element.getprevious() is not None:
+			del element.getparent()[0]
+
+	@staticmethod
+	def parse_movie_details(html, stream: bool=True):
+		"""
+		解析影片详情页面，提取详细信息
+
+		Args:
+			html: 影片详情页内容，可以是文本、字节内容或按顺序产生字节块的可迭代对象
+			stream: 是否使用增量解析，读取到信息列表和全部剧照链接后立即停止，默认True
+
+		Returns:
+			包含影片详细信息的字典，未找到则返回空字典
+		"""
+		results = {}
+
+		if not html:
+			return results
+
+		if stream:
+			info_lists, gallery_links = MovieParser.__scan_details_stream(html)
+		else:
+			info_lists, gallery_links = MovieParser.__scan_details_tree(html)
+
+		if info_lists:
+			results = MovieParser.__extract_info_from_list(info_lists[-1])
+
+		results['galleries'] = []
+
+		for href, data_caption in gallery_links:
+			if data_caption == '预告片':
+				results['trailer_url'] = href
+			else:
+				results['galleries'].append(href)
+
+		return results
+
+	@staticmethod
+	def __read_info_list(ul_element):
+		"""读取信息列表中每一项的文本，忽略男演员链接"""
+		li_contents = []
+
+		for li in ul_element.findall('./li'):
+			for male_a in MovieParser.xpath(MovieParser.MALE_ACTOR_XPATH)(li):
+				li.remove(male_a)
+
+			li_contents.append(''.join(MovieParser.xpath(MovieParser.TEXT_XPATH)(li)).strip())
+
+		return li_contents
+
+	@staticmethod
+	def __read_gallery_link(a_tag):
+		return a_tag.get('href', ''), a_tag.get('data-caption', '').strip()
+
+	@staticmethod
+	def __scan_details_tree(html):
+		"""
+		构建完整的文档树后提取信息列表和剧照链接
+
+		Returns:
+			(信息列表内容的列表, (链接, 标题) 组成的剧照链接列表)
+		"""
+		parser = ET.HTMLParser(encoding='utf-8' if isinstance(html, bytes) else None)
+		tree = ET.fromstring(html, parser)
+
+		info_lists = [MovieParser.__read_info_list(ul) for ul in MovieParser.xpath(MovieParser.INFO_LIST_XPATH)(tree, target_class=config.movie_target_class)]
+		gallery_links = [MovieParser.__read_gallery_link(a_tag) for a_tag in MovieParser.xpath(MovieParser.GALLERY_XPATH)(tree)]
+
+		return info_lists, gallery_links
+
+	@staticmethod
+	def __scan_details_stream(html):
+		"""
+		增量解析详情页，已处理的元素会立即释放
+
+		剧照和预告片可能位于不同的容器中，读取到信息列表后，只有同时包含信息列表
+		和已找到的全部剧照、预告片链接的元素结束时才停止解析，页面剩余部分不再读取
+
+		Returns:
+			(信息列表内容的列表, (链接, 标题) 组成的剧照链接列表)
+		"""
+		target_class = config.movie_target_class
+		info_lists, gallery_links = [], []
+		info_list = container = None
+		# 信息列表和每个剧照链接的祖先元素，由近到远排列
+		info_ancestors, link_ancestors = [], []
+
+		for event, element in MovieParser.__iter_parse_events(html):
+			if event == 'start':
+				if info_list is None and element.tag == 'ul' and target_class in element.get('class', ''):
+					info_list = element
+					info_ancestors = list(element.iterancestors())
+				continue
+
+			if element is info_list:
+				info_lists.append(MovieParser.__read_info_list(element))
+				info_list = None
+				container = MovieParser.__common_container(info_ancestors, link_ancestors)
+			elif info_list is not None:
+				# 信息列表的内容在列表结束时统一读取
+				continue
+			elif element.tag == 'a' and element.get('data-fancybox') == 'gallery':
+				gallery_links.append(MovieParser.__read_gallery_link(element))
+				link_ancestors.append(set(element.iterancestors()))
+
+				if info_lists:
+					container = MovieParser.__common_container(info_ancestors, link_ancestors)
+			elif element is container:
+				break
+
+			MovieParser.__release(element)
+
+		return info_lists, gallery_links
+
+	@staticmethod
+	def __common_container(info_ancestors: list, link_ancestors: list[set]):
+		"""
+		查找同时包含信息列表和全部剧照链接的最近的元素
+
+		Args:
+			info_ancestors: 信息列表的祖先元素，由近到远排列
+			link_ancestors: 每个剧照链接的祖先元素集合
+
+		Returns:
+			找到的元素，没有剧照链接时返回None
+		"""
+		if not link_ancestors:
+			return None
+
+		return next((ancestor for ancestor in info_ancestors if all(ancestor in ancestors for ancestors in link_ancestors)), None)
+
+	@staticmethod
+	def __extract_info_from_list(content_list: list[str]):
+		"""
+		从列表内容提取影片信息
+
+		Args:
+			content_list: 包含影片信息的字符串列表
+
+		Returns:
+			提取的影片信息字典
+		"""
+		result = {}
+
+		for item in content_list:
+			if item.startswith('番号:'):
+				result['number'] = item.replace('番号:', '').replace('复制', '').strip()
+			elif item.startswith('发行日期:'):
+				result['premiered'] = item.replace('发行日期:', '').strip()
+				if len(result['premiered']) >= 4:
+					result['year'] = result['premiered'][:4]
+			elif item.startswith('片长:'):
+				result['runtime'] = item.replace('片长:', '').replace(' 分钟', '').strip()
+			elif item.startswith('导演:'):
+				result['director'] = item.replace('导演:', '').strip()
+			elif item.startswith('制作商:'):
+				result['studio'] = item.replace('制作商:', '').strip()
+			elif item.startswith('发行商:'):
+				result['publisher'] = item.replace('发行商:', '').strip()
+			elif item.startswith('标签:'):
+				result['tags'] = [tag.strip() for tag in item.replace('标签:', '').replace('--', '').split(',') if tag.strip()]
+			elif item.startswith('演员:'):
+				result['actresses'] = [actress.strip() for actress in item.replace('演员:', '').replace('--', '').split(',') if actress.strip()]
+
+				if config.actress_alias_index:
+					result['actresses'] = [config.actress_alias_index.resolve(actress) for actress in result['actresses']]
+
+		return result
+
+
+class MovieIdExtractor():
+	"""
+	影片ID提取器，由Config.movie_id_rules驱动
+
+	规则按优先级排列：关键词中出现某条规则的触发关键词时只使用这条规则，
+	都没有出现时依次尝试不带触发关键词的通用规则。增加新的识别规则只需要
+	在Config.movie_id_rules中增加一行，不再需要修改提取逻辑
+	"""
+	def __init__(self, rules: tuple[tuple[str, re.Pattern, str]], ignored_pattern: re.Pattern=None):
+		"""
+		Args:
+			rules: 按优先级排列的 (触发关键词, 匹配规则, 影片ID格式) 列表
+			ignored_pattern: 提取前需要从关键词中删除的内容，默认为None
+		"""
+		self.__ignored_pattern = ignored_pattern
+		self.__triggered_rules = [(trigger.upper(), pattern, id_format) for trigger, pattern, id_format in rules if trigger]
+		self.__generic_rules = [(pattern, id_format) for trigger, pattern, id_format in rules if not trigger]
+
+	def extract(self, keyword: str):
+		"""
+		从关键词中提取影片ID
+
+		Args:
+			keyword: 影片名称或关键词
+
+		Returns:
+			提取的影片ID，否则返回None
+		"""
+		if self.__ignored_pattern:
+			keyword = self.__ignored_pattern.sub('', keyword)
+
+		keyword = keyword.upper()
+
+		# 触发关键词是普通字符串，子串查找比正则匹配快得多，可以先排除大多数规则
+		for trigger, pattern, id_format in self.__triggered_rules:
+			if trigger in keyword:
+				match = pattern.search(keyword)
+				return id_format.format(match.group(0), *match.groups()) if match else None
+
+		for pattern, id_format in self.__generic_rules:
+			match = pattern.search(keyword)
+
+			if match:
+				return id_format.format(match.group(0), *match.groups())
+
+	def extract_batch(self, keywords: list):
+		"""
+		批量提取影片ID
+
+		Args:
+			keywords: 关键词列表，或list_video_files返回的视频文件路径列表（使用文件名提取）
+
+		Returns:
+			与输入顺序一致的影片ID列表，无法提取的位置为None
+		"""
+		return [self.extract(keyword.name if isinstance(keyword, Path) else keyword) for keyword in keywords]
+
+
+class ResponseCache():
+	"""
+	页面响应缓存，按 URL 将搜索页和详情页内容保存到本地 SQLite 文件
+
+	超过有效期的缓存条目需要通过 ETag/Last-Modified 向服务器重新验证，
+	缓存总大小超过上限时按最近最少使用的顺序淘汰
+	"""
+	def __init__(self, cache_file: Path, ttl: int, max_size: int, refresh: bool=False):
+		"""
+		Args:
+			cache_file: 缓存文件路径
+			ttl: 缓存有效期（秒）
+			max_size: 缓存总大小上限（字节）
+			refresh: 是否忽略有效期，强制向服务器重新验证所有缓存条目
+		"""
+		self.ttl = ttl
+		self.max_size = max_size
+		self.refresh = refresh
+		self.hits = 0
+		self.misses = 0
+		self.revalidated = 0
+
+		self.__lock = threading.Lock()
+		self.__conn = sqlite3.connect(str(cache_file), check_same_thread=False)
+		self.__conn.execute('''
+			CREATE TABLE IF NOT EXISTS responses (
+				url           TEXT PRIMARY KEY,
+				content       BLOB NOT NULL,
+				etag          TEXT,
+				last_modified TEXT,
+				stored_at     REAL NOT NULL,
+				accessed_at   REAL NOT NULL,
+				size          INTEGER NOT NULL
+			)
+		''')
+		self.__conn.execute('CREATE INDEX IF NOT EXISTS idx_accessed_at ON responses (accessed_at)')
+		self.__conn.commit()
+
+	def get(self, url: str):
+		"""
+		查询缓存条目
+
+		Args:
+			url: 目标网址
+
+		Returns:
+			包含content、etag、last_modified和fresh（是否在有效期内）的字典，未缓存则返回None
+		"""
+		with self.__lock:
+			row = self.__conn.execute(
+				'SELECT content, etag, last_modified, stored_at FROM responses WHERE url = ?', (url,)
+			).fetchone()
+
+			if row is None:
+				return
+
+			now = time.time()
+			self.__conn.execute('UPDATE responses SET accessed_at = ? WHERE url = ?', (now, url))
+			self.__conn.commit()
+
+		content, etag, last_modified, stored_at = row
+
+		return {
+			'content'      : content,
+			'etag'         : etag,
+			'last_modified': last_modified,
+			'fresh'        : not self.refresh and now - stored_at < self.ttl,
+		}
+
+	def put(self, url: str, content: bytes, etag: str=None, last_modified: str=None):
+		"""
+		保存或更新缓存条目，并在超出大小上限时淘汰最久未使用的条目
+
+		Args:
+			url: 目标网址
+			content: 响应内容
+			etag: 响应的ETag头
+			last_modified: 响应的Last-Modified头
+		"""
+		now = time.time()
+
+		with self.__lock:
+			self.__conn.execute(
+				'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+				(url, content, etag, last_modified, now, now, len(content))
+			)
+			self.__evict()
+			self.__conn.commit()
+
+	def touch(self, url: str):
+		"""
+		服务器确认缓存内容未变化（304）后，重新开始计算有效期
+
+		Args:
+			url: 目标网址
+		"""
+		now = time.time()
+
+		with self.__lock:
+			self.__conn.execute('UPDATE responses SET stored_at = ?, accessed_at = ? WHERE url = ?', (now, now, url))
+			self.__conn.commit()
+
+	def hit(self, url: str, entry: dict, revalidated: bool=False, raw: bool=False):
+		"""
+		使用缓存内容响应请求并更新命中统计
+
+		Args:
+			url: 目标网址
+			entry: get()返回的缓存条目
+			revalidated: 是否为服务器返回 304 后的命中
+			raw: 是否直接返回字节内容，默认False
+
+		Returns:
+			缓存的响应内容文本，raw为True时返回字节内容
+		"""
+		if revalidated:
+			self.touch(url)
+
+		with self.__lock:
+			self.hits += 1
+			self.revalidated += int(revalidated)
+
+		if raw:
+			return entry['content']
+
+		return entry['content'].decode('utf-8', errors='replace')
+
+	def store(self, url: str, content: bytes, headers: dict):
+		"""
+		保存从服务器获取的响应内容并更新未命中统计
+
+		Args:
+			url: 目标网址
+			content: 响应内容
+			headers: 响应头
+		"""
+		with self.__lock:
+			self.misses += 1
+
+		self.put(url, content, headers.get('ETag'), headers.get('Last-Modified'))
+
+	def discard(self, url: str):
+		"""
+		删除缓存条目，用于不应保留的响应（如没有解析出结果的页面）
+
+		Args:
+			url: 目标网址
+		"""
+		with self.__lock:
+			self.__conn.execute('DELETE FROM responses WHERE url = ?', (url,))
+			self.__conn.commit()
+
+	@staticmethod
+	def validators(entry: dict):
+		"""
+		生成用于重新验证缓存条目的条件请求头
+
+		Args:
+			entry: get()返回的缓存条目
+
+		Returns:
+			包含If-None-Match/If-Modified-Since的请求头字典
+		"""
+		headers = {}
+
+		if entry['etag']:
+			headers['If-None-Match'] = entry['etag']
+		if entry['last_modified']:
+			headers['If-Modified-Since'] = entry['last_modified']
+
+		return headers
+
+	def __evict(self):
+		"""按最近最少使用的顺序删除缓存条目，直到总大小不超过上限"""
+		total_size = self.__conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+		if total_size <= self.max_size:
+			return
+
+		rows = self.__conn.execute('SELECT url, size FROM responses ORDER BY accessed_at').fetchall()
+		for url, size in rows:
+			if total_size <= self.max_size:
+				break
+
+			self.__conn.execute('DELETE FROM responses WHERE url = ?', (url,))
+			total_size -= size
+
+	def close(self):
+		with self.__lock:
+			self.__conn.close()
+
+
+class ResumeJournal():
+	"""
+	断点续传日志，以追加方式记录每部影片已完成的处理步骤
+
+	每条记录为单独一行 JSON，写入后立即刷新到磁盘，程序中断时最多
+	留下一行不完整的记录，重放时会被忽略。查询只针对启动时重放的记录，
+	本次运行新增的记录仅写入文件；未指定日志文件时不做任何记录
+	"""
+	def __init__(self, journal_file: Path=None, resume: bool=False):
+		"""
+		Args:
+			journal_file: 日志文件路径，默认为None
+			resume: 是否重放已有的日志记录，否则清空日志重新开始
+		"""
+		self.__lock = threading.Lock()
+		self.__records: dict[str, dict] = {}
+		self.__file = None
+
+		if journal_file is None:
+			return
+
+		if resume and journal_file.exists():
+			self.__replay(journal_file)
+		elif journal_file.exists() and journal_file.stat().st_size:
+			logger.warning(_('未指定 --resume 参数，将清空已有的断点续传日志: {file}').format(file=journal_file))
+
+		self.__file = open(journal_file, 'a' if resume else 'w', encoding='utf-8')
+
+	def __replay(self, journal_file: Path):
+		"""读取日志文件，恢复已完成的处理步骤，并截掉末尾不完整的记录"""
+		with open(journal_file, 'rb+') as f:
+			line = b''
+			for line in f:
+				try:
+					record = json.loads(line)
+				except json.JSONDecodeError:
+					continue
+
+				self.__records.setdefault(record['item'], {})[record['step']] = record.get('data')
+
+			# 中断时留下的半行没有换行符，追加新记录前截断到最后一个换行符之后，
+			# 避免新记录接在半行后面而一起被当作损坏的记录丢弃
+			if line and not line.endswith(b'\n'):
+				f.truncate(f.tell() - len(line))
+
+	def __len__(self):
+		return len(self.__records)
+
+	def has(self, item: str, step: str):
+		"""
+		检查影片的指定步骤是否已经完成
+
+		Args:
+			item: 搜索关键词或文件路径
+			step: 处理步骤名称
+
+		Returns:
+			已完成返回True，否则返回False
+		"""
+		with self.__lock:
+			return step in self.__records.get(item, {})
+
+	def get(self, item: str, step: str):
+		"""
+		获取影片指定步骤记录的数据
+
+		Args:
+			item: 搜索关键词或文件路径
+			step: 处理步骤名称
+
+		Returns:
+			步骤完成时记录的数据，未完成则返回None
+		"""
+		with self.__lock:
+			return self.__records.get(item, {}).get(step)
+
+	def record(self, item: str, step: str, data=None):
+		"""
+		记录影片的指定步骤已经完成
+
+		Args:
+			item: 搜索关键词或文件路径
+			step: 处理步骤名称
+			data: 需要随步骤保存的数据，用于恢复时跳过网络请求
+		"""
+		if self.__file is None:
+			return
+
+		line = json.dumps({'item': item, 'step': step, 'data': data}, ensure_ascii=False) + '\n'
+
+		with self.__lock:
+			if self.__file:
+				# 整行一次写入并同步到磁盘，保证每条记录要么完整要么不存在
+				self.__file.write(line)
+				self.__file.flush()
+				os.fsync(self.__file.fileno())
+
+	def close(self):
+		with self.__lock:
+			if self.__file:
+				self.__file.close()
+				self.__file = None
+
+
+class LibraryIndex():
+	"""
+	媒体库索引，在本地 SQLite 文件中记录目录模式下处理过的影片文件
+
+	每个文件记录路径、大小、修改时间、影片ID和处理结果，之后的运行对比
+	文件系统中的大小和修改时间，就能区分新增、变化和未变化的文件。
+	先按路径查找记录，找不到时再按大小和修改时间查找，文件被移动或改名后仍能识别
+	"""
+	def __init__(self, index_file: Path):
+		"""
+		Args:
+			index_file: 索引文件路径
+		"""
+		self.new = 0
+		self.changed = 0
+		self.unchanged = 0
+		self.retried = 0
+
+		self.__lock = threading.Lock()
+		self.__signatures: dict[str, tuple[int, int]] = {}
+		self.__conn = sqlite3.connect(str(index_file), check_same_thread=False)
+		self.__conn.execute('''
+			CREATE TABLE IF NOT EXISTS files (
+				path       TEXT PRIMARY KEY,
+				size       INTEGER NOT NULL,
+				mtime_ns   INTEGER NOT NULL,
+				movie_id   TEXT,
+				status     TEXT NOT NULL,
+				updated_at REAL NOT NULL
+			)
+		''')
+		self.__conn.execute('CREATE INDEX IF NOT EXISTS files_signature ON files (size, mtime_ns)')
+		self.__conn.commit()
+
+	def __len__(self):
+		with self.__lock:
+			return self.__conn.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+
+	def scan(self, files: Iterable[Path], changed_only: bool=False):
+		"""
+		对比文件系统与索引记录，逐个产生需要处理的影片文件
+
+		Args:
+			files: 影片文件路径的可迭代对象，如iter_video_files返回的生成器
+			changed_only: 是否跳过没有变化的文件，默认False。上次处理失败的文件
+				即使没有变化也会重新处理
+
+		Returns:
+			需要处理的影片文件路径的生成器，已经不存在的文件会被跳过
+		"""
+		for file in files:
+			key = str(Path(file).absolute())
+
+			try:
+				stat = os.stat(file)
+			except OSError:
+				continue
+
+			signature = (stat.st_size, stat.st_mtime_ns)
+
+			with self.__lock:
+				row = self.__conn.execute('SELECT size, mtime_ns, status FROM files WHERE path = ?', (key,)).fetchone()
+
+				if row is None:
+					# 处理完成的文件会被移动并改名，按大小和修改时间查找记录
+					row = self.__conn.execute('SELECT size, mtime_ns, status FROM files WHERE size = ? AND mtime_ns = ? LIMIT 1', signature).fetchone()
+
+				self.__signatures[key] = signature
+
+			if row is None:
+				self.new += 1
+			elif tuple(row[:2]) != signature:
+				self.changed += 1
+			elif row[2] == 'failed':
+				self.retried += 1
+			else:
+				self.unchanged += 1
+
+				if changed_only:
+					continue
+
+			yield file
+
+	def record(self, item: str, movie_id: str, status: str):
+		"""
+		记录影片文件的处理结果
+
+		文件处理完成后可能已经被移动，因此使用scan()时记录的大小和修改时间
+
+		Args:
+			item: 影片文件路径
+			movie_id: 从文件名提取的影片ID，无法提取时为None
+			status: 处理结果，'done'、'failed' 或 'ignored'
+		"""
+		key = str(Path(item).absolute())
+
+		with self.__lock:
+			signature = self.__signatures.pop(key, None)
+
+			if signature is None:
+				return
+
+			# 同一个文件移动之前的记录由新的记录替代，大小和修改时间恰好相同的其它文件仍然保留
+			moved = [
+				(path,) for path, in self.__conn.execute('SELECT path FROM files WHERE size = ? AND mtime_ns = ? AND path != ?', (*signature, key))
+				if not os.path.exists(path)
+			]
+			self.__conn.executemany('DELETE FROM files WHERE path = ?', moved)
+			self.__conn.execute(
+				'INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)',
+				(key, *signature, movie_id, status, time.time())
+			)
+			self.__conn.commit()
+
+	def stats(self):
+		"""
+		统计索引中各处理结果的文件数量
+
+		Returns:
+			包含total、done、failed和ignored的字典
+		"""
+		with self.__lock:
+			rows = self.__conn.execute('SELECT status, COUNT(*) FROM files GROUP BY status').fetchall()
+
+		stats = {'done': 0, 'failed': 0, 'ignored': 0, **dict(rows)}
+		stats['total'] = sum(count for _, count in rows)
+
+		return stats
+
+	def close(self):
+		with self.__lock:
+			self.__conn.close()
+
+
+class MovieCatalog():
+	"""
+	影片信息目录，在本地 SQLite 文件中记录整理完成的影片信息
+
+	按影片编号、演员、制作商、标签和发行日期建立索引，查询整个媒体库时
+	不需要遍历和解析所有NFO文件
+	"""
+	# 查询条件中可以使用的字段
+	QUERY_FIELDS = ('number', 'actress', 'studio', 'tag', 'premiered')
+	# movies表中保存的MovieInfo字段，演员和标签保存在单独的表中
+	COLUMNS = (
+		'number', 'title', 'year', 'runtime', 'director', 'studio', 'publisher', 'premiered',
+		'mpaa', 'country', 'detail_url', 'fanart_url', 'trailer_url',
+	)
+
+	def __init__(self, catalog_file: Path):
+		"""
+		Args:
+			catalog_file: 目录文件路径
+		"""
+		self.__lock = threading.Lock()
+		self.__conn = sqlite3.connect(str(catalog_file), check_same_thread=False)
+		self.__conn.executescript('''
+			CREATE TABLE IF NOT EXISTS movies (
+				number      TEXT PRIMARY KEY COLLATE NOCASE,
+				title       TEXT NOT NULL,
+				year        TEXT NOT NULL,
+				runtime     TEXT NOT NULL,
+				director    TEXT NOT NULL,
+				studio      TEXT NOT NULL COLLATE NOCASE,
+				publisher   TEXT NOT NULL,
+				premiered   TEXT NOT NULL,
+				mpaa        TEXT NOT NULL,
+				country     TEXT NOT NULL,
+				detail_url  TEXT NOT NULL,
+				fanart_url  TEXT NOT NULL,
+				trailer_url TEXT NOT NULL,
+				path        TEXT NOT NULL,
+				updated_at  REAL NOT NULL
+			);
+			CREATE TABLE IF NOT EXISTS movie_actresses (
+				number   TEXT NOT NULL COLLATE NOCASE,
+				position INTEGER NOT NULL,
+				actress  TEXT NOT NULL COLLATE NOCASE,
+				PRIMARY KEY (number, position)
+			) WITHOUT ROWID;
+			CREATE TABLE IF NOT EXISTS movie_tags (
+				number   TEXT NOT NULL COLLATE NOCASE,
+				position INTEGER NOT NULL,
+				tag      TEXT NOT NULL COLLATE NOCASE,
+				PRIMARY KEY (number, position)
+			) WITHOUT ROWID;
+			CREATE INDEX IF NOT EXISTS movies_studio ON movies (studio);
+			CREATE INDEX IF NOT EXISTS movies_premiered ON movies (premiered);
+			CREATE INDEX IF NOT EXISTS movie_actresses_actress ON movie_actresses (actress);
+			CREATE INDEX IF NOT EXISTS movie_tags_tag ON movie_tags (tag);
+		''')
+		self.__conn.commit()
+
+	def __len__(self):
+		with self.__lock:
+			return self.__conn.execute('SELECT COUNT(*) FROM movies').fetchone()[0]
+
+	def __write(self, movie_info: MovieInfo, movie_path: Path):
+		"""写入一部影片的信息，由调用方持有锁并提交事务"""
+		number = movie_info.number
+
+		self.__conn.execute(
+			f'INSERT OR REPLACE INTO movies VALUES ({", ".join("?" * (len(self.COLUMNS) + 2))})',
+			(*(getattr(movie_info, column) for column in self.COLUMNS), str(Path(movie_path).absolute()), time.time())
+		)
+		self.__conn.execute('DELETE FROM movie_actresses WHERE number = ?', (number,))
+		self.__conn.execute('DELETE FROM movie_tags WHERE number = ?', (number,))
+		self.__conn.executemany('INSERT INTO movie_actresses VALUES (?, ?, ?)',
+								((number, position, actress) for position, actress in enumerate(movie_info.actresses)))
+		self.__conn.executemany('INSERT INTO movie_tags VALUES (?, ?, ?)',
+								((number, position, tag) for position, tag in enumerate(movie_info.tags)))
+
+	def record(self, movie_info: MovieInfo, movie_path: Path):
+		"""
+		记录整理完成的影片信息，已有的同编号影片会被替换
+
+		Args:
+			movie_info: 影片信息
+			movie_path: 影片目录
+		"""
+		with self.__lock:
+			self.__write(movie_info, movie_path)
+			self.__conn.commit()
+
+	def backfill(self, root_dir: Path):
+		"""
+		从目录及其子目录中已有的NFO文件补充影片信息
+
+		目录中已记录、但这次没有找到NFO文件的影片（已被删除或移走）会从目录中删除
+
+		Args:
+			root_dir: 整理完成的影片所在目录
+
+		Returns:
+			写入的影片数量
+		"""
+		root_dir = Path(root_dir).absolute()
+		seen = set()
+
+		with self.__lock:
+			for nfo_file in root_dir.rglob('*.nfo'):
+				movie_info = NFOParser.parse(nfo_file)
+
+				if movie_info is not None:
+					self.__write(movie_info, nfo_file.parent)
+					seen.add(movie_info.number.upper())
+
+			missing = [
+				(number,) for number, path in self.__conn.execute('SELECT number, path FROM movies')
+				if number.upper() not in seen and Path(path).is_relative_to(root_dir)
+			]
+
+			for table in ('movies', 'movie_actresses', 'movie_tags'):
+				self.__conn.executemany(f'DELETE FROM {table} WHERE number = ?', missing)
+
+			self.__conn.commit()
+
+		return len(seen)
+
+	def query(self, conditions: Iterable[tuple[str, str]]=(), batch_size: int=1000):
+		"""
+		查询符合全部条件的影片，按发行日期从新到旧排列
+
+		文本条件不区分大小写，premiered 按前缀匹配，如 2023 或 2023-05
+
+		Args:
+			conditions: (字段, 值) 的可迭代对象，字段必须是QUERY_FIELDS之一
+			batch_size: 每次从数据库读取的影片数量
+
+		Returns:
+			FrozenMovieInfo的生成器
+
+		Raises:
+			ValueError: 字段不在QUERY_FIELDS中
+		"""
+		where, params = [], []
+
+		for field, value in conditions:
+			if field == 'actress':
+				where.append('number IN (SELECT number FROM movie_actresses WHERE actress = ?)')
+			elif field == 'tag':
+				where.append('number IN (SELECT number FROM movie_tags WHERE tag = ?)')
+			elif field == 'premiered':
+				where.append('premiered >= ? AND premiered < ?')
+				params.append(value)
+				value += '\uffff'
+			elif field in self.QUERY_FIELDS:
+				where.append(f'{field} = ?')
+			else:
+				raise ValueError(field)
+
+			params.append(value)
+
+		sql = f'''
+			SELECT {", ".join(self.COLUMNS)},
+				(SELECT group_concat(actress, char(31)) FROM
+					(SELECT actress FROM movie_actresses a WHERE a.number = m.number ORDER BY position)),
+				(SELECT group_concat(tag, char(31)) FROM
+					(SELECT tag FROM movie_tags t WHERE t.number = m.number ORDER BY position))
+			FROM movies m
+			{"WHERE " + " AND ".join(where) if where else ""}
+			ORDER BY premiered DESC, number
+		'''
+
+		with self.__lock:
+			cursor = self.__conn.execute(sql, params)
+
+		while True:
+			# 每批读取时才持有锁，边读取边产生结果，不需要一次读取全部影片
+			with self.__lock:
+				rows = cursor.fetchmany(batch_size)
+
+			if not rows:
+				break
+
+			for *values, actresses, tags in rows:
+				info = dict(zip(self.COLUMNS, values))
+				info['actresses'] = actresses.split('\x1f') if actresses else []
+				info['tags'] = tags.split('\x1f') if tags else []
+
+				yield FrozenMovieInfo(info)
+
+	def close(self):
+		with self.__lock:
+			self.__conn.close()
+
+
+class MovieExporter():
+	"""
+	影片信息导出器，将影片信息分批写入 JSON Lines、CSV、Parquet 或 Arrow 文件
+
+	每次只在内存中保留一批影片，导出整个媒体库时内存占用不随影片数量增长
+	"""
+	# 文件扩展名对应的导出格式
+	FORMATS = {
+		'.jsonl'  : 'jsonl',
+		'.ndjson' : 'jsonl',
+		'.csv'    : 'csv',
+		'.parquet': 'parquet',
+		'.arrow'  : 'arrow',
+		'.feather': 'arrow',
+	}
+	# CSV文件中列表字段各项之间的分隔符
+	CSV_LIST_SEPARATOR = '|'
+	# 导出的字段，影片信息目录不保存剧照地址，导出时不包含galleries
+	FIELDS = tuple(name for name in MovieInfo.__slots__ if name != 'galleries')
+
+	def __init__(self, output_file: Path, file_format: str=None, batch_size: int=1000):
+		"""
+		Args:
+			output_file: 导出文件路径
+			file_format: 导出格式，默认根据文件扩展名确定
+			batch_size: 每批写入的影片数量
+
+		Raises:
+			ValueError: 不支持的导出格式
+		"""
+		self.output_file = Path(output_file)
+		self.file_format = file_format or MovieExporter.format_of(output_file)
+		self.batch_size = batch_size
+
+		if self.file_format not in self.FORMATS.values():
+			raise ValueError(self.file_format)
+
+	@staticmethod
+	def format_of(output_file: Path):
+		"""
+		根据文件扩展名确定导出格式
+
+		Returns:
+			导出格式，不支持的扩展名返回None
+		"""
+		return MovieExporter.FORMATS.get(Path(output_file).suffix.lower())
+
+	@staticmethod
+	def is_available(file_format: str):
+		"""检查导出格式依赖的库是否已安装，Parquet 和 Arrow 格式需要 pyarrow"""
+		if file_format in ('parquet', 'arrow'):
+			import importlib.util
+			return importlib.util.find_spec('pyarrow') is not None
+
+		return True
+
+	def export(self, movies: Iterable[MovieInfo]):
+		"""
+		导出影片信息，边读取边写入
+
+		Args:
+			movies: MovieInfo的可迭代对象，如MovieCatalog.query返回的生成器
+
+		Returns:
+			导出的影片数量
+		"""
+		batches = self.__batches(movies)
+
+		if self.file_format == 'jsonl':
+			return self.__export_jsonl(batches)
+		elif self.file_format == 'csv':
+			return self.__export_csv(batches)
+
+		return self.__export_arrow(batches)
+
+	def __batches(self, movies: Iterable[MovieInfo]):
+		iterator = iter(movies)
+
+		while batch := list(itertools.islice(iterator, self.batch_size)):
+			yield batch
+
+	def __record(self, movie: MovieInfo):
+		"""取出需要导出的字段，返回 字段名 -> 值 的字典"""
+		return {name: list(getattr(movie, name)) if name in MovieInfo.LIST_FIELDS else getattr(movie, name)
+				for name in self.FIELDS}
+
+	def __export_jsonl(self, batches: Iterable[list[MovieInfo]]):
+		count = 0
+
+		with open(self.output_file, 'w', encoding='utf-8', newline='\n') as f:
+			for batch in batches:
+				f.write(''.join(json.dumps(self.__record(movie), ensure_ascii=False) + '\n' for movie in batch))
+				count += len(batch)
+
+		return count
+
+	def __export_csv(self, batches: Iterable[list[MovieInfo]]):
+		import csv
+
+		count = 0
+		separator = self.CSV_LIST_SEPARATOR
+
+		with open(self.output_file, 'w', encoding='utf-8', newline='') as f:
+			writer = csv.writer(f)
+			writer.writerow(self.FIELDS)
+
+			for batch in batches:
+				writer.writerows([
+					[separator.join(value) if name in MovieInfo.LIST_FIELDS else value
+					 for name, value in self.__record(movie).items()]
+					for movie in batch
+				])
+				count += len(batch)
+
+		return count
+
+	def __export_arrow(self, batches: Iterable[list[MovieInfo]]):
+		import pyarrow as pa
+
+		count = 0
+		schema = pa.schema([
+			(name, pa.list_(pa.string()) if name in MovieInfo.LIST_FIELDS else pa.string())
+			for name in self.FIELDS
+		])
+
+		if self.file_format == 'parquet':
+			import pyarrow.parquet as pq
+			writer = pq.ParquetWriter(str(self.output_file), schema)
+		else:
+			writer = pa.ipc.new_file(str(self.output_file), schema)
+
+		with writer:
+			for batch in batches:
+				columns = {name: [] for name in self.FIELDS}
+
+				for movie in batch:
+					for name, value in self.__record(movie).items():
+						columns[name].append(value)
+
+				writer.write_batch(pa.RecordBatch.from_pydict(columns, schema=schema))
+				count += len(batch)
+
+		return count
+
+
+class DirectoryWatcher():
+	"""
+	目录监视器，持续产生目录中新出现并且已经写入完成的影片文件
+
+	Linux 上使用 inotify 接收文件系统事件，其它系统或 inotify 不可用时定期
+	重新扫描目录。文件大小和修改时间在 settle_time 秒内不再变化才视为写入
+	完成；config.exclude_path 中的目录和以 config.ignored_file_prefix 开头的
+	文件都会被忽略，整理影片时移动和重命名文件不会再次触发处理
+	"""
+	IN_CLOSE_WRITE = 0x00000008
+	IN_MOVED_FROM  = 0x00000040
+	IN_MOVED_TO    = 0x00000080
+	IN_CREATE      = 0x00000100
+	IN_DELETE      = 0x00000200
+	IN_Q_OVERFLOW  = 0x00004000
+	IN_IGNORED     = 0x00008000
+	IN_ISDIR       = 0x40000000
+	WATCH_MASK     = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+	EVENT_HEADER   = struct.Struct('iIII')
+
+	def __init__(self, root_dir: Path, max_depth: int, scan, poll_interval: float=10.0, settle_time: float=5.0, use_inotify: bool=True):
+		"""
+		Args:
+			root_dir: 需要监视的根目录
+			max_depth: 最大监视深度，0表示仅监视根目录
+			scan: 查找目录中影片文件的函数，接受 (目录, 最大深度)，如DVHelper.iter_video_files
+			poll_interval: 不使用 inotify 时重新扫描目录的间隔（秒）
+			settle_time: 文件大小和修改时间保持不变多久后视为写入完成（秒）
+			use_inotify: 是否尝试使用 inotify，默认True
+		"""
+		self.root_dir = Path(root_dir)
+		self.max_depth = max_depth if max_depth >= 0 else 1
+		self.poll_interval = poll_interval
+		self.settle_time = settle_time
+
+		self.__scan = scan
+		self.__stop = threading.Event()
+		self.__extensions = frozenset(ext.lower() for ext in config.movie_file_extensions)
+		self.__exclude_path = frozenset(config.exclude_path)
+		# 等待写入完成的文件 -> ((大小, 修改时间), 开始保持不变的时间)
+		self.__pending: dict[Path, tuple[tuple[int, int], float]] = {}
+		# 已经产生的文件 -> (大小, 修改时间)，文件被替换后会再次产生
+		self.__yielded: dict[Path, tuple[int, int]] = {}
+		self.__watches: dict[int, tuple[Path, int]] = {}
+		self.__inotify = self.__init_inotify() if use_inotify else None
+		self.backend = 'inotify' if self.__inotify else 'poll'
+
+	@staticmethod
+	def __init_inotify():
+		"""初始化 inotify，返回 (libc, 文件描述符)，不可用时返回None"""
+		if not sys.platform.startswith('linux'):
+			return
+
+		import ctypes
+		import ctypes.util
+
+		try:
+			libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+			fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+		except (OSError, AttributeError):
+			return
+
+		return (libc, fd) if fd >= 0 else None
+
+	def watch(self):
+		"""
+		产生写入完成的影片文件，直到调用stop()或按下 Ctrl+C
+
+		启动时目录中已有的影片文件同样会被产生
+
+		Returns:
+			影片文件路径的生成器
+		"""
+		try:
+			if self.__inotify:
+				self.__add_watch(self.root_dir, 0)
+
+			self.__add_pending(self.__scan(self.root_dir, self.max_depth))
+			next_scan = time.monotonic() + self.poll_interval
+
+			while not self.__stop.is_set():
+				yield from self.__settled()
+
+				# 有文件等待写入完成时需要更频繁地检查
+				timeout = min(self.poll_interval, self.settle_time / 2) if self.__pending else self.poll_interval
+
+				if self.__inotify:
+					self.__read_events(timeout)
+				else:
+					self.__stop.wait(max(0, min(timeout, next_scan - time.monotonic())))
+
+					if time.monotonic() >= next_scan:
+						self.__rescan()
+						next_scan = time.monotonic() + self.poll_interval
+		except KeyboardInterrupt:
+			return
+		finally:
+			self.close()
+
+	def stop(self):
+		"""通知watch()在下一次检查时结束"""
+		self.__stop.set()
+
+	def close(self):
+		if self.__inotify:
+			os.close(self.__inotify[1])
+			self.__inotify = None
+			self.__watches.clear()
+
+	def __is_candidate(self, name: str):
+		"""检查文件名是否为需要处理的影片文件"""
+		return not name.startswith(config.ignored_file_prefix) and \
+			os.path.splitext(name)[1].lower() in self.__extensions
+
+	def __add_pending(self, paths: Iterable[Path]):
+		"""开始等待文件写入完成，已经产生并且没有变化的文件会被跳过"""
+		now = time.monotonic()
+
+		for path in paths:
+			path = Path(path)
+
+			if path in self.__pending:
+				continue
+
+			try:
+				stat = os.stat(path)
+			except OSError:
+				continue
+
+			signature = (stat.st_size, stat.st_mtime_ns)
+
+			if self.__yielded.get(path) == signature:
+				continue
+
+			# 修改时间已经早于等待时间的文件不必再等待
+			since = now - self.settle_time if time.time() - stat.st_mtime >= self.settle_time else now
+			self.__pending[path] = (signature, since)
+
+	def __settled(self):
+		"""产生大小和修改时间保持不变超过settle_time的文件"""
+		now = time.monotonic()
+
+		for path, (signature, since) in list(self.__pending.items()):
+			try:
+				stat = os.stat(path)
+			except OSError:
+				# 文件已经被删除或移走
+				del self.__pending[path]
+				continue
+
+			current = (stat.st_size, stat.st_mtime_ns)
+
+			if current != signature:
+				self.__pending[path] = (current, now)
+			elif now - since >= self.settle_time:
+				del self.__pending[path]
+				self.__yielded[path] = current
+				yield path
+
+	def __rescan(self):
+		"""重新扫描整个目录，并移除已经不存在的文件的记录"""
+		found_files = [Path(path) for path in self.__scan(self.root_dir, self.max_depth)]
+		existing = set(found_files)
+
+		self.__yielded = {path: signature for path, signature in self.__yielded.items() if path in existing}
+		self.__add_pending(found_files)
+
+	def __add_watch(self, directory: Path, depth: int):
+		"""监视指定目录，并在最大深度内递归监视其子目录"""
+		libc, fd = self.__inotify
+		wd = libc.inotify_add_watch(fd, os.fsencode(directory), self.WATCH_MASK)
+
+		if wd < 0:
+			return
+
+		self.__watches[wd] = (directory, depth)
+
+		if depth >= self.max_depth:
+			return
+
+		try:
+			with os.scandir(directory) as entries:
+				sub_dirs = [Path(entry.path) for entry in entries
+							if entry.is_dir(follow_symlinks=False) and entry.name not in self.__exclude_path]
+		except OSError:
+			return
+
+		for sub_dir in sub_dirs:
+			self.__add_watch(sub_dir, depth + 1)
+
+	def __read_events(self, timeout: float):
+		"""等待并处理 inotify 事件，最多等待timeout秒"""
+		import select
+
+		fd = self.__inotify[1]
+
+		if not select.select([fd], [], [], timeout)[0]:
+			return
+
+		try:
+			data = os.read(fd, 64 * 1024)
+		except BlockingIOError:
+			return
+
+		offset = 0
+
+		while offset < len(data):
+			wd, mask, _cookie, length = self.EVENT_HEADER.unpack_from(data, offset)
+			name = data[offset + self.EVENT_HEADER.size:offset + self.EVENT_HEADER.size + length].rstrip(b'\0')
+			offset += self.EVENT_HEADER.size + length
+
+			if mask & self.IN_Q_OVERFLOW:
+				# 事件队列溢出，部分事件已经丢失，需要重新扫描
+				self.__rescan()
+				continue
+
+			if mask & self.IN_IGNORED:
+				self.__watches.pop(wd, None)
+				continue
+
+			if wd not in self.__watches or not name:
+				continue
+
+			directory, depth = self.__watches[wd]
+			path = directory / os.fsdecode(name)
+
+			if mask & (self.IN_MOVED_FROM | self.IN_DELETE):
+				# 文件被整理移走或删除后不再需要记录，避免长时间运行时记录不断增加
+				self.__pending.pop(path, None)
+				self.__yielded.pop(path, None)
+			elif mask & self.IN_ISDIR:
+				if depth < self.max_depth and path.name not in self.__exclude_path:
+					self.__add_watch(path, depth + 1)
+					# 添加监视之前目录中可能已经有文件写入
+					self.__add_pending(self.__scan(path, self.max_depth - depth - 1))
+			elif self.__is_candidate(path.name):
+				self.__add_pending([path])
+
+
+class RateLimiter():
+	"""
+	按主机限制请求速率的令牌桶
+
+	每个主机维护独立的令牌桶，以 rate 次/秒的速度补充令牌，最多累积 burst 个。
+	服务器返回 429/503 时速率减半并遵守 Retry-After，之后每次成功请求逐步恢复，
+	同步和异步抓取器共用同一个限速器。指定 sites 时只对其中网站的主机主动限速，
+	其他主机（如媒体文件所在的 CDN）只在服务器要求时按 Retry-After 暂停；
+	不限速时所有主机都按后一种方式处理
+	"""
+	THROTTLE_STATUS = (429, 503)
+
+	def __init__(self, rate: float, burst: int, min_rate: float=0.1, sites: Iterable[str]=None):
+		"""
+		Args:
+			rate: 每个主机每秒允许的请求数，小于等于0表示不主动限速，仍然遵守 Retry-After
+			burst: 令牌桶容量，即允许连续发出的请求数
+			min_rate: 自动降速时的最低速率
+			sites: 需要主动限速的网站地址，默认为None表示所有主机
+		"""
+		self.max_rate = rate
+		self.burst = max(burst, 1)
+		self.min_rate = min(min_rate, rate) if rate > 0 else min_rate
+		self.hosts = frozenset(urllib.parse.urlsplit(site).netloc for site in sites) if sites is not None else None
+		self.__lock = threading.Lock()
+		self.__hosts: dict[str, dict] = {}
+
+	def __bucket(self, host: str, now: float):
+		"""获取主机的令牌桶并按经过的时间补充令牌，调用方需持有锁"""
+		bucket = self.__hosts.get(host)
+
+		if bucket is None:
+			bucket = self.__hosts[host] = {
+				'rate': self.max_rate, 'tokens': float(self.burst), 'updated': now,
+				'blocked_until': 0.0, 'queued': 0, 'requests': 0, 'throttled': 0.0, 'limited': 0
+			}
+		else:
+			bucket['tokens'] = min(self.burst, bucket['tokens'] + (now - bucket['updated']) * bucket['rate'])
+			bucket['updated'] = now
+
+		return bucket
+
+	def reserve(self, url: str):
+		"""
+		为一次请求预留令牌
+
+		Args:
+			url: 请求地址
+
+		Returns:
+			发出请求前需要等待的秒数
+		"""
+		host = urllib.parse.urlsplit(url).netloc
+		now = time.monotonic()
+
+		with self.__lock:
+			bucket = self.__bucket(host, now)
+			bucket['requests'] += 1
+
+			if self.max_rate > 0 and (self.hosts is None or host in self.hosts):
+				bucket['tokens'] -= 1
+				# 令牌不足时按补充速度排队，令牌数可以为负表示已被预留
+				delay = max(-bucket['tokens'] / bucket['rate'], bucket['blocked_until'] - now, 0.0)
+			else:
+				delay = max(bucket['blocked_until'] - now, 0.0)
+
+			if delay > 0:
+				bucket['queued'] += 1
+				bucket['throttled'] += delay
+
+			return delay
+
+	def __release(self, url: str):
+		"""结束排队，返回服务器要求额外等待的秒数"""
+		host = urllib.parse.urlsplit(url).netloc
+		now = time.monotonic()
+
+		with self.__lock:
+			bucket = self.__hosts[host]
+			delay = max(bucket['blocked_until'] - now, 0.0)
+
+			if delay > 0:
+				bucket['throttled'] += delay
+			else:
+				bucket['queued'] -= 1
+
+			return delay
+
+	def acquire(self, url: str):
+		"""
+		阻塞当前线程直到允许向目标主机发出请求
+
+		Args:
+			url: 请求地址
+		"""
+		delay = self.reserve(url)
+
+		# 排队期间可能收到 Retry-After，醒来后需要再次检查
+		while delay > 0:
+			time.sleep(delay)
+			delay = self.__release(url)
+
+	async def acquire_async(self, url: str):
+		"""
+		在事件循环中等待直到允许向目标主机发出请求
+
+		Args:
+			url: 请求地址
+		"""
+		delay = self.reserve(url)
+
+		while delay > 0:
+			await asyncio.sleep(delay)
+			delay = self.__release(url)
+
+	def feedback(self, url: str, status: int, retry_after: str=None):
+		"""
+		根据响应状态调整主机的请求速率
+
+		Args:
+			url: 请求地址
+			status: 响应状态码
+			retry_after: 响应头中的 Retry-After 值
+		"""
+		host = urllib.parse.urlsplit(url).netloc
+		now = time.monotonic()
+
+		with self.__lock:
+			bucket = self.__bucket(host, now)
+
+			if self.max_rate <= 0:
+				# 不限速时不调整速率，只按服务器要求暂停
+				wait = self.parse_retry_after(retry_after) if status in self.THROTTLE_STATUS else None
+
+				if not wait:
+					return
+
+				bucket['limited'] += 1
+				bucket['blocked_until'] = max(bucket['blocked_until'], now + wait)
+				rate = None
+			elif status in self.THROTTLE_STATUS:
+				bucket['rate'] = max(bucket['rate'] / 2, self.min_rate)
+				bucket['tokens'] = min(bucket['tokens'], 0.0)
+				bucket['limited'] += 1
+
+				wait = self.parse_retry_after(retry_after)
+				if wait is None:
+					wait = 1 / bucket['rate']
+
+				bucket['blocked_until'] = max(bucket['blocked_until'], now + wait)
+				rate = bucket['rate']
+			else:
+				# 成功请求后线性恢复速率，约 20 次请求恢复到设定值
+				bucket['rate'] = min(bucket['rate'] + self.max_rate / 20, self.max_rate)
+				return
+
+		if rate is None:
+			logger.warning(_('服务器限制了请求频率 ({status})，暂停向 {host} 发出请求 {wait:.1f} 秒')
+				.format(status=status, host=host, wait=wait))
+		else:
+			logger.warning(_('服务器限制了请求频率 ({status})，{host} 的请求速率降至 {rate:.2f} 次/秒，暂停 {wait:.1f} 秒')
+				.format(status=status, host=host, rate=rate, wait=wait))
+
+	@staticmethod
+	def parse_retry_after(value: str):
+		"""
+		解析 Retry-After 响应头
+
+		Args:
+			value: 秒数或 HTTP 日期格式的响应头值
+
+		Returns:
+			需要等待的秒数，无法解析则返回None
+		"""
+		if not value:
+			return
+
+		try:
+			return max(float(value), 0.0)
+		except ValueError:
+			pass
+
+		from email.utils import parsedate_to_datetime
+
+		try:
+			retry_time = parsedate_to_datetime(value)
+		except (TypeError, ValueError):
+			return
+
+		return max(retry_time.timestamp() - time.time(), 0.0)
+
+	def stats(self):
+		"""
+		获取各主机的实时限速统计
+
+		Returns:
+			以主机为键的字典，包含当前速率 rate、排队中的请求数 queued、
+			请求总数 requests、累计等待秒数 throttled 和被服务器限流次数 limited
+		"""
+		with self.__lock:
+			return {
+				host: {key: bucket[key] for key in ('rate', 'queued', 'requests', 'throttled', 'limited')}
+				for host, bucket in self.__hosts.items()
+			}
+
+
+class StageTimer():
+	"""按阶段累计次数和耗时，可以在多个线程中同时记录"""
+	def __init__(self):
+		self.__lock = threading.Lock()
+		self.__stages: dict[str, list] = {}
+
+	def record(self, stage: str, seconds: float):
+		"""
+		记录一次阶段耗时
+
+		Args:
+			stage: 阶段名称，如 'download'、'image'
+			seconds: 本次耗时（秒）
+		"""
+		with self.__lock:
+			entry = self.__stages.setdefault(stage, [0, 0.0])
+			entry[0] += 1
+			entry[1] += seconds
+
+	@contextlib.contextmanager
+	def measure(self, stage: str):
+		"""记录with语句块耗时的上下文管理器，语句块抛出异常时不记录"""
+		start = time.perf_counter()
+		yield
+		self.record(stage, time.perf_counter() - start)
+
+	def stats(self):
+		"""
+		获取各阶段的统计
+
+		Returns:
+			以阶段名称为键、(次数, 累计秒数) 为值的字典
+		"""
+		with self.__lock:
+			return {stage: tuple(entry) for stage, entry in self.__stages.items()}
+
+
+class ImageProcessor():
+	"""
+	在进程池中处理图片
+
+	图片的解码和编码受 CPU 限制，放在下载线程中执行会占用 GIL 并拖慢其它线程的
+	网络请求。下载线程通过submit()交出图片内容后立即继续工作，排队中的图片数量
+	达到上限时submit()会阻塞，避免图片内容在内存中无限堆积
+	"""
+	POSTER_ASPECT_RATIO = 379 / 538  # 标准 800x538 封面中正面部分的宽高比
+	SCAN_WIDTH          = 400        # 查找分界线时将封面缩小到的宽度
+	SCAN_HEIGHT         = 128        # 查找分界线时将封面缩小到的最大高度
+	SPLIT_SEARCH_RANGE  = 0.15       # 分界线与估算位置的最大偏差，占封面宽度的比例
+	EDGE_THRESHOLD      = 24         # 相邻两列灰度差达到该值时视为差异明显
+	MIN_SPLIT_RATIO     = 0.5        # 分界线上差异明显的行所占的最小比例
+	def __init__(self, workers: int, max_pending: int, timer: StageTimer=None):
+		"""
+		Args:
+			workers: 工作进程数量
+			max_pending: 已提交但尚未完成的图片数量上限
+			timer: 记录图片处理和排队等待耗时的StageTimer，默认为None
+		"""
+		import multiprocessing
+		from concurrent.futures import ProcessPoolExecutor
+
+		# 下载线程运行时fork子进程可能复制被其它线程持有的锁，统一使用spawn方式
+		self.__executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+		self.__slots = threading.BoundedSemaphore(max_pending)
+		self.__lock = threading.Lock()
+		self.__futures: dict[Path, 'Future'] = {}
+		self.timer = timer
+
+	def submit(self, content: bytes, dest_file: Path, thumbnail_widths: Iterable[int]=(), thumbnail_name: str=None):
+		"""
+		提交裁剪海报图片的任务，排队中的图片达到上限时等待
+
+		Args:
+			content: 封面图片内容
+			dest_file: 海报图片保存路径
+			thumbnail_widths: 缩略图宽度，默认不生成缩略图
+			thumbnail_name: 缩略图文件名格式
+
+		Returns:
+			任务的Future对象，结果为图片处理耗时（秒）
+		"""
+		start = time.perf_counter()
+		self.__slots.acquire()
+
+		if self.timer:
+			self.timer.record('image_wait', time.perf_counter() - start)
+
+		try:
+			future = self.__executor.submit(ImageProcessor.crop_poster, bytes(content), dest_file, tuple(thumbnail_widths), thumbnail_name)
+		except BaseException:
+			self.__slots.release()
+			raise
+
+		# 先登记再添加回调，任务已经完成时回调会立即执行
+		with self.__lock:
+			self.__futures[Path(dest_file)] = future
+
+		future.add_done_callback(functools.partial(self.__on_done, Path(dest_file)))
+
+		return future
+
+	def __on_done(self, dest_file: Path, future):
+		succeeded = not future.cancelled() and future.exception() is None
+
+		# 成功的任务不必等待 wait() 取走，失败的任务保留到 wait() 报告错误
+		if succeeded:
+			with self.__lock:
+				if self.__futures.get(dest_file) is future:
+					del self.__futures[dest_file]
+
+		self.__slots.release()
+
+		if self.timer and succeeded:
+			self.timer.record('image', future.result())
+
+	def wait(self, dest_file: Path):
+		"""
+		等待指定图片处理完成
+
+		Args:
+			dest_file: 提交任务时的图片保存路径
+
+		Returns:
+			处理成功或没有对应的任务时返回True，处理失败返回False
+		"""
+		with self.__lock:
+			future = self.__futures.pop(Path(dest_file), None)
+
+		if future is None:
+			return True
+
+		try:
+			future.result()
+			return True
+		except Exception as e:
+			logger.error(_('图片处理失败: ') + str(e))
+			return False
+
+	def close(self):
+		"""等待已提交的图片处理完成并结束工作进程"""
+		self.__executor.shutdown(wait=True)
+
+	@staticmethod
+	def crop_poster(source: Path | bytes, dest_file: Path, thumbnail_widths: Iterable[int]=(), thumbnail_name: str=None):
+		"""
+		从封面图片中裁剪出海报图片，并生成指定宽度的缩略图
+
+		封面通常由背面、书脊和正面横向拼接而成，海报取右侧的正面部分，分界线由
+		find_poster_left()根据图片内容查找。源图片只解码一次，海报和所有缩略图
+		都由解码后的图片生成；非 RGB 图片（如 PNG、CMYK JPEG）会先转换为 RGB，
+		以便保存为 JPEG 格式
+
+		Args:
+			source: 输入图片文件路径，或已下载到内存中的图片内容
+			dest_file: 海报图片保存路径
+			thumbnail_widths: 缩略图宽度，默认不生成缩略图
+			thumbnail_name: 缩略图文件名格式，{width} 替换为缩略图宽度，保存在海报图片所在目录
+
+		Returns:
+			处理耗时（秒）
+		"""
+		from PIL import Image
+
+		start = time.perf_counter()
+
+		if isinstance(source, (bytes, bytearray)):
+			source = io.BytesIO(source)
+
+		with Image.open(source) as source_img:
+			width, height = source_img.size
+
+			left = ImageProcessor.find_poster_left(source_img)
+			top = 0
+			right = width
+			bottom = height
+
+			cropped_img = source_img.crop((left, top, right, bottom))
+
+			if cropped_img.mode not in ('RGB', 'L'):
+				cropped_img = cropped_img.convert('RGB')
+
+			cropped_img.save(dest_file, format='JPEG')
+
+		# 从大到小依次缩小，每张缩略图都由上一张生成
+		thumbnail_img = cropped_img
+
+		for thumbnail_width in sorted(set(thumbnail_widths), reverse=True):
+			if thumbnail_width >= thumbnail_img.width:
+				continue
+
+			thumbnail_height = max(round(thumbnail_img.height * thumbnail_width / thumbnail_img.width), 1)
+			thumbnail_img = thumbnail_img.resize((thumbnail_width, thumbnail_height), Image.LANCZOS, reducing_gap=3.0)
+			thumbnail_img.save(Path(dest_file).with_name(thumbnail_name.format(width=thumbnail_width)), format='JPEG')
+
+		return time.perf_counter() - start
+
+	@staticmethod
+	def find_poster_left(image: 'Image.Image'):
+		"""
+		查找封面中海报部分的左边界
+
+		先按海报的宽高比估算左边界，再在缩小后的图片中统计每一列与相邻列差异明显
+		的行所占的比例。贯穿整个高度的分界线在大多数行都有差异，而画面内容中的
+		边缘通常只占少数行；估算位置附近有多条分界线（如书脊两侧）时取最近的一条，
+		与估算位置相差不超过缩小后的一列时直接使用估算位置
+
+		Args:
+			image: 封面图片
+
+		Returns:
+			海报左边界的横坐标，封面本身就是竖版海报时返回0
+		"""
+		from PIL import Image, ImageChops
+
+		width, height = image.size
+		poster_width = round(height * ImageProcessor.POSTER_ASPECT_RATIO)
+
+		if poster_width >= width * 0.9:
+			return 0
+
+		expected = width - poster_width
+
+		# 只扫描估算位置附近的区域，分界线是竖直的，纵向可以缩得更小
+		search_range = round(ImageProcessor.SPLIT_SEARCH_RANGE * width)
+		region_left, region_right = max(expected - search_range, 0), min(expected + search_range, width)
+		scale = min(ImageProcessor.SCAN_WIDTH / width, 1.0)
+		small_width = max(round((region_right - region_left) * scale), 3)
+		small_height = min(height, ImageProcessor.SCAN_HEIGHT)
+		small = image.convert('RGB').resize((small_width, small_height), Image.BOX, box=(region_left, 0, region_right, height))
+
+		# 比较间隔一列的两列，缩小时落在两列之间的分界线不会被分摊成两个较小的差值；
+		# 取各颜色通道差值的最大值，亮度相近但颜色不同的分界线也能找到
+		diff = ImageChops.difference(small.crop((2, 0, small_width, small_height)), small.crop((0, 0, small_width - 2, small_height)))
+		diff = functools.reduce(ImageChops.lighter, diff.split())
+
+		# 差异明显的像素记为255，按列取平均得到差异明显的行所占的比例
+		edges = diff.point(lambda value: 255 if value >= ImageProcessor.EDGE_THRESHOLD else 0)
+		profile = list(edges.resize((small_width - 2, 1), Image.BOX).tobytes())
+
+		# 第i列的差值对应缩小后第i+1列所在的位置
+		column_width = (region_right - region_left) / small_width
+		candidates = [round(region_left + (i + 1.5) * column_width) for i, ratio in enumerate(profile)
+					  if ratio >= ImageProcessor.MIN_SPLIT_RATIO * 255]
+
+		if not candidates:
+			return expected
+
+		left = min(candidates, key=lambda left: abs(left - expected))
+
+		# 缩小后一列对应原图的多个像素，与估算位置相差不超过一列时认为就是标准分界线
+		if abs(left - expected) <= column_width:
+			return expected
+
+		return min(left, width - 1)
+
+
+class MovieScraper():
+	"""影片信息抓取器，实现登录管理、数据和图片的抓取流程"""
+	REQUESTS_HEADERS = {
+		'Accept-Language': 'zh-CN,zh;q=0.9',
+		'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+	}
+
+	def __init__(self):
+		self.cache: ResponseCache = None
+		self.rate_limiter: RateLimiter = None
+		self.image_processor: ImageProcessor = None
+		self.timer = StageTimer()
+		self.__session = None
+		self.__session_lock = threading.Lock()
+		self.__host_semaphores: dict[str, threading.Semaphore] = {}
+		self.__host_semaphores_guard = threading.Lock()
+
+	@property
+	def session(self):
+		"""共享的requests会话，未登录时延迟创建匿名会话"""
+		with self.__session_lock:
+			if self.__session is None:
+				self.__session = self.create_session()
+
+			return self.__session
+
+	def initialize_session(self):
+		self.__session = self.check_cookies()
+
+		if not self.__session:
+			logger.warning(_('未找到有效Cookies，将使用匿名会话，或使用 -l 参数重新登录'))
+
+	def create_session(self):
+		"""
+		创建带连接池和自动重试的requests会话
+
+		页面请求和媒体下载共用同一个会话，以便复用到同一主机的 TCP/TLS 连接
+
+		Returns:
+			配置完成的requests会话对象
+		"""
+		session = requests.Session()
+		session.headers.update(self.REQUESTS_HEADERS)
+
+		retry = Retry(
+			total=config.http_retries,
+			backoff_factor=config.http_retry_backoff,
+			status_forcelist=(500, 502, 504),
+			allowed_methods=frozenset({'GET', 'HEAD'}),
+			raise_on_status=False,
+			# 429/503 交给 RateLimiter 处理，避免 urllib3 在连接内按 Retry-After 重试绕过限速器
+			respect_retry_after_header=False
+		)
+		adapter = HTTPAdapter(
+			pool_connections=config.http_pool_size,
+			pool_maxsize=config.http_pool_size,
+			max_retries=retry
+		)
+		session.mount('https://', adapter)
+		session.mount('http://', adapter)
+
+		return session
+
+	def check_cookies(self):
+		"""
+		检查并加载Cookie，验证有效性
+
+		Returns:
+			有效的requests会话对象，Cookies过期或不存在则返回None
+		"""
+		if not config.cookies_file.exists():
+			return
+
+		session = self.create_session()
+
+		try:
+			with open(config.cookies_file, 'r', encoding='utf-8') as f:
+				cookies: list[dict] = json.load(f)
+
+			for cookie in cookies:
+				if 'expiry' in cookie and cookie['name'] == 'remember_token':
+					expiry_time = datetime.fromtimestamp(cookie['expiry'])
+
+					if expiry_time < datetime.now() - timedelta(seconds=60):
+						logger.warning(_('当前 Cookie 已过期'))
+
+						return
+
+				session.cookies.set(
+					cookie['name'],
+					cookie['value'],
+					domain=cookie.get('domain'),
+					path=cookie.get('path', '/'),
+					secure=cookie.get('secure', False)
+				)
+
+			return session
+		except Exception as e:
+			logger.error(_('Cookies 文件处理失败: ') + str(e))
+			return
+
+	def perform_login(self):
+		"""
+		通过浏览器模拟登录，获取Cookie
+
+		Returns:
+			登录后的requests会话对象，登录失败则返回None
+		"""
+		from selenium import webdriver
+		from selenium.webdriver.support.ui import WebDriverWait
+		from selenium.webdriver.support import expected_conditions as EC
+		from selenium.webdriver.chrome.options import Options
+		from webdriver_manager.chrome import ChromeDriverManager
+		from selenium.webdriver.chrome.service import Service
+
+		# 配置Chrome选项
+		chrome_options = Options()
+		chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
+
+		# 使用webdriver-manager自动管理ChromeDriver
+		driver = None
+		try:
+			service = Service(ChromeDriverManager().install())
+			driver = webdriver.Chrome(service=service, options=chrome_options)
+		except:
+			driver = webdriver.Chrome(options=chrome_options)
+
+		try:
+			logger.info(_('正在启动 Chrome 浏览器...'))
+
+			print(_('在弹出的网页中完成登录操作，等待浏览器自动关闭！\n')*3)
+			driver.get(config.sign_in_url)
+
+			# 等待用户完成登录并重定向
+			WebDriverWait(driver, 3 * 60).until(
+				EC.url_to_be(f'{config.base_url}/')
+			)
+
+			# 获取并保存Cookie
+			cookies = driver.get_cookies()
+			with open(config.cookies_file, 'w', encoding='utf-8') as f:
+				json.dump(cookies, f, ensure_ascii=False, indent=2)
+
+			logger.info(_('已保存 {count} 个 Cookie 到 {file}')
+				.format(count=len(cookies), file=config.cookies_file))
+
+			# 创建会话并加载Cookie
+			session = self.create_session()
+
+			for cookie in cookies:
+				session.cookies.set(
+					cookie['name'],
+					cookie['value'],
+					domain=cookie.get('domain'),
+					path=cookie.get('path', '/'),
+					secure=cookie.get('secure', False)
+				)
+		except Exception:
+			session = None
+			logger.error(_('用户登录失败'))
+		finally:
+			time.sleep(2)
+			driver.quit()
+
+		return session
+
+	@staticmethod
+	def is_sign_in_url(url):
+		"""
+		检查响应的最终地址是否为登录页面，未登录时访问需要登录的页面会跳转到登录页面
+
+		Args:
+			url: 响应的最终地址
+
+		Returns:
+			是登录页面返回True，否则返回False
+		"""
+		return urllib.parse.urlsplit(str(url)).path.rstrip('/').endswith('/sign_in')
+
+	def fetch_data(self, url: str, max_retries: int=3, initial_timeout: int=30, backoff_factor: int=2, raw: bool=False):
+		"""
+		获取指定网站的文本内容，支持重试操作
+
+		Args:
+			url: 目标网址
+			max_retries: 最大重试次数，默认3次
+			initial_timeout: 初始超时时间（秒），默认30秒
+			backoff_factor: 退避因子，默认2
+			raw: 是否返回未解码的字节内容，默认False
+
+		Returns:
+			响应内容文本（raw为True时为字节内容），所有重试失败则返回None
+		"""
+		headers = self.REQUESTS_HEADERS
+		cached = self.cache.get(url) if self.cache else None
+
+		if cached:
+			if cached['fresh']:
+				return self.cache.hit(url, cached, raw=raw)
+
+			# 缓存已过期，携带验证信息发起条件请求
+			headers = {**headers, **ResponseCache.validators(cached)}
+
+		for retry in range(1, max_retries + 1):
+			current_timeout = initial_timeout * (backoff_factor ** (retry - 1))
+
+			if retry > 1:
+				print(_('第 {retry}/{retries} 次尝试（超时时间: {timeout} 秒）')
+					.format(retry=retry, retries=max_retries, timeout=current_timeout))
+
+			try:
+				if self.rate_limiter:
+					self.rate_limiter.acquire(url)
+
+				response = self.session.get(url=url, headers=headers, timeout=current_timeout)
+
+				if self.rate_limiter:
+					self.rate_limiter.feedback(url, response.status_code, response.headers.get('Retry-After'))
+
+				if cached and response.status_code == 304:
+					return self.cache.hit(url, cached, revalidated=True, raw=raw)
+
+				response.encoding = 'utf-8' # response.apparent_encoding
+				response.raise_for_status()
+
+				# 跳转到登录页面的响应只反映当前的登录状态，不能缓存
+				if self.cache and not MovieScraper.is_sign_in_url(response.url):
+					self.cache.store(url, response.content, response.headers)
+
+				return response.content if raw else response.text
+			except (RequestException, Timeout):
+				if retry >= max_retries:
+					return
+
+	def fetch_media(self, movie_path: Path, media_file: str, url: str, crop: bool=False, max_retries=3, initial_timeout=30, backoff_factor=2, progress: bool=True):
+		"""
+		下载影片相关媒体文件（包含影片封面图片、剧照、预告片等）
+
+		从指定地址下载影片媒体文件，支持重试机制，并显示下载进度
+
+		Args:
+			movie_path: 媒体文件保存路径
+			media_file: 媒体文件名
+			url: 媒体文件下载地址
+			crop: 是否裁剪图片，默认False
+			max_retries: 最大重试次数，默认3次
+			initial_timeout: 初始超时时间（秒），默认30秒
+			backoff_factor: 退避因子，用于指数退避算法，默认2
+			progress: 是否显示单个文件的下载进度条，默认True
+
+		Returns:
+			下载和裁剪成功返回True，失败则返回False
+		"""
+		media_file = movie_path / media_file
+		part_file = MovieScraper.part_file(media_file)
+		chunk_size = 8192
+
+		for retry in range(1, max_retries + 1):
+			current_timeout = initial_timeout * (backoff_factor ** (retry - 1))
+
+			if retry > 1:
+				print(_('第 {retry}/{retries} 次尝试（超时时间: {timeout} 秒）')
+					.format(retry=retry, retries=max_retries, timeout=current_timeout))
+
+			try:
+				if self.rate_limiter:
+					self.rate_limiter.acquire(url)
+
+				# 已有未完成的下载时只请求剩余的部分
+				offset, headers = MovieScraper.resume_headers(part_file)
+
+				start = time.perf_counter()
+				response = self.session.get(url, stream=True, timeout=current_timeout, headers=headers)
+
+				if self.rate_limiter:
+					self.rate_limiter.feedback(url, response.status_code, response.headers.get('Retry-After'))
+
+				if offset and response.status_code == 416:
+					# 服务器上的文件已经变化，未完成的下载无法继续使用
+					response.close()
+					MovieScraper.discard_part_file(part_file)
+					continue
+
+				response.raise_for_status()
+				download_range = MovieScraper.parse_download_range(response.status_code, response.headers, offset)
+
+				if download_range is None:
+					response.close()
+					MovieScraper.discard_part_file(part_file)
+					continue
+
+				offset, total_size = download_range
+
+				if not offset:
+					MovieScraper.save_validator(part_file, response.headers)
+
+				# 需要裁剪时同时在内存中保留下载的内容，裁剪时不必重新读取文件
+				buffer = (bytearray(part_file.read_bytes()) if offset else bytearray()) if crop else None
+
+				with open(part_file, 'ab' if offset else 'wb') as f:
+					with tqdm(total=total_size, initial=offset, unit='B', unit_scale=True, desc=_('媒体文件 - ') + media_file.name, leave=False, ncols=80, bar_format='{l_bar}{bar}| {n_fmt}/{total_fmt}', disable=not progress) as pbar:
+						for chunk in response.iter_content(chunk_size=chunk_size):
+							if chunk:
+								f.write(chunk)
+								pbar.update(len(chunk))
+
+								if crop:
+									buffer += chunk
+
+				self.timer.record('download', time.perf_counter() - start)
+
+				if not MovieScraper.finish_part_file(part_file, media_file, total_size):
+					continue
+
+				if crop:
+					self.process_cover(buffer, movie_path / config.poster_image)
+
+				return True
+			except (RequestException, Timeout):
+				if retry >= max_retries:
+					return False
+
+		return False
+
+	@staticmethod
+	def part_file(media_file: Path):
+		"""下载过程中使用的临时文件，下载完成后重命名为媒体文件"""
+		return media_file.with_name(media_file.name + '.part')
+
+	@staticmethod
+	def validator_file(part_file: Path):
+		"""保存临时文件对应的ETag或Last-Modified，续传时用于确认服务器上的文件没有变化"""
+		return part_file.with_name(part_file.name + '.validator')
+
+	@staticmethod
+	def resume_headers(part_file: Path):
+		"""
+		根据未完成的临时文件生成续传请求头
+
+		续传请求同时发送If-Range，服务器上的文件已经变化时会返回完整的文件，
+		不会把新文件的剩余部分拼接到旧文件后面；没有保存ETag或Last-Modified的
+		临时文件无法确认是否仍然有效，删除后从头下载
+
+		Args:
+			part_file: 下载过程中使用的临时文件
+
+		Returns:
+			(起始位置, 请求头)，从头下载时请求头为None
+		"""
+		validator_file = MovieScraper.validator_file(part_file)
+
+		try:
+			offset = part_file.stat().st_size
+			validator = validator_file.read_text(encoding='utf-8').strip() if offset else ''
+		except OSError:
+			offset, validator = 0, ''
+
+		if not validator:
+			MovieScraper.discard_part_file(part_file)
+			return 0, None
+
+		return offset, {'Range': f'bytes={offset}-', 'If-Range': validator}
+
+	@staticmethod
+	def save_validator(part_file: Path, headers):
+		"""
+		从头下载时保存响应的ETag或Last-Modified，供下次续传时发送If-Range
+
+		弱ETag不能用于If-Range，此时使用Last-Modified；两者都没有时不保存，
+		中断后的临时文件不会被续传
+
+		Args:
+			part_file: 下载过程中使用的临时文件
+			headers: 响应头
+		"""
+		validator_file = MovieScraper.validator_file(part_file)
+		etag = headers.get('etag')
+		validator = etag if etag and not etag.startswith('W/') else headers.get('last-modified')
+
+		if validator:
+			validator_file.write_text(validator, encoding='utf-8')
+		else:
+			validator_file.unlink(missing_ok=True)
+
+	@staticmethod
+	def discard_part_file(part_file: Path):
+		"""删除无法续传的临时文件及其保存的ETag或Last-Modified"""
+		part_file.unlink(missing_ok=True)
+		MovieScraper.validator_file(part_file).unlink(missing_ok=True)
+
+	@staticmethod
+	def parse_download_range(status: int, headers, offset: int):
+		"""
+		根据响应确定本次下载的起始位置和文件的完整大小
+
+		Args:
+			status: 响应状态码
+			headers: 响应头
+			offset: 请求的起始位置，0表示请求完整的文件
+
+		Returns:
+			(起始位置, 完整大小)，服务器没有接受续传请求时起始位置为0，需要从头写入；
+			无法确定大小（如内容经过压缩）时完整大小为None；
+			服务器返回的范围与请求不一致时返回None
+		"""
+		length = headers.get('content-length')
+		# 压缩传输时 content-length 是压缩后的大小，与写入的文件大小无法比较
+		compressed = headers.get('content-encoding', 'identity') != 'identity'
+
+		if status != 206:
+			return 0, int(length) if length and not compressed else None
+
+		match = re.fullmatch(r'bytes (\d+)-(\d+)/(\d+|\*)', headers.get('content-range', '').strip())
+
+		if not match or int(match[1]) != offset:
+			return None
+
+		if match[3] != '*':
+			return offset, int(match[3])
+
+		return offset, offset + int(length) if length and not compressed else None
+
+	@staticmethod
+	def finish_part_file(part_file: Path, media_file: Path, total_size: int):
+		"""
+		检查下载的大小，完整时将临时文件重命名为媒体文件
+
+		Args:
+			part_file: 下载过程中使用的临时文件
+			media_file: 媒体文件路径
+			total_size: 文件的完整大小，未知时为None
+
+		Returns:
+			下载完整返回True，否则返回False，未完成的临时文件保留用于续传
+		"""
+		size = part_file.stat().st_size
+
+		if total_size is not None and size != total_size:
+			# 超出预期大小的文件无法续传，需要重新下载
+			if size > total_size:
+				MovieScraper.discard_part_file(part_file)
+
+			return False
+
+		os.replace(part_file, media_file)
+		MovieScraper.validator_file(part_file).unlink(missing_ok=True)
+		return True
+
+	def fetch_media_batch(self, movie_path: Path, media_list: list[tuple[str, str]]):
+		"""
+		并发下载同一部影片的多个媒体文件（剧照、预告片等）
+
+		每个文件仍由fetch_media下载，保持相同的重试和退避策略，
+		同一主机的并发连接数受config.media_connections_per_host限制
+
+		Args:
+			movie_path: 媒体文件保存路径
+			media_list: 由(媒体文件名, 下载地址)组成的列表
+
+		Returns:
+			下载成功的文件数量
+		"""
+		if not media_list:
+			return 0
+
+		def fetch(media_file: str, url: str):
+			with self.__host_semaphore(url):
+				return self.fetch_media(movie_path, media_file, url, progress=False)
+
+		succeeded = 0
+		max_workers = min(len(media_list), config.media_download_workers)
+
+		with tqdm(total=len(media_list), unit='个', desc=_('正在下载剧照和预告片'), leave=False, ncols=80, bar_format='{l_bar}{bar}| {n_fmt}/{total_fmt}') as pbar:
+			with ThreadPoolExecutor(max_workers=max_workers) as executor:
+				futures = [executor.submit(fetch, media_file, url) for media_file, url in media_list]
+
+				for future in as_completed(futures):
+					if future.result():
+						succeeded += 1
+					pbar.update()
+
+		return succeeded
+
+	def __host_semaphore(self, url: str):
+		"""
+		获取指定地址所属主机的并发信号量
+
+		Args:
+			url: 下载地址
+
+		Returns:
+			该主机专用的信号量
+		"""
+		host = urllib.parse.urlsplit(url).netloc
+
+		with self.__host_semaphores_guard:
+			if host not in self.__host_semaphores:
+				self.__host_semaphores[host] = threading.Semaphore(config.media_connections_per_host)
+
+			return self.__host_semaphores[host]
+
+	def process_cover(self, content: bytes, dest_file: Path):
+		"""
+		根据封面图片生成海报图片
+
+		设置了image_processor时交给进程池处理并立即返回，调用方在需要海报图片时
+		使用image_processor.wait()等待，否则在当前线程中裁剪
+
+		Args:
+			content: 封面图片内容
+			dest_file: 海报图片保存路径
+		"""
+		if self.image_processor:
+			self.image_processor.submit(content, dest_file, config.thumbnail_widths, config.thumbnail_image)
+		else:
+			with self.timer.measure('image'):
+				self.crop_image(content, dest_file)
+
+	def crop_image(self, source: Path | bytes, dest_file: Path):
+		"""
+		裁剪图片以提取右侧的海报区域，并按config.thumbnail_widths生成缩略图
+
+		只解码一次源图片并只编码裁剪后的图片，源图片文件保持下载时的原始内容
+
+		Args:
+			source: 输入图片文件路径，或已下载到内存中的图片内容
+			dest_file: 输出图片文件路径
+		"""
+		ImageProcessor.crop_poster(source, dest_file, config.thumbnail_widths, config.thumbnail_image)
+
+
+class AsyncMovieScraper():
+	"""
+	基于 asyncio 的异步抓取器，提供与MovieScraper相同的fetch_data/fetch_media接口
+
+	所有请求在同一个事件循环中执行，每个主机的并发连接数由信号量限制，
+	媒体文件以流式方式写入磁盘。影片的解析和整理仍由工作线程完成，
+	同时处理的影片数量取决于工作线程数，异步引擎只负责其中的网络请求。
+	登录会话、页面缓存和图片裁剪沿用同步抓取器中的实现，依赖可选的 aiohttp 库
+	"""
+	def __init__(self, scraper: MovieScraper):
+		"""
+		Args:
+			scraper: 提供登录会话、页面缓存和图片裁剪的同步抓取器
+		"""
+		self.scraper = scraper
+		self.__session = None
+		self.__host_semaphores: dict[str, asyncio.Semaphore] = {}
+
+	@staticmethod
+	def is_available():
+		"""检查是否已安装异步引擎依赖的 aiohttp 库"""
+		import importlib.util
+		return importlib.util.find_spec('aiohttp') is not None
+
+	async def __aenter__(self):
+		import aiohttp
+		from yarl import URL
+
+		connector = aiohttp.TCPConnector(limit=config.http_pool_size * 4)
+		self.__session = aiohttp.ClientSession(headers=MovieScraper.REQUESTS_HEADERS, connector=connector)
+
+		# 复制已登录会话的 Cookie，保持与同步抓取器相同的登录状态
+		for cookie in self.scraper.session.cookies:
+			domain = (cookie.domain or urllib.parse.urlsplit(config.base_url).netloc).lstrip('.')
+			self.__session.cookie_jar.update_cookies(
+				{cookie.name: cookie.value},
+				response_url=URL(f'https://{domain}{cookie.path or "/"}')
+			)
+
+		return self
+
+	async def __aexit__(self, *exc_info):
+		await self.__session.close()
+
+	def __host_semaphore(self, url: str):
+		"""获取指定地址所属主机的并发信号量"""
+		host = urllib.parse.urlsplit(url).netloc
+
+		if host not in self.__host_semaphores:
+			self.__host_semaphores[host] = asyncio.Semaphore(config.async_connections_per_host)
+
+		return self.__host_semaphores[host]
+
+	async def fetch_data(self, url: str, max_retries: int=3, initial_timeout: int=30, backoff_factor: int=2, raw: bool=False):
+		"""
+		异步获取指定网站的文本内容，支持重试操作
+
+		Args:
+			url: 目标网址
+			max_retries: 最大重试次数，默认3次
+			initial_timeout: 初始超时时间（秒），默认30秒
+			backoff_factor: 退避因子，默认2
+			raw: 是否返回未解码的字节内容，默认False
+
+		Returns:
+			响应内容文本（raw为True时为字节内容），所有重试失败则返回None
+		"""
+		import aiohttp
+
+		cache = self.scraper.cache
+		rate_limiter = self.scraper.rate_limiter
+		headers = {}
+		# 页面缓存基于 SQLite，读写放到线程中执行，避免阻塞事件循环中的其他请求
+		cached = await asyncio.to_thread(cache.get, url) if cache else None
+
+		if cached:
+			if cached['fresh']:
+				return await asyncio.to_thread(cache.hit, url, cached, raw=raw)
+
+			headers = ResponseCache.validators(cached)
+
+		for retry in range(1, max_retries + 1):
+			current_timeout = initial_timeout * (backoff_factor ** (retry - 1))
+
+			if retry > 1:
+				print(_('第 {retry}/{retries} 次尝试（超时时间: {timeout} 秒）')
+					.format(retry=retry, retries=max_retries, timeout=current_timeout))
 
 			try:
-				if self.__session:
-					response =  self.__session.get(url=url, headers=self.REQUESTS_HEADERS, timeout=current_timeout)
-				else:
-					response = requests.get(url=url, headers=self.REQUESTS_HEADERS, timeout=current_timeout)
+				if rate_limiter:
+					await rate_limiter.acquire_async(url)
 
-				response.encoding = 'utf-8' # response.apparent_encoding
-				response.raise_for_status()
+				async with self.__host_semaphore(url):
+					async with self.__session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=current_timeout)) as response:
+						if rate_limiter:
+							rate_limiter.feedback(url, response.status, response.headers.get('Retry-After'))
 
-				return response.text
-			except (RequestException, Timeout):
+						if cached and response.status == 304:
+							return await asyncio.to_thread(cache.hit, url, cached, revalidated=True, raw=raw)
+
+						response.raise_for_status()
+						content = await response.read()
+
+				if cache and not MovieScraper.is_sign_in_url(response.url):
+					await asyncio.to_thread(cache.store, url, content, response.headers)
+
+				return content if raw else content.decode('utf-8', errors='replace')
+			except (aiohttp.ClientError, asyncio.TimeoutError):
 				if retry >= max_retries:
 					return
 
-	def fetch_media(self, movie_path: Path, media_file: str, url: str, crop: bool=False, max_retries=3, initial_timeout=30, backoff_factor=2):
+	async def fetch_media(self, movie_path: Path, media_file: str, url: str, crop: bool=False, max_retries=3, initial_timeout=30, backoff_factor=2, progress: bool=True):
 		"""
-		下载影片相关媒体文件（包含影片封面图片、剧照、预告片等）
-
-		从指定地址下载影片媒体文件，支持重试机制，并显示下载进度
+		异步下载影片相关媒体文件，以流式方式写入磁盘
 
 		Args:
 			movie_path: 媒体文件保存路径
@@ -584,10 +3290,17 @@ class MovieScraper():
 			max_retries: 最大重试次数，默认3次
 			initial_timeout: 初始超时时间（秒），默认30秒
 			backoff_factor: 退避因子，用于指数退避算法，默认2
+			progress: 是否显示单个文件的下载进度条，默认True
 
 		Returns:
 			下载和裁剪成功返回True，失败则返回False
 		"""
+		import aiohttp
+
+		media_file = movie_path / media_file
+		part_file = MovieScraper.part_file(media_file)
+		rate_limiter = self.scraper.rate_limiter
+
 		for retry in range(1, max_retries + 1):
 			current_timeout = initial_timeout * (backoff_factor ** (retry - 1))
 
@@ -596,50 +3309,101 @@ class MovieScraper():
 					.format(retry=retry, retries=max_retries, timeout=current_timeout))
 
 			try:
-				response = requests.get(url, stream=True, timeout=current_timeout)
-				response.raise_for_status()
+				if rate_limiter:
+					await rate_limiter.acquire_async(url)
 
-				# 获取文件大小
-				total_size = int(response.headers.get('content-length', 0))
-				chunk_size = 8192
+				offset, headers = MovieScraper.resume_headers(part_file)
+				start = time.perf_counter()
 
-				media_file = movie_path / media_file
-				with open(media_file, 'wb') as f:
-					with tqdm(total=total_size, unit='B', unit_scale=True, desc=_('媒体文件 - ') + media_file.name, leave=False, ncols=80, bar_format='{l_bar}{bar}| {n_fmt}/{total_fmt}') as pbar:
-						for chunk in response.iter_content(chunk_size=chunk_size):
-							if chunk:
-								f.write(chunk)
-								pbar.update(len(chunk))
+				async with self.__host_semaphore(url):
+					async with self.__session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=current_timeout)) as response:
+						if rate_limiter:
+							rate_limiter.feedback(url, response.status, response.headers.get('Retry-After'))
+
+						if offset and response.status == 416:
+							MovieScraper.discard_part_file(part_file)
+							continue
+
+						response.raise_for_status()
+						download_range = MovieScraper.parse_download_range(response.status, response.headers, offset)
+
+						if download_range is None:
+							MovieScraper.discard_part_file(part_file)
+							continue
+
+						offset, total_size = download_range
+
+						if not offset:
+							MovieScraper.save_validator(part_file, response.headers)
+						buffer = (bytearray(part_file.read_bytes()) if offset else bytearray()) if crop else None
+
+						with open(part_file, 'ab' if offset else 'wb') as f:
+							with tqdm(total=total_size, initial=offset, unit='B', unit_scale=True, desc=_('媒体文件 - ') + media_file.name, leave=False, ncols=80, bar_format='{l_bar}{bar}| {n_fmt}/{total_fmt}', disable=not progress) as pbar:
+								async for chunk in response.content.iter_chunked(8192):
+									f.write(chunk)
+									pbar.update(len(chunk))
+
+									if crop:
+										buffer += chunk
+
+				self.scraper.timer.record('download', time.perf_counter() - start)
+
+				if not MovieScraper.finish_part_file(part_file, media_file, total_size):
+					continue
 
 				if crop:
-					self.crop_image(media_file, movie_path / config.poster_image)
+					await asyncio.to_thread(self.scraper.process_cover, buffer, movie_path / config.poster_image)
 
 				return True
-			except (RequestException, Timeout):
+			except (aiohttp.ClientError, asyncio.TimeoutError):
 				if retry >= max_retries:
 					return False
 
-	def crop_image(self, src_file: Path, dest_file: Path):
+		return False
+
+	async def fetch_media_batch(self, movie_path: Path, media_list: list[tuple[str, str]]):
 		"""
-		裁剪图片以提取右侧指定区域
+		异步并发下载同一部影片的多个媒体文件
 
 		Args:
-			src_file: 输入图片文件路径
-			dest_file: 输出图片文件路径
+			movie_path: 媒体文件保存路径
+			media_list: 由(媒体文件名, 下载地址)组成的列表
+
+		Returns:
+			下载成功的文件数量
 		"""
-		from PIL import Image
+		if not media_list:
+			return 0
 
-		with Image.open(src_file) as source_img:
-			width, height = source_img.size
+		with tqdm(total=len(media_list), unit='个', desc=_('正在下载剧照和预告片'), leave=False, ncols=80, bar_format='{l_bar}{bar}| {n_fmt}/{total_fmt}') as pbar:
+			async def fetch(media_file: str, url: str):
+				result = await self.fetch_media(movie_path, media_file, url, progress=False)
+				pbar.update()
+				return result
 
-			left = width - 379
-			top = 0
-			right = width
-			bottom = height
+			results = await asyncio.gather(*(fetch(media_file, url) for media_file, url in media_list))
 
-			cropped_img = source_img.crop((left, top, right, bottom))
-			cropped_img.save(dest_file, format='JPEG')
-			source_img.save(src_file, format='JPEG')
+		return sum(results)
+
+	def blocking(self):
+		"""
+		生成供工作线程调用的同步接口，请求仍在当前事件循环中执行
+
+		Returns:
+			包含fetch_data、fetch_media和fetch_media_batch同步方法的对象
+		"""
+		loop = asyncio.get_running_loop()
+
+		def wrap(coroutine_function):
+			def call(*args, **kwargs):
+				return asyncio.run_coroutine_threadsafe(coroutine_function(*args, **kwargs), loop).result()
+			return call
+
+		return SimpleNamespace(
+			fetch_data=wrap(self.fetch_data),
+			fetch_media=wrap(self.fetch_media),
+			fetch_media_batch=wrap(self.fetch_media_batch),
+		)
 #endregion
 
 
@@ -647,6 +3411,15 @@ class DVHelper(MovieScraper):
 	"""DV助手主类，协调各模块完成影片信息获取和整理工作"""
 	def __init__(self):
 		super().__init__()
+		self.journal = ResumeJournal()
+		self.library: LibraryIndex = None
+		self.catalog: MovieCatalog = None
+		self.id_extractor = MovieIdExtractor(config.movie_id_rules, config.ignored_movie_pattern)
+		# 没有线程持有或等待的锁会被自动移除，长时间运行时不会随处理的影片数量增长
+		self.__path_locks: weakref.WeakValueDictionary[Path, threading.Lock] = weakref.WeakValueDictionary()
+		self.__path_locks_guard = threading.Lock()
+		self.__movie_paths: dict[Path, dict[str, Path]] = {}
+		self.__movie_paths_lock = threading.Lock()
 
 	def organize_folders(self, root_dir: Path):
 		"""
@@ -655,17 +3428,13 @@ class DVHelper(MovieScraper):
 		Args:
 			root_dir: 要整理的根目录
 		"""
-		# 构建反向别名映射表，用于快速查找固定名称
-		reverse_alias_map = {}
-		for fixed_name, aliases in config.actress_alias.items():
-			for alias in aliases:
-				reverse_alias_map[alias] = fixed_name
+		alias_index = config.actress_alias_index
 
 		# 收集所有子目录中的需要处理的文件夹
 		def collect_folders_recursive(directory: Path):
 			for item in directory.iterdir():
 				if item.is_dir():
-					fixed_name = reverse_alias_map.get(item.name)
+					fixed_name = alias_index.get(item.name)
 
 					if fixed_name:
 						if item.name == fixed_name:
@@ -773,153 +3542,469 @@ class DVHelper(MovieScraper):
 				source_movie.rename(target_folder / source_movie.name)
 				logger.info(_('已移动视频文件: ') + source_movie.name)
 
-		# 移动源文件夹中的非视频文件
-		for item in source_folder.iterdir():
-			if item.is_file() and not any(item.name.lower().endswith(ext) for ext in config.movie_file_extensions):
-				target_item = target_folder / item.name
+		# 移动源文件夹中的非视频文件
+		for item in source_folder.iterdir():
+			if item.is_file() and not any(item.name.lower().endswith(ext) for ext in config.movie_file_extensions):
+				target_item = target_folder / item.name
+
+				if not target_item.exists():
+					item.rename(target_item)
+				else:
+					item.unlink()
+
+		try:
+			source_folder.rmdir()
+			logger.info(_('已删除源影片文件夹: ') + str(source_folder))
+		except Exception:
+			logger.error(_('无法删除源影片文件夹: ') + str(source_folder))
+
+	def analyze_keyword(self, keyword: str):
+		"""
+		从已知信息中分析并提取影片ID
+
+		Args:
+			keyword: 已知的影片名称或关键词
+
+		Returns:
+			提取的影片ID，否则返回None
+		"""
+		return self.id_extractor.extract(keyword)
+
+	def list_video_files(self, root_dir: Path, max_depth: int=0):
+		"""
+		在指定目录中搜索视频文件
+
+		Args:
+			root_dir: 根目录路径
+			max_depth: 最大搜索深度，0表示仅搜索当前目录
+
+		Returns:
+			符合条件的视频文件路径列表
+		"""
+		return list(self.iter_video_files(root_dir, max_depth))
+
+	def iter_video_files(self, root_dir: Path, max_depth: int=0):
+		"""
+		在指定目录中逐个查找视频文件
+
+		使用 os.scandir 遍历目录，每读完一个目录就产生其中的视频文件，调用方可以
+		在遍历完成之前开始处理；超过最大搜索深度的子目录不会被读取
+
+		Args:
+			root_dir: 根目录路径
+			max_depth: 最大搜索深度，0表示仅搜索当前目录
+
+		Returns:
+			视频文件路径的生成器，同一目录中的文件先于其子目录中的文件产生
+		"""
+		max_depth = max_depth if max_depth >= 0 else 1
+		extensions = frozenset(ext.lower() for ext in config.movie_file_extensions)
+		exclude_path = frozenset(config.exclude_path)
+		pending = [(os.fspath(root_dir), 0)]
+
+		while pending:
+			dir_path, depth = pending.pop()
+			sub_dirs = []
+			video_files = []
+
+			try:
+				with os.scandir(dir_path) as entries:
+					for entry in entries:
+						try:
+							is_dir = entry.is_dir()
+						except OSError:
+							continue
+
+						if is_dir:
+							# 与 os.walk 一致，不进入指向目录的符号链接
+							if depth < max_depth and entry.name not in exclude_path and not entry.is_symlink():
+								sub_dirs.append(entry.path)
+						elif not entry.name.startswith(config.ignored_file_prefix) and \
+							os.path.splitext(entry.name)[1].lower() in extensions:
+							video_files.append(entry.path)
+			except OSError:
+				# 无法读取的目录直接跳过
+				continue
+
+			# 读完目录并关闭句柄后再产生文件，调用方处理时移动文件不会影响正在进行的遍历
+			yield from map(Path, video_files)
+			pending.extend((sub_dir, depth + 1) for sub_dir in reversed(sub_dirs))
+
+	def batch_process(self, keywords: Iterable[str], *, gallery: bool=False, dir_mode: bool=False, root_dir: Path=None, jobs: int=1, use_async: bool=False, refresh_metadata: bool=False):
+		"""
+		处理影片的信息搜索与整理
+
+		根据关键词列表或目录路径批量处理影片文件，包括搜索影片信息、下载封面图片、
+		剧照、预告片、生成 NFO 文件并按演员分类整理文件结构
+
+		Args:
+			keywords: 搜索关键词或文件路径的列表，也可以是iter_video_files返回的生成器，
+				此时边查找边处理，影片总数在处理完成后才能确定
+			gallery: 是否下载剧照和预告片，默认为False
+			dir_mode: 是否为目录模式，默认为False
+			root_dir: 目录模式下的根目录，默认为None
+			jobs: 同时处理的影片数量，默认为1（逐部处理）
+			use_async: 是否使用异步引擎执行网络请求，默认为False
+			refresh_metadata: 是否忽略已整理影片目录中的NFO文件重新获取影片信息，默认为False
+		"""
+		if dir_mode:
+			assert root_dir is not None, _('目录模式下必须提供根目录路径')
+
+		failed_movies  = []
+		ignored_movies = []
+		items = []
+		total = len(keywords) if isinstance(keywords, Sized) else None
+		options = {'gallery': gallery, 'dir_mode': dir_mode, 'root_dir': root_dir, 'refresh_metadata': refresh_metadata}
+
+		def enumerate_items():
+			"""依次产生 (序号, 关键词)，并记录已经取出的关键词用于汇总结果"""
+			for index, item in enumerate(keywords, 1):
+				items.append(item)
+				yield index, item
+
+		if use_async and not AsyncMovieScraper.is_available():
+			logger.warning(_('未安装 aiohttp，将使用同步引擎处理影片'))
+			use_async = False
+
+		# 并发处理时海报图片交给进程池处理，不占用下载线程；只有一个 CPU 时进程池不会更快
+		own_processor = jobs > 1 and self.image_processor is None and config.image_workers > 0 and (os.cpu_count() or 1) > 1
+
+		if own_processor:
+			self.image_processor = ImageProcessor(config.image_workers, config.image_queue_size, self.timer)
+
+		try:
+			if use_async:
+				results = asyncio.run(self.__process_movies_async(enumerate_items(), total, jobs, options))
+			elif jobs > 1:
+				executor = ThreadPoolExecutor(max_workers=jobs)
+
+				try:
+					# 每取出一个关键词就立即提交，工作线程不必等待目录遍历完成
+					futures = [executor.submit(self.__process_movie, index, total, item, **options)
+								for index, item in enumerate_items()]
+					results = [future.result() for future in futures]
+				finally:
+					# 中断时取消尚未开始的任务，正在处理的影片会继续完成
+					executor.shutdown(wait=True, cancel_futures=True)
+			else:
+				results = [self.__process_movie(index, total, item, **options)
+							for index, item in enumerate_items()]
+		finally:
+			if own_processor:
+				self.image_processor.close()
+				self.image_processor = None
+
+		total = len(items)
+
+		# 按原始顺序汇总结果，保证并发模式下的输出与逐部处理一致
+		for item, status in zip(items, results):
+			if status == 'failed':
+				failed_movies.append(item)
+			elif status == 'ignored':
+				ignored_movies.append(Path(item))
+
+		print()
+		logger.info(_('处理完成，共搜索整理 {count} 部影片，其中 {failed} 部影片获取信息失败')
+			.format(count=total, failed=len(failed_movies)))
+
+		if failed_movies:
+			print(_('获取信息失败的影片文件:'))
+			for index, movie in enumerate(failed_movies, 1):
+				print(f'    {index}.{Path(movie).relative_to(root_dir) if dir_mode else movie}')
+
+		if ignored_movies:
+			print(_('已忽略的影片文件:'))
+			for index, movie in enumerate(ignored_movies, 1):
+				print(f'    {index}.{Path(movie).relative_to(root_dir) if dir_mode else movie}')
+
+		if self.cache:
+			logger.info(_('页面缓存命中 {hits} 次（其中 {revalidated} 次经服务器验证），未命中 {misses} 次')
+				.format(hits=self.cache.hits, revalidated=self.cache.revalidated, misses=self.cache.misses))
+
+		if self.rate_limiter:
+			for host, stats in self.rate_limiter.stats().items():
+				logger.info(_('{host}: 共 {requests} 次请求，限速等待 {throttled:.1f} 秒，被服务器限流 {limited} 次，当前速率 {rate:.2f} 次/秒')
+					.format(host=host, **stats))
+
+		self.log_stage_times()
+
+	def log_stage_times(self):
+		"""输出下载和图片处理各阶段的累计耗时"""
+		stages = self.timer.stats()
+
+		if 'download' in stages:
+			logger.info(_('下载 {count} 个文件累计耗时 {seconds:.1f} 秒').format(count=stages['download'][0], seconds=stages['download'][1]))
+
+		if 'image' in stages:
+			logger.info(_('处理 {count} 张图片累计耗时 {seconds:.1f} 秒，等待图片处理队列 {waited:.1f} 秒')
+				.format(count=stages['image'][0], seconds=stages['image'][1], waited=stages.get('image_wait', (0, 0.0))[1]))
+
+	async def __process_movies_async(self, items: Iterable[tuple[int, str]], total: int, jobs: int, options: dict):
+		"""
+		使用异步引擎处理影片
+
+		影片的处理流程仍在工作线程中执行，其中的网络请求全部交给同一个
+		事件循环中的异步抓取器完成
+
+		Args:
+			items: (序号, 搜索关键词或文件路径) 的可迭代对象
+			total: 影片总数，未知时为None
+			jobs: 同时处理的影片数量
+			options: 传递给__process_movie的处理选项
+
+		Returns:
+			按原始顺序排列的处理结果列表
+		"""
+		loop = asyncio.get_running_loop()
+
+		async with AsyncMovieScraper(self) as engine:
+			scraper = engine.blocking()
+			executor = ThreadPoolExecutor(max_workers=jobs)
+
+			try:
+				tasks = []
+
+				for index, item in items:
+					tasks.append(loop.run_in_executor(executor, functools.partial(
+						self.__process_movie, index, total, item, scraper=scraper, **options)))
+					# 遍历目录时让出事件循环，已提交的影片可以同时发出请求
+					await asyncio.sleep(0)
+
+				return await asyncio.gather(*tasks)
+			finally:
+				# 工作线程依赖事件循环完成请求，不能在事件循环中等待线程结束
+				executor.shutdown(wait=False, cancel_futures=True)
+
+	def process_movie(self, index: int, total: int, item: str, *, gallery: bool=False, dir_mode: bool=False, root_dir: Path=None, refresh_metadata: bool=False):
+		"""
+		处理单部影片，供常驻服务等需要自行调度影片的调用方使用
+
+		Args:
+			index: 影片序号
+			total: 影片总数，未知时为None
+			item: 搜索关键词或文件路径
+			gallery: 是否下载剧照和预告片，默认为False
+			dir_mode: 是否为目录模式，默认为False
+			root_dir: 目录模式下的根目录，默认为None
+			refresh_metadata: 是否忽略已整理影片目录中的NFO文件重新获取影片信息，默认为False
+
+		Returns:
+			处理结果，'done' 表示完成，'failed' 表示失败，'ignored' 表示已忽略
+		"""
+		return self.__process_movie(index, total, item, gallery=gallery, dir_mode=dir_mode, root_dir=root_dir,
+									refresh_metadata=refresh_metadata)
+
+	def __lock_path(self, path: Path):
+		"""
+		获取指定路径对应的锁
 
-				if not target_item.exists():
-					item.rename(target_item)
-				else:
-					item.unlink()
+		并发处理时，多个影片文件可能解析到同一个影片目录，需要串行写入
 
-		try:
-			source_folder.rmdir()
-			logger.info(_('已删除源影片文件夹: ') + str(source_folder))
-		except Exception:
-			logger.error(_('无法删除源影片文件夹: ') + str(source_folder))
+		Args:
+			path: 需要加锁的路径
 
-	def analyze_keyword(self, keyword: str):
+		Returns:
+			该路径专用的线程锁，调用方需要在使用期间保持引用
 		"""
-		从已知信息中分析并提取影片ID
+		with self.__path_locks_guard:
+			return self.__path_locks.setdefault(path, threading.Lock())
+
+	def __movie_path_index(self, base_dir: Path):
+		"""
+		获取整理完成目录中 影片编号 到 影片目录 的映射
+
+		首次使用时扫描一次 演员/[影片编号](年份) 两级目录，之后新整理的影片通过
+		__record_movie_path补充。扫描在锁外进行，不会阻塞其它目录的查询；
+		多个线程同时扫描同一目录时只保留最先完成的结果
 
 		Args:
-			keyword: 已知的影片名称或关键词
+			base_dir: 整理完成的影片所在目录
 
 		Returns:
-			提取的影片ID，否则返回None
+			以大写影片编号为键的影片目录字典，只能在持有__movie_paths_lock时修改
 		"""
-		keyword = config.ignored_movie_pattern.sub('', keyword).upper()
+		with self.__movie_paths_lock:
+			movie_paths = self.__movie_paths.get(base_dir)
 
-		if 'FC2' in keyword:
-			match = config.fc2_movie_pattern.search(keyword)
-			if match:
-				return f'FC2-{match.group(2)}'
-		elif '259LUXU' in keyword:
-			match = config._259luxu_movie_pattern.search(keyword)
-			if match:
-				return f'259LUXU-{match.group(1)}'
-		elif '200GANA' in keyword:
-			match = config._200gana_movie_pattern.search(keyword)
-			if match:
-				return f'200GANA-{match.group(1)}'
-		elif '300MIUM' in keyword:
-			match = config._300mium_movie_pattern.search(keyword)
-			if match:
-				return f'300MIUM-{match.group(1)}'
-		else:
-			match = config.normal_movie_pattern.search(keyword)
-			if match:
-				return match.group(1) + '-' + match.group(2)
+		if movie_paths is not None:
+			return movie_paths
 
-			match = config.normal_movie_pattern2.search(keyword)
-			if match:
-				return match.group(1) + '-' + match.group(2)
+		movie_paths = {}
 
-	def list_video_files(self, root_dir: Path, max_depth: int=0):
+		try:
+			actress_dirs = [entry.path for entry in os.scandir(base_dir) if entry.is_dir()]
+		except OSError:
+			actress_dirs = []
+
+		for actress_dir in actress_dirs:
+			try:
+				with os.scandir(actress_dir) as entries:
+					for entry in entries:
+						match = config.movie_dir_pattern.fullmatch(entry.name)
+
+						if match and entry.is_dir():
+							movie_paths.setdefault(match[1].upper(), Path(entry.path))
+			except OSError:
+				continue
+
+		with self.__movie_paths_lock:
+			return self.__movie_paths.setdefault(base_dir, movie_paths)
+
+	def __record_movie_path(self, base_dir: Path, number: str, movie_path: Path):
 		"""
-		在指定目录中搜索视频文件
+		将新整理的影片目录加入映射
+
+		同一影片已有的目录仍然存在时保留原来的目录，已被移走或删除时替换为新目录
 
 		Args:
-			root_dir: 根目录路径
-			max_depth: 最大搜索深度，0表示仅搜索当前目录
+			base_dir: 整理完成的影片所在目录
+			number: 影片编号
+			movie_path: 影片目录
+		"""
+		movie_paths = self.__movie_path_index(base_dir)
+		key = number.upper()
+
+		with self.__movie_paths_lock:
+			current = movie_paths.get(key)
+
+			if current is None or not current.is_dir():
+				movie_paths[key] = movie_path
+
+	def __load_organized_movie(self, base_dir: Path, movie_id: str, gallery: bool):
+		"""
+		读取已整理的影片目录中的影片信息，代替重新搜索和获取影片详情
+
+		目录中的NFO文件、封面和海报图片都存在时才能复用。需要剧照时目录中还必须有
+		剧照下载完成的标记文件，或者已有剧照（没有标记文件的旧目录）
+
+		Args:
+			base_dir: 整理完成的影片所在目录
+			movie_id: 影片ID
+			gallery: 是否下载剧照和预告片
 
 		Returns:
-			符合条件的视频文件路径列表
+			(影片信息, 影片目录)，无法复用时返回None
 		"""
-		found_files = []
-		root_depth = len(root_dir.absolute().parts)
-		max_depth = max_depth if max_depth >= 0 else 1
+		movie_path = self.__movie_path_index(base_dir).get(movie_id.upper())
 
-		for dirpath, dirnames, filenames in os.walk(root_dir, topdown=True):
-			current_depth = len(Path(dirpath).absolute().parts) - root_depth
+		if movie_path is None:
+			return None
 
-			if current_depth > max_depth:
-				continue
+		if not all((movie_path / name).exists() for name in (config.fanart_image, config.poster_image)):
+			return None
 
-			# 排除指定名称的文件夹
-			dirnames[:] = [dir_name for dir_name in dirnames if dir_name not in config.exclude_path]
+		if gallery and not ((movie_path / config.gallery_marker).exists() or any(movie_path.glob('gallery_*'))):
+			return None
 
-			for filename in filenames:
-				if filename.startswith(config.ignored_file_prefix):
-					continue
+		number = config.movie_dir_pattern.fullmatch(movie_path.name)[1]
+		movie_info = NFOParser.parse(movie_path / f'{number}.nfo')
+
+		return (movie_info, movie_path) if movie_info else None
 
-				if any(filename.lower().endswith(ext) for ext in config.movie_file_extensions):
-					found_files.append(Path(dirpath) / filename)
+	def __process_movie(self, index: int, total: int, item: str, *, dir_mode: bool, **options):
+		"""
+		处理单部影片，目录模式下将处理结果记录到媒体库索引
 
-		return found_files
+		Args:
+			index: 影片序号
+			total: 影片总数
+			item: 搜索关键词或文件路径
+			dir_mode: 是否为目录模式
+			options: 传递给__process_movie_steps的其它处理选项
 
-	def batch_process(self, keywords: list[str], *, gallery: bool=False, dir_mode: bool=False, root_dir: Path=None):
+		Returns:
+			处理结果，'done' 表示完成，'failed' 表示失败，'ignored' 表示已忽略
 		"""
-		处理影片的信息搜索与整理
+		status = self.__process_movie_steps(index, total, item, dir_mode=dir_mode, **options)
 
-		根据关键词列表或目录路径批量处理影片文件，包括搜索影片信息、下载封面图片、
-		剧照、预告片、生成 NFO 文件并按演员分类整理文件结构
+		if dir_mode and self.library is not None:
+			self.library.record(item, self.id_extractor.extract(Path(item).name), status)
+
+		return status
+
+	def __process_movie_steps(self, index: int, total: int, item: str, *, gallery: bool, dir_mode: bool, root_dir: Path, refresh_metadata: bool=False, scraper=None):
+		"""
+		处理单部影片的信息搜索与整理
 
 		Args:
-			keywords: 搜索关键词列表或文件路径列表
-			gallery: 是否下载剧照和预告片，默认为False
-			dir_mode: 是否为目录模式，默认为False
-			root_dir: 目录模式下的根目录，默认为None
+			index: 影片序号
+			total: 影片总数，未知时为None
+			item: 搜索关键词或文件路径
+			gallery: 是否下载剧照和预告片
+			dir_mode: 是否为目录模式
+			root_dir: 目录模式下的根目录
+			refresh_metadata: 是否忽略已整理影片目录中的NFO文件重新获取影片信息
+			scraper: 提供fetch_data/fetch_media/fetch_media_batch的抓取器，默认为自身
+
+		Returns:
+			处理结果，'done' 表示完成，'failed' 表示失败，'ignored' 表示已忽略
 		"""
-		if dir_mode:
-			assert root_dir is not None, _('目录模式下必须提供根目录路径')
+		scraper = scraper or self
+		keyword = Path(item).name if dir_mode else item
 
-		failed_movies  = []
-		ignored_movies = []
+		print()
+		logger.info((f'[{index}/{total}] ' if total else f'[{index}] ') + _('正在搜索: {keyword}...')
+			.format(keyword=keyword))
 
-		for index, item in enumerate(keywords, 1):
-			keyword = Path(item).name if dir_mode else item
+		journal_key = str(Path(item).absolute()) if dir_mode else item
+		final_step = 'move' if dir_mode else 'nfo'
 
-			print()
-			logger.info(f'[{index}/{len(keywords)}] ' + _('正在搜索: {keyword}...')
-				.format(keyword=keyword))
+		if self.journal.has(journal_key, final_step):
+			logger.info(_('影片已在上次运行中处理完成，跳过'))
+			return self.journal.get(journal_key, final_step)['status']
 
-			movie_id = self.analyze_keyword(keyword)
+		movie_id = self.analyze_keyword(keyword)
 
-			if not movie_id:
-				logger.warning(_('无法解析影片ID，尝试修改文件名后重试'))
-				failed_movies.append(item)
-				continue
+		if not movie_id:
+			logger.warning(_('无法解析影片ID，尝试修改文件名后重试'))
+			return 'failed'
+
+		tqdm_steps = 6 if dir_mode else 5
+		status = 'done'
+		base_dir = (Path(root_dir) if dir_mode else Path.cwd()) / config.completed_path
+		organized = None if refresh_metadata else self.__load_organized_movie(base_dir, movie_id, gallery)
+
+		if organized:
+			logger.info(_('影片已整理，使用影片目录中的 NFO 文件'))
 
-			tqdm_steps = 6 if dir_mode else 5
+		with trange(tqdm_steps, desc=_('处理 ') + movie_id, unit='步',
+					leave=False, ncols=80, bar_format='{l_bar}{bar}|') as step_pbar:
+			#region 1. 搜索影片
+			step_pbar.set_description(_('正在搜索影片'))
+			search_results = self.journal.get(journal_key, 'search')
 
-			with trange(tqdm_steps, desc=_('处理 ') + movie_id, unit='步',
-						leave=False, ncols=80, bar_format='{l_bar}{bar}|') as step_pbar:
-				#region 1. 搜索影片
-				step_pbar.set_description(_('正在搜索影片'))
-				response_text = self.fetch_data(f'{config.search_url}{urllib.parse.quote_plus(movie_id)}')
-				search_results = MovieParser.parse_search_results(response_text, movie_id)
+			if search_results is None and not organized:
+				search_url = f'{config.search_url}{urllib.parse.quote_plus(movie_id)}'
+				response_content = scraper.fetch_data(search_url, raw=True)
+				search_results = MovieParser.parse_search_results(response_content, movie_id)
 
 				if not search_results:
+					# 没有结果可能只是暂时的，不保留缓存，下次运行重新搜索
+					if self.cache:
+						self.cache.discard(search_url)
+
 					logger.warning(_('未找到匹配的影片'))
-					failed_movies.append(item)
-					continue
+					return 'failed'
 
-				step_pbar.update()
-				#endregion
+				self.journal.record(journal_key, 'search', search_results)
 
-				#region 2. 获取影片详情
-				step_pbar.set_description(_('正在获取影片详情'))
-				response_text = self.fetch_data(search_results['detail_url'])
-				movie_details = MovieParser.parse_movie_details(response_text)
+			step_pbar.update()
+			#endregion
+
+			#region 2. 获取影片详情
+			step_pbar.set_description(_('正在获取影片详情'))
+			movie_details = self.journal.get(journal_key, 'details')
+
+			if movie_details is None and not organized:
+				response_content = scraper.fetch_data(search_results['detail_url'], raw=True)
+				movie_details = MovieParser.parse_movie_details(response_content)
 
 				if not movie_details:
-					logger.warning(_('无法获取影片详情'))
-					failed_movies.append(item)
-					continue
+					if self.cache:
+						self.cache.discard(search_results['detail_url'])
 
-				step_pbar.update()
+					logger.warning(_('无法获取影片详情'))
+					return 'failed'
 
 				movie_details.update({
 					'detail_url': search_results['detail_url'],
@@ -927,46 +4012,72 @@ class DVHelper(MovieScraper):
 					'fanart_url': search_results['fanart_url'],
 				})
 
-				movie_info = MovieInfo(movie_details)
-				#endregion
+				self.journal.record(journal_key, 'details', movie_details)
 
-				#region 3. 按演员组织目录结果并创建影片目录
-				step_pbar.set_description(_('正在创建影片目录'))
-				actress_count = len(movie_info.actresses)
+			step_pbar.update()
 
-				if actress_count == 0:
-					dir1 = _('==无名演员==')
-				elif actress_count == 1:
-					dir1 = movie_info.actresses[0]
-				else:
-					dir1 = _('==多演员==')
+			movie_info = organized[0] if organized else MovieInfo(movie_details)
+			#endregion
+
+			#region 3. 按演员组织目录结果并创建影片目录
+			step_pbar.set_description(_('正在创建影片目录'))
+			actress_count = len(movie_info.actresses)
+
+			if actress_count == 0:
+				dir1 = _('==无名演员==')
+			elif actress_count == 1:
+				dir1 = movie_info.actresses[0]
+			else:
+				dir1 = _('==多演员==')
+
+			movie_path = organized[1] if organized else base_dir / dir1 / f'[{movie_info.number}]({movie_info.year})'
 
-				base_dir = (Path(root_dir) if dir_mode else Path.cwd()) / config.completed_path
-				movie_path = base_dir / dir1 / f'[{movie_info.number}]({movie_info.year})'
+			# 演员目录由mkdir(exist_ok=True)保证并发安全，影片目录内的写入需要串行执行
+			with self.__lock_path(movie_path):
 				movie_path.mkdir(parents=True, exist_ok=True)
 				step_pbar.update()
 				#endregion
 
 				#region 4. 下载并处理封面图片
-				step_pbar.set_description(_('正在下载封面') + _('和剧照') if gallery and movie_info.galleries else '')
+				step_pbar.set_description(_('正在下载封面') + (_('和剧照') if gallery and movie_info.galleries else ''))
 
-				if not self.fetch_media(movie_path, config.fanart_image, movie_info.fanart_url, crop=True):
-					logger.warning(_('封面图片下载失败'))
-					failed_movies.append(item)
-					continue
+				cover_fetched = False
+
+				if not ((organized or self.journal.has(journal_key, 'cover')) and (movie_path / config.fanart_image).exists()):
+					if not scraper.fetch_media(movie_path, config.fanart_image, movie_info.fanart_url, crop=True):
+						logger.warning(_('封面图片下载失败'))
+						return 'failed'
+
+					cover_fetched = True
+
+				if gallery and not organized and not self.journal.has(journal_key, 'gallery'):
+					media_list = []
 
-				# 下载剧照
-				if gallery and movie_info.galleries:
+					# 剧照
 					for i, gallery_url in enumerate(movie_info.galleries):
 						root, ext = os.path.splitext(gallery_url.split('?')[0])
 						ext = ext.lower() or '.jpg'
-						self.fetch_media(movie_path, f'gallery_{i:02d}{ext}', gallery_url)
+						media_list.append((f'gallery_{i:02d}{ext}', gallery_url))
 
-				# 下载预告片
-				if gallery and movie_info.trailer_url:
-					root, ext = os.path.splitext(movie_info.trailer_url.split('?')[0])
-					ext = ext.lower() or '.mp4'
-					self.fetch_media(movie_path, f'{movie_info.number}_trailer{ext}', movie_info.trailer_url)
+					# 预告片
+					if movie_info.trailer_url:
+						root, ext = os.path.splitext(movie_info.trailer_url.split('?')[0])
+						ext = ext.lower() or '.mp4'
+						media_list.append((f'{movie_info.number}_trailer{ext}', movie_info.trailer_url))
+
+					if scraper.fetch_media_batch(movie_path, media_list) == len(media_list):
+						# 之后的运行据此判断剧照已经下载，页面没有剧照的影片不会每次重新获取，
+						# 标记文件写入失败只会在下次运行时重新获取剧照
+						with contextlib.suppress(OSError):
+							(movie_path / config.gallery_marker).touch()
+						self.journal.record(journal_key, 'gallery')
+
+				if cover_fetched:
+					# 海报图片在进程池中处理时，与剧照和预告片的下载同时进行
+					if self.image_processor and not self.image_processor.wait(movie_path / config.poster_image):
+						return 'failed'
+
+					self.journal.record(journal_key, 'cover')
 
 				step_pbar.update()
 				#endregion
@@ -974,7 +4085,12 @@ class DVHelper(MovieScraper):
 				#region 5. 生成NFO文件
 				step_pbar.set_description(_('正在生成 NFO 文件'))
 				nfo = NFOGenerator(movie_info)
-				nfo.save(f'{movie_path}/{movie_info.number}.nfo')
+				nfo.save(movie_path / f'{movie_info.number}.nfo')
+				self.__record_movie_path(base_dir, movie_info.number, movie_path)
+
+				if self.catalog is not None:
+					self.catalog.record(movie_info, movie_path)
+				self.journal.record(journal_key, 'nfo', {'status': status})
 				step_pbar.update()
 				#endregion
 
@@ -993,34 +4109,259 @@ class DVHelper(MovieScraper):
 						if old_file_size <= new_file_size:
 							ignored_path = old_path.parent / f'{config.ignored_file_prefix}{old_path.name}'
 							old_path.rename(ignored_path)
-							ignored_movies.append(old_path)
+							status = 'ignored'
 						else:
 							old_path.rename(new_path)
 					else:
 						old_path.rename(new_path)
 
+					self.journal.record(journal_key, 'move', {'status': status})
 					step_pbar.update()
 
-				logger.info(_('影片相关文件已保存至: ') + str(movie_path))
-				#endregion
+			logger.info(_('影片相关文件已保存至: ') + str(movie_path))
+			#endregion
 
-		print()
-		logger.info(_('处理完成，共搜索整理 {count} 部影片，其中 {failed} 部影片获取信息失败')
-			.format(count=len(keywords), failed=len(failed_movies)))
+		return status
 
-		if failed_movies:
-			print(_('获取信息失败的影片文件:'))
-			for index, movie in enumerate(failed_movies, 1):
-				print(f'    {index}.{Path(movie).relative_to(root_dir) if dir_mode else movie}')
 
-		if ignored_movies:
-			print(_('已忽略的影片文件:'))
-			for index, movie in enumerate(ignored_movies, 1):
-				print(f'    {index}.{Path(movie).relative_to(root_dir) if dir_mode else movie}')
+class MovieServer():
+	"""
+	常驻后台的影片处理服务
+
+	在本机 TCP 端口上接收客户端提交的任务，所有任务共用同一个 DVHelper
+	（登录会话、页面缓存、演员别名索引和限速器）以及同一个工作线程池。
+	通信协议为每行一个 JSON 对象: 客户端发送一行请求，服务逐部返回处理结果，
+	最后返回一行汇总。请求中需要带有启动时生成的令牌，令牌保存在只有当前用户
+	可以读取的文件中，同一台机器上的其他用户无法提交任务
+	"""
+	def __init__(self, dv_helper: DVHelper, address: tuple[str, int], jobs: int=1, token: str=None):
+		"""
+		Args:
+			dv_helper: 处理影片使用的 DVHelper 实例
+			address: 监听地址 (主机, 端口)，端口为0时由系统分配
+			jobs: 所有任务共用的工作线程数量
+			token: 客户端需要提供的令牌，默认为None表示不检查
+		"""
+		import socketserver
+
+		server = self
+
+		class RequestHandler(socketserver.StreamRequestHandler):
+			def handle(self):
+				server.handle(self.rfile, self.wfile)
+
+		class ThreadingServer(socketserver.ThreadingTCPServer):
+			allow_reuse_address = True
+			daemon_threads = True
+
+		self.dv_helper = dv_helper
+		self.__token = token
+		self.__counter = itertools.count(1)
+		self.__counter_lock = threading.Lock()
+		self.__executor = ThreadPoolExecutor(max_workers=jobs)
+		self.__server = ThreadingServer(address, RequestHandler)
+
+	@property
+	def address(self) -> tuple[str, int]:
+		return self.__server.server_address[:2]
+
+	def serve_forever(self):
+		self.__server.serve_forever()
+
+	def shutdown(self):
+		"""停止接收新的连接，可以在其它线程中调用"""
+		self.__server.shutdown()
 
+	def close(self):
+		self.__server.server_close()
+		# 中断时取消排队中的影片，正在处理的影片会继续完成
+		self.__executor.shutdown(wait=True, cancel_futures=True)
 
-def get_logger():
+	def handle(self, rfile, wfile):
+		"""
+		处理一个客户端连接
+
+		Args:
+			rfile: 读取请求的二进制文件对象
+			wfile: 写入结果的二进制文件对象
+		"""
+		import hmac
+
+		def send(message: dict):
+			"""发送一行结果，客户端已经断开连接时返回False"""
+			try:
+				wfile.write(json.dumps(message, ensure_ascii=False).encode('utf-8') + b'\n')
+				wfile.flush()
+			except (BrokenPipeError, ConnectionResetError):
+				return False
+
+			return True
+
+		try:
+			request = json.loads(rfile.readline())
+			keywords_or_path = request['keywords_or_path']
+		except (ValueError, KeyError, TypeError) as e:
+			send({'error': str(e)})
+			return
+
+		if self.__token is not None and not hmac.compare_digest(str(request.get('token', '')), self.__token):
+			send({'error': 'invalid token'})
+			return
+
+		try:
+			for result in self.process(keywords_or_path, gallery=request.get('gallery', False),
+									   depth=request.get('depth', 0), changed_only=request.get('changed_only', False),
+									   refresh_metadata=request.get('refresh_metadata', False)):
+				if not send(result):
+					# 客户端提前断开连接，已提交的影片仍会处理完成
+					return
+		except Exception as e:
+			# 查找影片文件等出错时没有汇总，客户端据此判断任务失败
+			logger.error(_('常驻服务处理 {keywords_or_path} 时出错: {error}').format(keywords_or_path=keywords_or_path, error=e))
+			send({'error': str(e)})
+
+	def process(self, keywords_or_path: str, *, gallery: bool=False, depth: int=0, changed_only: bool=False, refresh_metadata: bool=False):
+		"""
+		将一个任务中的影片提交到共用的线程池，并按提交顺序产生处理结果
+
+		Args:
+			keywords_or_path: 逗号分隔的关键词或影片目录的绝对路径
+			gallery: 是否下载剧照和预告片
+			depth: 目录搜索深度
+			changed_only: 是否只处理新增或发生变化的影片文件
+			refresh_metadata: 是否忽略已整理影片目录中的NFO文件重新获取影片信息
+
+		Returns:
+			结果字典的生成器，每部影片产生 {'item', 'status'}，处理时出现异常的影片
+			同时带有 'error'，最后产生 {'count', 'failed'}
+		"""
+		root_dir = Path(keywords_or_path)
+		dir_mode = root_dir.is_dir()
+
+		if dir_mode:
+			items = self.dv_helper.iter_video_files(root_dir, max_depth=depth)
+
+			if self.dv_helper.library is not None:
+				items = self.dv_helper.library.scan(items, changed_only=changed_only)
+		else:
+			items = [keyword.strip() for keyword in keywords_or_path.split(',')]
+
+		futures = []
+
+		for item in items:
+			with self.__counter_lock:
+				index = next(self.__counter)
+
+			futures.append((item, self.__executor.submit(self.dv_helper.process_movie, index, None, item,
+														 gallery=gallery, dir_mode=dir_mode, root_dir=root_dir if dir_mode else None,
+														 refresh_metadata=refresh_metadata)))
+
+		failed = 0
+
+		for item, future in futures:
+			try:
+				result = {'item': str(item), 'status': future.result()}
+			except Exception as e:
+				# 如两个客户端同时提交同一目录时文件已被移走，不影响同一任务中的其它影片
+				logger.error(_('常驻服务处理 {keywords_or_path} 时出错: {error}').format(keywords_or_path=item, error=e))
+				result = {'item': str(item), 'status': 'failed', 'error': str(e)}
+
+			failed += result['status'] == 'failed'
+			yield result
+
+		yield {'count': len(futures), 'failed': failed}
+
+	@staticmethod
+	def create_token(token_file: Path):
+		"""
+		生成随机令牌并写入只有当前用户可以读写的文件
+
+		Args:
+			token_file: 令牌文件路径
+
+		Returns:
+			生成的令牌
+		"""
+		import secrets
+
+		token = secrets.token_urlsafe(32)
+		fd = os.open(token_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+
+		with open(fd, 'w', encoding='utf-8') as f:
+			# 文件已经存在时 os.open 不会修改权限
+			os.chmod(token_file, 0o600)
+			f.write(token)
+
+		return token
+
+	@staticmethod
+	def read_token(token_file: Path):
+		"""
+		读取服务启动时生成的令牌
+
+		Args:
+			token_file: 令牌文件路径
+
+		Returns:
+			令牌，文件不存在或无法读取时返回None
+		"""
+		try:
+			return token_file.read_text(encoding='utf-8').strip()
+		except OSError:
+			return
+
+	@staticmethod
+	def submit(address: tuple[str, int], keywords_or_path: str, *, gallery: bool=False, depth: int=0, changed_only: bool=False, refresh_metadata: bool=False, timeout: float=None, token: str=None):
+		"""
+		将任务提交给正在运行的服务
+
+		Args:
+			address: 服务地址 (主机, 端口)
+			keywords_or_path: 逗号分隔的关键词或影片目录路径，相对路径会转换为绝对路径
+			gallery: 是否下载剧照和预告片
+			depth: 目录搜索深度
+			changed_only: 是否只处理新增或发生变化的影片文件
+			refresh_metadata: 是否忽略已整理影片目录中的NFO文件重新获取影片信息
+			timeout: 连接超时时间（秒），默认为None
+			token: 服务启动时生成的令牌，默认为None
+
+		Returns:
+			服务返回的结果字典的生成器
+
+		Raises:
+			OSError: 无法连接到服务
+		"""
+		import json
+		import socket
+
+		path = Path(keywords_or_path)
+
+		# 服务的工作目录与客户端不同，目录需要使用绝对路径
+		if path.is_dir():
+			keywords_or_path = str(path.absolute())
+
+		request = {'keywords_or_path': keywords_or_path, 'gallery': gallery, 'depth': depth, 'changed_only': changed_only,
+				   'refresh_metadata': refresh_metadata, 'token': token}
+
+		with socket.create_connection(address, timeout=timeout) as sock:
+			sock.settimeout(None)
+			sock.sendall(json.dumps(request, ensure_ascii=False).encode('utf-8') + b'\n')
+
+			with sock.makefile('rb') as rfile:
+				for line in rfile:
+					yield json.loads(line)
+
+
+def get_logger(use_tqdm: bool=True, log_file: str | None=None):
+	"""
+	创建日志器
+
+	Args:
+		use_tqdm: 是否通过tqdm输出控制台日志，避免打断进度条，默认为True
+		log_file: 日志文件路径，默认为环境变量DVHELPER_LOG指定的路径，未指定时为当前目录下的dvhelper.log
+	"""
 	import logging
+	from colorama import Fore, Style
 
 	logger = logging.getLogger(__name__)
 	logger.setLevel(logging.INFO)
@@ -1031,7 +4372,9 @@ def get_logger():
 
 	# 文件处理器 - 详细格式用于持久化
 	file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-	file_handler = logging.FileHandler('dvhelper.log', encoding='utf-8')
+	if log_file is None:
+		log_file = os.environ.get('DVHELPER_LOG', 'dvhelper.log')
+	file_handler = logging.FileHandler(log_file, encoding='utf-8')
 	file_handler.setFormatter(file_formatter)
 
 	class ColoredFormatter(logging.Formatter):
@@ -1050,7 +4393,9 @@ def get_logger():
 	console_formatter = ColoredFormatter()
 	console_handler = logging.StreamHandler(sys.stdout)
 	console_handler.setFormatter(console_formatter)
-	console_handler.stream = TqdmOut
+
+	if use_tqdm:
+		console_handler.stream = TqdmOut
 
 	# 添加处理器到日志器
 	logger.addHandler(file_handler)
@@ -1058,40 +4403,114 @@ def get_logger():
 
 	return logger
 
+def rich_help_formatter(prog: str):
+	"""创建帮助信息格式化器，rich_argparse 在需要输出帮助或版本信息时才导入"""
+	from rich_argparse import RawTextRichHelpFormatter
+	return RawTextRichHelpFormatter(prog)
+
 def lazy_import():
 	global logger
-	global requests, RequestException, Timeout
+	global asyncio, json, sqlite3, ET, ThreadPoolExecutor, as_completed
+	global requests, HTTPAdapter, RequestException, Timeout, Retry
 	global tqdm, trange
 
+	import asyncio
+	import json
+	import sqlite3
+	from lxml import etree as ET
+	from concurrent.futures import ThreadPoolExecutor, as_completed
 	import requests
+	from requests.adapters import HTTPAdapter
 	from requests.exceptions import RequestException, Timeout
+	from urllib3.util.retry import Retry
 	from tqdm import tqdm, trange
 
 	logger = get_logger()
 
+def submit_to_server(address: tuple[str, int], args: argparse.Namespace):
+	"""
+	将命令行中的任务提交给常驻服务，并输出每部影片的处理结果
+
+	Args:
+		address: 服务地址 (主机, 端口)
+		args: 解析后的命令行参数
+	"""
+	status_text = {'done': _('完成'), 'failed': _('失败'), 'ignored': _('已忽略')}
+	finished = False
+
+	try:
+		for index, result in enumerate(MovieServer.submit(address, args.keywords_or_path, gallery=args.gallery,
+														  depth=args.depth, changed_only=args.changed_only,
+														  refresh_metadata=args.refresh_metadata, timeout=5,
+														  token=MovieServer.read_token(config.server_token_file)), 1):
+			if 'status' in result:
+				error = f' ({result["error"]})' if result.get('error') else ''
+				print(f'    {index}.{result["item"]} - {status_text.get(result["status"], result["status"])}{error}')
+			elif 'error' in result:
+				logger.error(_('常驻服务无法处理请求: ') + result['error'])
+				sys.exit(1)
+			else:
+				finished = True
+				logger.info(_('处理完成，共搜索整理 {count} 部影片，其中 {failed} 部影片获取信息失败')
+					.format(count=result['count'], failed=result['failed']))
+	except OSError as e:
+		logger.error(_('无法连接到 {host}:{port} 上的常驻服务，请先使用 --serve 参数启动服务: {error}')
+			.format(host=address[0], port=address[1], error=e))
+		sys.exit(1)
+
+	if not finished:
+		# 没有收到最后的汇总说明服务在处理过程中断开了连接
+		logger.error(_('常驻服务没有返回处理结果的汇总，任务可能没有全部完成'))
+		sys.exit(1)
+
 def main():
 	"""应用程序入口点"""
-	global config
+	global config, logger
+	setup_console()
+
+	# 帮助信息也需要翻译，在创建配置和解析参数之前确定语言
+	set_language('en_US' if '--lang' in sys.argv[1:] else locale.getdefaultlocale()[0])
 	config = Config()
 
 	if getattr(sys, 'frozen', False):
 		current_dir = Path(sys.executable).parent
 		config.actress_alias_file = current_dir / 'actress_alias.json'
 		config.cookies_file = current_dir / 'cookies.json'
+		config.cache_file = current_dir / 'http_cache.db'
+		config.journal_file = current_dir / 'journal.jsonl'
+		config.library_file = current_dir / 'library.db'
+		config.catalog_file = current_dir / 'catalog.db'
+		config.server_token_file = current_dir / 'server.token'
 
 	parser = HelpOnErrorParser(
-		description=config.description,
+		description=f'[b]DV Helper (version [i]{__version__}[/]) - ' + _(config.description),
 		usage='%(prog)s [options] keywords_or_path',
-		formatter_class=RawTextRichHelpFormatter,
+		formatter_class=rich_help_formatter,
 		# epilog=config.epilog
 	)
 
 	parser.add_argument('-v', '--version', action='version', version=f'[argparse.prog]DV Helper[/] (version [i]{__version__}[/])')
-	parser.add_argument('keywords_or_path', type=str, help=config.keywords_help)
-	parser.add_argument('-d', '--depth', type=int, default=0, help=config.depth_help)
-	parser.add_argument('-g', '--gallery', action='store_true', help=config.gallery_help)
-	parser.add_argument('-l', '--login', action='store_true', help=config.login_help)
-	# parser.add_argument('-o', '--organize', action='store_true', help=config.organize_help)
+	parser.add_argument('keywords_or_path', type=str, nargs='?', help=_(config.keywords_help))
+	parser.add_argument('-d', '--depth', type=int, default=0, help=_(config.depth_help))
+	parser.add_argument('-g', '--gallery', action='store_true', help=_(config.gallery_help))
+	parser.add_argument('-l', '--login', action='store_true', help=_(config.login_help))
+	parser.add_argument('-j', '--jobs', type=int, default=1, help=_(config.jobs_help))
+	parser.add_argument('--no-cache', action='store_true', help=_(config.no_cache_help))
+	parser.add_argument('--refresh', action='store_true', help=_(config.refresh_help))
+	parser.add_argument('--resume', action='store_true', help=_(config.resume_help))
+	parser.add_argument('--async', action='store_true', dest='use_async', help=_(config.async_help))
+	parser.add_argument('--rate', type=float, default=config.rate_limit, help=_(config.rate_help))
+	parser.add_argument('--changed-only', action='store_true', help=_(config.changed_only_help))
+	parser.add_argument('--refresh-metadata', action='store_true', help=_(config.refresh_meta_help))
+	parser.add_argument('--watch', action='store_true', help=_(config.watch_help))
+	parser.add_argument('--serve', action='store_true', help=_(config.serve_help))
+	parser.add_argument('--submit', action='store_true', help=_(config.submit_help))
+	parser.add_argument('--port', type=int, default=config.serve_port, help=_(config.port_help))
+	parser.add_argument('--thumbnails', type=str, metavar='WIDTHS', help=_(config.thumbnails_help))
+	parser.add_argument('--query', action='append', metavar='CONDITION', help=_(config.query_help))
+	parser.add_argument('--rebuild-catalog', action='store_true', help=_(config.rebuild_help))
+	parser.add_argument('--export', type=str, metavar='FILE', help=_(config.export_help))
+	# parser.add_argument('-o', '--organize', action='store_true', help=_(config.organize_help))
 
 	if len(sys.argv) == 1:
 		parser.print_help()
@@ -1099,13 +4518,83 @@ def main():
 
 	args, unknown_args = parser.parse_known_args()
 
-	if '--lang' in unknown_args:
-		set_language('en_US')
+	if args.keywords_or_path is None and not (args.serve or args.query or args.export):
+		parser.error(_('缺少搜索关键词或本地影片目录路径'))
+
+	# 监视目录时等待新文件会阻塞异步引擎的事件循环
+	if args.watch and args.use_async:
+		parser.error(_('--watch 不能与 --async 同时使用'))
+
+	conditions = []
+
+	for condition in args.query or []:
+		field, _sep, value = condition.partition('=')
+
+		if field not in MovieCatalog.QUERY_FIELDS or not value:
+			parser.error(_('查询条件的格式为 字段=值，字段可以是: ') + ', '.join(MovieCatalog.QUERY_FIELDS))
+
+		conditions.append((field, value))
+
+	if args.export:
+		export_format = MovieExporter.format_of(args.export)
+
+		if export_format is None:
+			parser.error(_('不支持的导出格式，文件扩展名可以是: ') + ', '.join(MovieExporter.FORMATS))
+		elif not MovieExporter.is_available(export_format):
+			parser.error(_('导出 {format} 格式需要安装 pyarrow').format(format=export_format))
+
+	if args.thumbnails:
+		try:
+			config.thumbnail_widths = tuple(int(width) for width in args.thumbnails.split(',') if width.strip())
+		except ValueError:
+			config.thumbnail_widths = (0,)
+
+		if any(width <= 0 for width in config.thumbnail_widths):
+			parser.error(_('缩略图宽度必须是正整数: ') + args.thumbnails)
+
+	if args.submit:
+		# 客户端只负责提交任务和输出结果，不需要导入网络和解析相关的模块
+		logger = get_logger(use_tqdm=False)
+		submit_to_server((config.serve_host, args.port), args)
+		return
 
 	lazy_import()
 
+	if args.query or args.rebuild_catalog or args.export:
+		catalog = MovieCatalog(config.catalog_file)
+
+		try:
+			if args.rebuild_catalog:
+				root_dir = Path(args.keywords_or_path)
+
+				if not root_dir.is_dir():
+					parser.error(_('--rebuild-catalog 需要指定影片目录路径'))
+
+				logger.info(_('已从 {root_dir} 中的 NFO 文件补充 {count} 部影片的信息，目录中共有 {total} 部影片')
+					.format(root_dir=root_dir, count=catalog.backfill(root_dir), total=len(catalog)))
+
+			if args.export:
+				start = time.perf_counter()
+				count = MovieExporter(args.export).export(catalog.query(conditions))
+
+				logger.info(_('已导出 {count} 部影片的信息到 {file}，耗时 {seconds:.1f} 秒')
+					.format(count=count, file=args.export, seconds=time.perf_counter() - start))
+			elif args.query:
+				start = time.perf_counter()
+				count = 0
+
+				for count, movie_info in enumerate(catalog.query(conditions), 1):
+					print(f'    {count}.[{movie_info.number}]({movie_info.premiered}) {movie_info.title} - {", ".join(movie_info.actresses)}')
+
+				logger.info(_('共找到 {count} 部影片，耗时 {ms:.1f} 毫秒')
+					.format(count=count, ms=(time.perf_counter() - start) * 1000))
+		finally:
+			catalog.close()
+		return
+
 	dv_helper = DVHelper()
 	keywords_or_path: str = args.keywords_or_path
+	jobs = max(args.jobs, 1)
 
 	if args.login:
 		if dv_helper.perform_login() is None:
@@ -1113,32 +4602,87 @@ def main():
 
 	dv_helper.initialize_session()
 
-	if config.actress_alias_file.exists():
-		with open(config.actress_alias_file, 'r', encoding='utf-8') as file:
-			config.actress_alias = json.load(file)
+	if not args.no_cache:
+		dv_helper.cache = ResponseCache(config.cache_file, config.cache_ttl, config.cache_max_size, refresh=args.refresh)
+
+	# 常驻服务长时间运行，日志文件会不断增加，已处理的影片由媒体库索引记录
+	dv_helper.journal = ResumeJournal(None if args.serve else config.journal_file, resume=args.resume)
+	# 只对网站页面主动限速，媒体文件所在的主机在返回 429/503 时才会暂停
+	dv_helper.rate_limiter = RateLimiter(args.rate, config.rate_burst, sites=[config.base_url])
+	dv_helper.catalog = MovieCatalog(config.catalog_file)
+
+	if args.resume and len(dv_helper.journal):
+		logger.info(_('已从断点续传日志中恢复 {count} 部影片的处理进度').format(count=len(dv_helper.journal)))
+
+	config.actress_alias_index = ActressAliasIndex(config.actress_alias_file, check_interval=config.actress_alias_check_interval)
 
 	try:
+		if args.serve:
+			dv_helper.library = LibraryIndex(config.library_file)
+
+			if jobs > 1 and config.image_workers > 0 and (os.cpu_count() or 1) > 1:
+				dv_helper.image_processor = ImageProcessor(config.image_workers, config.image_queue_size, dv_helper.timer)
+
+			server = MovieServer(dv_helper, (config.serve_host, args.port), jobs, MovieServer.create_token(config.server_token_file))
+			logger.info(_('常驻服务已启动，正在监听 {host}:{port}，按 Ctrl+C 停止')
+				.format(host=server.address[0], port=server.address[1]))
+
+			try:
+				server.serve_forever()
+			finally:
+				server.close()
+				config.server_token_file.unlink(missing_ok=True)
+
+				if dv_helper.image_processor:
+					dv_helper.image_processor.close()
+
+				dv_helper.log_stage_times()
+			return
+
 		if Path(keywords_or_path).absolute().is_dir():
 			root_dir = Path(keywords_or_path)
 
 			if any(arg in unknown_args for arg in ['-o', '--organize']):
-				if not config.actress_alias:
+				if not config.actress_alias_index:
 					logger.warning(_('actress_alias.json 文件为空或不存在，无法执行整理操作'))
 				else:
 					dv_helper.organize_folders(root_dir)
 				return
 
-			found_files = dv_helper.list_video_files(root_dir, max_depth=args.depth)
+			library = dv_helper.library = LibraryIndex(config.library_file)
+			logger.info(_('媒体库索引中共有 {total} 个文件，完成 {done} 个，失败 {failed} 个，已忽略 {ignored} 个')
+				.format(**library.stats()))
 
-			if found_files:
-				logger.info(_('发现 {count} 个影片文件:').format(count=len(found_files)))
-				for index, file_path in enumerate(found_files, 1):
-					print(f'    {index}.{Path(file_path).relative_to(root_dir)}')
+			if args.watch:
+				watcher = DirectoryWatcher(root_dir, args.depth, dv_helper.iter_video_files,
+										   config.watch_poll_interval, config.watch_settle_time)
+				logger.info(_('正在监视 {root_dir} 中新增的影片文件（{backend}），按 Ctrl+C 停止')
+					.format(root_dir=root_dir, backend=watcher.backend))
 
-				dv_helper.batch_process(found_files, gallery=args.gallery, dir_mode=True, root_dir=root_dir)
-			else:
+				dv_helper.batch_process(library.scan(watcher.watch(), changed_only=args.changed_only), gallery=args.gallery, dir_mode=True, root_dir=root_dir, jobs=jobs, use_async=args.use_async,
+										refresh_metadata=args.refresh_metadata)
+				return
+
+			found_files = library.scan(dv_helper.iter_video_files(root_dir, max_depth=args.depth), changed_only=args.changed_only)
+			first_file = next(found_files, None)
+
+			def print_found_files(files: Iterable[Path]):
+				for index, file_path in enumerate(files, 1):
+					print(f'    {index}.{file_path.relative_to(root_dir)}')
+					yield file_path
+
+			if first_file:
+				# 找到第一个影片文件后立即开始处理，其余文件在处理过程中继续查找，找到时依次列出
+				logger.info(_('正在 {root_dir} 中查找影片文件，找到的文件会立即开始处理').format(root_dir=root_dir))
+				dv_helper.batch_process(print_found_files(itertools.chain([first_file], found_files)), gallery=args.gallery, dir_mode=True, root_dir=root_dir, jobs=jobs, use_async=args.use_async,
+										refresh_metadata=args.refresh_metadata)
+			elif not library.unchanged:
 				logger.info(_('在 {root_dir} {else_part}中未发现影片文件')
 					.format(root_dir=root_dir, else_part=_('及其子目录') if args.depth > 0 else ''))
+
+			if args.changed_only:
+				logger.info(_('新增 {new} 个、变化 {changed} 个、上次处理失败 {retried} 个影片文件，跳过 {unchanged} 个未变化的影片文件')
+					.format(new=library.new, changed=library.changed, retried=library.retried, unchanged=library.unchanged))
 		else:
 			keywords = [keyword.strip() for keyword in keywords_or_path.split(',')]
 
@@ -1146,10 +4690,19 @@ def main():
 			for index, keyword in enumerate(keywords, 1):
 				print(f'    {index}.{keyword}')
 
-			dv_helper.batch_process(keywords, gallery=args.gallery)
+			dv_helper.batch_process(keywords, gallery=args.gallery, jobs=jobs, use_async=args.use_async,
+									refresh_metadata=args.refresh_metadata)
 	except KeyboardInterrupt:
+		print()
+		logger.warning(_('处理已中断，使用 --resume 参数可从中断的位置继续处理'))
 		sys.exit(0)
+	finally:
+		dv_helper.catalog.close()
 
 
 if __name__ == '__main__':
+	# 打包后的程序在 Windows 上启动图片处理进程时需要
+	import multiprocessing
+	multiprocessing.freeze_support()
+
 	main()
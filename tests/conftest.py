@@ -9,6 +9,10 @@ from unittest.mock import patch, MagicMock
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# 测试产生的日志写入临时目录，不在工作目录留下 dvhelper.log
+LOG_DIR = tempfile.mkdtemp()
+os.environ['DVHELPER_LOG'] = os.path.join(LOG_DIR, 'dvhelper.log')
+
 import dvhelper
 dvhelper.lazy_import()
 
@@ -26,6 +30,17 @@ def setup_dvhelper():
 		mock_requests.Session.return_value = MagicMock()
 		yield
 
+	for handler in dvhelper.logger.handlers:
+		handler.close()
+	shutil.rmtree(LOG_DIR, ignore_errors=True)
+
+@pytest.fixture(autouse=True)
+def restore_config():
+	"""main() 会替换全局配置，测试结束后恢复，避免影响后续测试"""
+	config = dvhelper.config
+	yield
+	dvhelper.config = config
+
 @pytest.fixture
 def temp_dir():
 	temp_dir = tempfile.mkdtemp()
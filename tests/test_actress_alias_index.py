@@ -0,0 +1,105 @@
+"""测试 ActressAliasIndex 类的功能"""
+import os
+import sys
+import json
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dvhelper import ActressAliasIndex
+
+
+def write_alias_file(alias_file, aliases: dict, mtime_ns: int):
+	alias_file.write_text(json.dumps(aliases, ensure_ascii=False), encoding='utf-8')
+	os.utime(alias_file, ns=(mtime_ns, mtime_ns))
+
+def test_actress_alias_index_resolve(actress_alias):
+	index = ActressAliasIndex(aliases=actress_alias)
+
+	assert len(index) == 2
+	assert index.resolve('Alias A1') == 'Actress A'
+	assert index.resolve('Alias B1') == 'Actress B'
+	assert index.resolve('Actress A') == 'Actress A'
+	assert index.resolve('Unknown Actress') == 'Unknown Actress'
+	assert index.get('Unknown Actress') is None
+	assert not ActressAliasIndex()
+
+def test_actress_alias_index_normalize():
+	index = ActressAliasIndex(aliases={'三上悠亞': ['三上悠亜', '鬼头桃菜'], '明日花綺羅': ['明日花キララ']})
+
+	assert index.resolve('三上悠亚') == '三上悠亞'
+	assert index.resolve('鬼頭桃菜') == '三上悠亞'
+	assert index.resolve('明日花ｷﾗﾗ') == '明日花綺羅'
+	assert index.resolve('明日花 キララ') == '明日花綺羅'
+	assert index.resolve('ＡＬＩＡＳ') == 'ＡＬＩＡＳ'
+	assert ActressAliasIndex.normalize('Ａｌｉａｓ　Ａ１') == 'aliasa1'
+
+def test_actress_alias_index_update():
+	index = ActressAliasIndex(aliases={'Actress A': ['Alias A1', 'Shared'], 'Actress B': ['Alias B1', 'Shared']})
+
+	assert index.resolve('Shared') == 'Actress A'
+
+	# 只有发生变化的固定名字会被重建
+	assert index.update({'Actress B': ['Alias B1', 'Shared'], 'Actress C': ['Alias C1']}) == 2
+	assert index.get('Alias A1') is None
+	assert index.resolve('Shared') == 'Actress B'
+	assert index.resolve('Alias C1') == 'Actress C'
+
+	assert index.update({'Actress B': ['Alias B1', 'Shared'], 'Actress C': ['Alias C1']}) == 0
+
+def test_actress_alias_index_refresh(temp_dir):
+	alias_file = temp_dir / 'actress_alias.json'
+	write_alias_file(alias_file, {'Actress A': ['Alias A1']}, 1_000_000_000)
+
+	index = ActressAliasIndex(alias_file, check_interval=0)
+	assert index.resolve('Alias A1') == 'Actress A'
+	assert index.refresh() is False
+
+	write_alias_file(alias_file, {'Actress A': ['Alias A1'], 'Actress B': ['Alias B1']}, 2_000_000_000)
+	assert index.resolve('Alias B1') == 'Actress B'
+
+	with patch('dvhelper.logger') as mock_logger:
+		write_alias_file(alias_file, {}, 3_000_000_000)
+		alias_file.write_text('{"Actress A": [', encoding='utf-8')
+
+		assert index.refresh() is False
+		mock_logger.warning.assert_called_once()
+		assert index.resolve('Alias B1') == 'Actress B'
+
+	alias_file.unlink()
+	assert index.refresh() is True
+	assert len(index) == 0
+
+def test_actress_alias_index_check_interval(temp_dir):
+	alias_file = temp_dir / 'actress_alias.json'
+	write_alias_file(alias_file, {'Actress A': ['Alias A1']}, 1_000_000_000)
+
+	index = ActressAliasIndex(alias_file, check_interval=3600)
+	write_alias_file(alias_file, {'Actress B': ['Alias B1']}, 2_000_000_000)
+
+	assert index.get('Alias B1') is None
+	assert index.refresh(force=True) is True
+	assert index.get('Alias B1') == 'Actress B'
+
+def test_actress_alias_index_distinct_characters():
+	index = ActressAliasIndex(aliases={'小澤瑪利亞': ['叶山麻理'], '松島智子': ['松島智子']})
+
+	# 叶、嶋等在人名中是独立的汉字，不与 葉、島 合并
+	assert index.resolve('叶山麻理') == '小澤瑪利亞'
+	assert index.get('葉山麻理') is None
+	assert index.get('松嶋智子') is None
+	assert index.resolve('松岛智子') == '松島智子'
+
+def test_actress_alias_index_collision():
+	with patch('dvhelper.logger') as mock_logger:
+		index = ActressAliasIndex(aliases={'Actress A': ['桜井あゆ'], 'Actress B': ['櫻井あゆ']})
+
+		mock_logger.warning.assert_called_once()
+
+	# 规范化后相同的别名，写法完全一致时优先按原样匹配
+	assert index.resolve('桜井あゆ') == 'Actress A'
+	assert index.resolve('櫻井あゆ') == 'Actress B'
+	assert index.resolve('樱井あゆ') == 'Actress A'
+
+	index.update({'Actress B': ['櫻井あゆ']})
+	assert index.resolve('桜井あゆ') == 'Actress B'
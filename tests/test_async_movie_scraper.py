@@ -0,0 +1,174 @@
+"""测试 AsyncMovieScraper 类的功能"""
+import os
+import sys
+import asyncio
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest.mock import MagicMock, patch
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dvhelper
+from dvhelper import AsyncMovieScraper, MovieScraper, ResponseCache
+
+pytest.importorskip('aiohttp')
+
+
+class MediaHandler(BaseHTTPRequestHandler):
+	routes = {
+		'/page': (200, '<html>测试页面</html>'.encode('utf-8')),
+		'/image.jpg': (200, b'image-data'),
+		'/trailer.mp4': (200, b'trailer-data' * 1000),
+	}
+
+	def do_GET(self):
+		status, body = self.routes.get(self.path.split('?')[0], (404, b''))
+		content_range = None
+
+		if status == 200 and self.headers.get('Range') and self.headers.get('If-Range') == '"v1"':
+			start = int(self.headers['Range'].removeprefix('bytes=').rstrip('-'))
+			status, content_range = 206, f'bytes {start}-{len(body) - 1}/{len(body)}'
+			body = body[start:]
+
+		self.send_response(status)
+		self.send_header('Content-Length', str(len(body)))
+		self.send_header('ETag', '"v1"')
+
+		if content_range:
+			self.send_header('Content-Range', content_range)
+
+		self.end_headers()
+		self.wfile.write(body)
+
+	def log_message(self, *args):
+		pass
+
+
+@pytest.fixture
+def http_server():
+	server = ThreadingHTTPServer(('127.0.0.1', 0), MediaHandler)
+	thread = threading.Thread(target=server.serve_forever, daemon=True)
+	thread.start()
+
+	yield f'http://127.0.0.1:{server.server_address[1]}'
+
+	server.shutdown()
+	server.server_close()
+
+async def run_engine(coroutine_function, *args, **kwargs):
+	async with AsyncMovieScraper(MovieScraper()) as engine:
+		return await getattr(engine, coroutine_function)(*args, **kwargs)
+
+def test_async_scraper_fetch_data(http_server):
+	assert asyncio.run(run_engine('fetch_data', f'{http_server}/page')) == '<html>测试页面</html>'
+
+def test_async_scraper_fetch_data_failure(http_server):
+	with patch('builtins.print'):
+		assert asyncio.run(run_engine('fetch_data', f'{http_server}/missing', max_retries=2)) is None
+
+def test_async_scraper_fetch_data_cache(http_server, temp_dir):
+	scraper = MovieScraper()
+	scraper.cache = ResponseCache(temp_dir / 'cache.db', ttl=60, max_size=1024)
+
+	async def fetch_twice():
+		async with AsyncMovieScraper(scraper) as engine:
+			return [await engine.fetch_data(f'{http_server}/page') for _ in range(2)]
+
+	assert asyncio.run(fetch_twice()) == ['<html>测试页面</html>'] * 2
+	assert scraper.cache.misses == 1
+	assert scraper.cache.hits == 1
+	assert scraper.cache.get(f'{http_server}/page')['etag'] == '"v1"'
+	scraper.cache.close()
+
+@pytest.mark.parametrize('crop', [False, True])
+def test_async_scraper_fetch_media(http_server, temp_dir, crop):
+	with patch('dvhelper.MovieScraper.crop_image') as mock_crop_image:
+		result = asyncio.run(run_engine('fetch_media', temp_dir, 'fanart.jpg', f'{http_server}/image.jpg', crop=crop))
+
+	assert result is True
+	assert (temp_dir / 'fanart.jpg').read_bytes() == b'image-data'
+
+	if crop:
+		mock_crop_image.assert_called_once_with((temp_dir / 'fanart.jpg').read_bytes(), temp_dir / dvhelper.config.poster_image)
+	else:
+		mock_crop_image.assert_not_called()
+
+def test_async_scraper_fetch_media_resume(http_server, temp_dir):
+	trailer = b'trailer-data' * 1000
+	(temp_dir / 'trailer.mp4.part').write_bytes(trailer[:5000])
+	(temp_dir / 'trailer.mp4.part.validator').write_text('"v1"')
+
+	assert asyncio.run(run_engine('fetch_media', temp_dir, 'trailer.mp4', f'{http_server}/trailer.mp4')) is True
+
+	assert (temp_dir / 'trailer.mp4').read_bytes() == trailer
+	assert not (temp_dir / 'trailer.mp4.part').exists()
+	assert not (temp_dir / 'trailer.mp4.part.validator').exists()
+
+def test_async_scraper_fetch_media_resume_changed(http_server, temp_dir):
+	# 服务器上的文件已经变化时If-Range不匹配，服务器返回完整的文件
+	trailer = b'trailer-data' * 1000
+	(temp_dir / 'trailer.mp4.part').write_bytes(b'stale')
+	(temp_dir / 'trailer.mp4.part.validator').write_text('"v0"')
+
+	assert asyncio.run(run_engine('fetch_media', temp_dir, 'trailer.mp4', f'{http_server}/trailer.mp4')) is True
+
+	assert (temp_dir / 'trailer.mp4').read_bytes() == trailer
+
+def test_async_scraper_fetch_media_batch(http_server, temp_dir):
+	media_list = [
+		('gallery_00.jpg', f'{http_server}/image.jpg'),
+		('gallery_01.jpg', f'{http_server}/missing.jpg'),
+		('ABC-123_trailer.mp4', f'{http_server}/trailer.mp4'),
+	]
+
+	with patch('builtins.print'):
+		assert asyncio.run(run_engine('fetch_media_batch', temp_dir, media_list)) == 2
+
+	assert (temp_dir / 'gallery_00.jpg').exists()
+	assert (temp_dir / 'ABC-123_trailer.mp4').stat().st_size == len(b'trailer-data' * 1000)
+
+def test_dvhelper_batch_process_async(http_server, temp_dir, movie_info_dict):
+	dv_helper = dvhelper.DVHelper()
+	dv_helper.analyze_keyword = MagicMock(side_effect=lambda keyword: keyword)
+	movie_info_dict = dict(movie_info_dict, fanart_url=f'{http_server}/image.jpg')
+
+	with patch('dvhelper.config') as mock_config:
+		mock_config.completed_path = 'completed'
+		mock_config.fanart_image = 'fanart.jpg'
+		mock_config.poster_image = 'poster.jpg'
+		mock_config.search_url = f'{http_server}/page?q='
+		mock_config.base_url = http_server
+		mock_config.http_pool_size = 4
+		mock_config.async_connections_per_host = 2
+		mock_config.image_workers = 0
+
+		with patch('dvhelper.MovieParser') as mock_movie_parser, \
+			 patch('dvhelper.NFOGenerator'), \
+			 patch('dvhelper.MovieScraper.crop_image'), \
+			 patch('pathlib.Path.cwd', return_value=temp_dir), \
+			 patch('builtins.print'), \
+			 patch('dvhelper.logger'):
+			mock_movie_parser.parse_search_results.return_value = {
+				'detail_url': f'{http_server}/page',
+				'title': 'Test Movie',
+				'fanart_url': f'{http_server}/image.jpg'
+			}
+			mock_movie_parser.parse_movie_details.side_effect = lambda html: dict(movie_info_dict)
+
+			dv_helper.batch_process(['ABC-123', 'XYZ-456'], jobs=2, use_async=True)
+
+			assert mock_movie_parser.parse_search_results.call_args[0][0] == '<html>测试页面</html>'.encode('utf-8')
+
+	assert (temp_dir / 'completed' / '==多演员==' / '[ABC-123](2023)' / 'fanart.jpg').read_bytes() == b'image-data'
+
+def test_dvhelper_batch_process_async_unavailable(dv_helper):
+	with patch('dvhelper.AsyncMovieScraper.is_available', return_value=False), \
+		 patch('dvhelper.asyncio.run') as mock_run, \
+		 patch('dvhelper.logger') as mock_logger, \
+		 patch('builtins.print'):
+		dv_helper.analyze_keyword = MagicMock(return_value=None)
+		dv_helper.batch_process(['ABC-123'], use_async=True)
+
+		mock_run.assert_not_called()
+		mock_logger.warning.assert_any_call('未安装 aiohttp，将使用同步引擎处理影片')
@@ -1,4 +1,13 @@
 """测试 Config 类的功能"""
+import os
+import sys
+import pytest
+from unittest.mock import MagicMock, patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dvhelper import Config
+
 
 def test_config_initialize(config):
 	assert config.base_url == 'https://avfan.com'
@@ -17,3 +26,20 @@ def test_config_regex_patterns(config):
 	assert config._259luxu_movie_pattern.match('259LUXU-1234')
 	assert config._200gana_movie_pattern.match('200GANA-5678')
 	assert config._300mium_movie_pattern.match('300MIUM-9012')
+
+@pytest.mark.parametrize('system_lang, completed_path', [
+	('zh_CN', '#整理完成#'),
+	('en_US', '#COMPLETED#'),
+])
+def test_config_completed_path(system_lang, completed_path):
+	translation = MagicMock()
+	translation.gettext.side_effect = {'#整理完成#': '#COMPLETED#'}.get
+
+	# 整理完成的目录名只取决于系统语言，与 --lang 安装的 _() 无关
+	with patch('dvhelper.locale.getdefaultlocale', return_value=(system_lang, 'UTF-8')), \
+		 patch('dvhelper.load_translation', side_effect=lambda lang: translation if lang == 'en_US' else None), \
+		 patch('builtins._', side_effect=lambda message: 'translated'):
+		config = Config()
+
+	assert config.completed_path == completed_path
+	assert sorted(config.exclude_path) == ['#COMPLETED#', '#整理完成#']
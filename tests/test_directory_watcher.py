@@ -0,0 +1,134 @@
+import os
+import sys
+import time
+import queue
+import threading
+import pytest
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dvhelper
+from dvhelper import DirectoryWatcher, DVHelper
+
+@pytest.fixture(params=['inotify', 'poll'])
+def start_watcher(request, dv_helper):
+	"""在后台线程中运行监视器，返回启动函数，产生的文件放入队列"""
+	watchers = []
+
+	def start(root_dir: Path, max_depth: int=1, settle_time: float=0.3):
+		watcher = DirectoryWatcher(root_dir, max_depth, dv_helper.iter_video_files,
+								   poll_interval=0.1, settle_time=settle_time, use_inotify=request.param == 'inotify')
+
+		if watcher.backend != request.param:
+			pytest.skip('当前系统不支持 inotify')
+
+		found = queue.Queue()
+		thread = threading.Thread(target=lambda: [found.put(path) for path in watcher.watch()], daemon=True)
+		thread.start()
+		watchers.append((watcher, thread))
+		# 等待初始扫描完成
+		time.sleep(0.2)
+
+		return found
+
+	yield start
+
+	for watcher, thread in watchers:
+		watcher.stop()
+		thread.join(timeout=5)
+
+def collect(found: queue.Queue, count: int=0, timeout: float=0.8):
+	"""收集timeout秒内产生的文件，收集到count个文件后立即返回"""
+	paths = []
+	deadline = time.monotonic() + timeout * max(count, 1)
+
+	while (remaining := deadline - time.monotonic()) > 0 and (not count or len(paths) < count):
+		try:
+			paths.append(found.get(timeout=remaining))
+		except queue.Empty:
+			break
+
+	return paths
+
+def test_watch_existing_and_new_files(start_watcher, temp_dir):
+	existing = temp_dir / 'ABC-123.mp4'
+	existing.write_bytes(b'movie')
+
+	found = start_watcher(temp_dir)
+	assert collect(found, 1) == [existing]
+
+	sub_dir = temp_dir / 'downloads'
+	sub_dir.mkdir()
+	new_file = sub_dir / 'DEF-456.mkv'
+	new_file.write_bytes(b'movie')
+	(sub_dir / 'notes.txt').write_bytes(b'text')
+
+	assert collect(found, 1) == [new_file]
+	assert collect(found) == []
+
+def test_watch_forget_moved_files(start_watcher, temp_dir):
+	movie = temp_dir / 'ABC-123.mp4'
+	movie.write_bytes(b'movie')
+
+	found = start_watcher(temp_dir, max_depth=0)
+	assert collect(found, 1) == [movie]
+
+	# 移走的文件不再记录为已产生，原样移回后会再次产生
+	moved = temp_dir.parent / f'{temp_dir.name}-ABC-123.mp4'
+	movie.rename(moved)
+	time.sleep(0.3)
+	moved.rename(movie)
+
+	assert collect(found, 1) == [movie]
+
+def test_watch_ignore_excluded_and_prefixed(start_watcher, temp_dir):
+	found = start_watcher(temp_dir)
+
+	completed = temp_dir / dvhelper.config.completed_path
+	completed.mkdir()
+	(completed / 'ABC-123.mp4').write_bytes(b'movie')
+
+	# 整理时会将无法处理的文件重命名为带有忽略前缀的文件名
+	movie = temp_dir / 'DEF-456.mp4'
+	movie.write_bytes(b'movie')
+	assert collect(found, 1) == [movie]
+
+	movie.rename(temp_dir / f'{dvhelper.config.ignored_file_prefix}DEF-456.mp4')
+	assert collect(found) == []
+
+def test_watch_wait_until_written(start_watcher, temp_dir):
+	found = start_watcher(temp_dir, settle_time=0.4)
+	movie = temp_dir / 'ABC-123.mp4'
+
+	with open(movie, 'wb') as f:
+		for _ in range(8):
+			f.write(b'x' * 1024)
+			f.flush()
+			time.sleep(0.1)
+
+		assert found.empty()
+
+	paths = collect(found, 1)
+
+	assert paths == [movie]
+	assert paths[0].stat().st_size == 8 * 1024
+
+def test_watch_respect_max_depth(start_watcher, temp_dir):
+	found = start_watcher(temp_dir, max_depth=0)
+
+	sub_dir = temp_dir / 'downloads'
+	sub_dir.mkdir()
+	(sub_dir / 'ABC-123.mp4').write_bytes(b'movie')
+
+	assert collect(found) == []
+
+def test_watch_stop_on_keyboard_interrupt(dv_helper, temp_dir):
+	watcher = DirectoryWatcher(temp_dir, 0, lambda root_dir, max_depth: iter([]), use_inotify=False)
+
+	def interrupt(root_dir, max_depth):
+		raise KeyboardInterrupt
+
+	watcher._DirectoryWatcher__scan = interrupt
+
+	assert list(watcher.watch()) == []
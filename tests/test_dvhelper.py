@@ -94,15 +94,22 @@ def test_get_logger():
 				mock_getLogger.assert_called_with(dvhelper.__name__)
 				mock_logger.setLevel.assert_called_with(logging.INFO)
 				assert mock_logger.addHandler.call_count >= 2
+				mock_FileHandler.assert_called_with(os.environ['DVHELPER_LOG'], encoding='utf-8')
+
+				get_logger(log_file='test.log')
+				mock_FileHandler.assert_called_with('test.log', encoding='utf-8')
 
 # region DVHelper class tests
 def test_dvhelper_organize_folders_with_alias(dv_helper, actress_folders_with_alias):
 	base_dir = actress_folders_with_alias['base_dir']
 	actress_alias = actress_folders_with_alias['actress_alias']
 
-	with patch('dvhelper.config.actress_alias', actress_alias):
+	with patch('dvhelper.config.actress_alias_index', dvhelper.ActressAliasIndex(aliases=actress_alias)), \
+		 patch('builtins.print'):
 		dv_helper.organize_folders(base_dir)
-		assert True
+
+	assert (base_dir / 'Actress A').is_dir()
+	assert not (base_dir / 'Alias A1').exists()
 
 def test_dvhelper_merge_folders(dv_helper, folders):
 	source_folder = folders['source_folder']
@@ -233,6 +240,77 @@ def test_dvhelper_list_video_files(dv_helper, video_files):
 	assert Path(video3) in result
 	assert Path(video4) in result
 
+def test_dvhelper_iter_video_files(dv_helper, video_files):
+	base_dir = video_files['base_dir']
+	upper_case = base_dir / 'movie5.MP4'
+	upper_case.touch()
+
+	excluded_dir = base_dir / dvhelper.config.completed_path
+	excluded_dir.mkdir()
+	(excluded_dir / 'movie6.mp4').touch()
+
+	result = dv_helper.iter_video_files(base_dir, max_depth=2)
+
+	assert not isinstance(result, list)
+
+	result = list(result)
+
+	# 同一目录中的文件先于子目录中的文件产生
+	assert sorted(result[:3]) == sorted([video_files['video1'], video_files['video2'], upper_case])
+	assert result[3:] == [video_files['video3'], video_files['video4']]
+
+def test_dvhelper_iter_video_files_move_while_iterating(dv_helper, video_files):
+	base_dir = video_files['base_dir']
+	target_dir = video_files['sub_dir'] / 'moved'
+	target_dir.mkdir()
+
+	result = []
+
+	# 处理过程中把文件移出目录，不影响同一目录中其余文件的产生
+	for file_path in dv_helper.iter_video_files(base_dir, max_depth=0):
+		result.append(file_path)
+		file_path.rename(target_dir / file_path.name)
+
+	assert sorted(result) == sorted([video_files['video1'], video_files['video2']])
+
+def test_dvhelper_iter_video_files_skip_symlink_dir(dv_helper, video_files):
+	base_dir = video_files['base_dir']
+
+	try:
+		(base_dir / 'link').symlink_to(video_files['sub_dir'], target_is_directory=True)
+	except OSError:
+		pytest.skip('当前系统不支持创建符号链接')
+
+	result = dv_helper.list_video_files(base_dir, max_depth=1)
+
+	assert result.count(video_files['video3']) == 1
+	assert not any('link' in path.parts for path in result)
+
+def test_dvhelper_batch_process_iterable(dv_helper):
+	events = []
+
+	def found_files():
+		for keyword in ('bad-1', 'bad-2'):
+			events.append(f'found {keyword}')
+			yield keyword
+
+	with patch('dvhelper.config') as mock_config:
+		mock_config.search_url = 'https://example.com/search/'
+		dv_helper.analyze_keyword = MagicMock(side_effect=lambda keyword: events.append(f'analyze {keyword}'))
+
+		with patch('builtins.print') as mock_print, \
+			 patch('dvhelper.logger') as mock_logger:
+			dv_helper.batch_process(found_files())
+
+			# 找到第一个文件后立即开始处理，不等待查找完成
+			assert events == ['found bad-1', 'analyze bad-1', 'found bad-2', 'analyze bad-2']
+
+			messages = [call.args[0] for call in mock_logger.info.call_args_list]
+			assert messages[0].startswith('[1] ')
+
+			printed = [call.args[0] for call in mock_print.call_args_list if call.args]
+			assert printed[-2:] == ['    1.bad-1', '    2.bad-2']
+
 def test_dvhelper_create_movie_folder(config, movie_info):
 	with patch('dvhelper.config', config):
 		base_dir = Path(config.completed_path)
@@ -328,11 +406,37 @@ def test_dvhelper_batch_process_failed_movie(dv_helper):
 			dv_helper.batch_process(['invalid-keyword'])
 			dv_helper.analyze_keyword.assert_called_once_with('invalid-keyword')
 
+@pytest.mark.parametrize('found_search_results', [False, True])
+def test_dvhelper_batch_process_discards_empty_pages(dv_helper, temp_dir, found_search_results):
+	search_url = dvhelper.config.search_url + 'ABC-123'
+	detail_url = 'https://example.com/movie/123'
+	dv_helper.cache = dvhelper.ResponseCache(temp_dir / 'cache.db', ttl=60, max_size=1024)
+	dv_helper.cache.put(search_url, b'<html>search</html>')
+	dv_helper.cache.put(detail_url, b'<html>detail</html>')
+	dv_helper.analyze_keyword = MagicMock(return_value='ABC-123')
+	dv_helper.fetch_data = MagicMock(return_value=b'<html></html>')
+
+	with patch('dvhelper.MovieParser') as mock_movie_parser, \
+		 patch('pathlib.Path.cwd', return_value=temp_dir), \
+		 patch('builtins.print'), \
+		 patch('dvhelper.logger'):
+		mock_movie_parser.parse_search_results.return_value = {
+			'detail_url': detail_url, 'title': 'Test Movie', 'fanart_url': ''} if found_search_results else None
+		mock_movie_parser.parse_movie_details.return_value = None
+		dv_helper.batch_process(['ABC-123'])
+
+	# 没有解析出结果的页面不保留在缓存中，解析出结果的页面保留
+	assert (dv_helper.cache.get(search_url) is None) is not found_search_results
+	assert (dv_helper.cache.get(detail_url) is None) is found_search_results
+	dv_helper.cache.close()
+
 def test_dvhelper_batch_process_with_gallery(dv_helper, temp_dir, movie_info_dict, search_html, detail_html):
 	with patch('dvhelper.config') as mock_config:
 		mock_config.completed_path = 'completed'
 		mock_config.fanart_image = 'fanart.jpg'
 		mock_config.search_url = 'https://example.com/search/'
+		mock_config.media_download_workers = 4
+		mock_config.media_connections_per_host = 2
 
 		dv_helper.analyze_keyword = MagicMock(return_value='ABC-123')
 		dv_helper.fetch_data = MagicMock(side_effect=[search_html, detail_html])
@@ -357,6 +461,172 @@ def test_dvhelper_batch_process_with_gallery(dv_helper, temp_dir, movie_info_dic
 					dv_helper.batch_process(['ABC-123'], gallery=True)
 
 					assert dv_helper.fetch_media.call_count > 1
+
+					media_files = sorted(call.args[1] for call in dv_helper.fetch_media.call_args_list[1:])
+					assert media_files == ['ABC-123_trailer.mp4', 'gallery_00.jpg', 'gallery_01.jpg']
+
+def test_dvhelper_batch_process_jobs(dv_helper, temp_dir, movie_info_dict):
+	with patch('dvhelper.config') as mock_config:
+		mock_config.completed_path = 'completed'
+		mock_config.fanart_image = 'fanart.jpg'
+		mock_config.search_url = 'https://example.com/search/'
+		mock_config.image_workers = 0
+
+		dv_helper.analyze_keyword = MagicMock(side_effect=lambda keyword: None if keyword.startswith('bad') else 'ABC-123')
+		dv_helper.fetch_data = MagicMock(return_value='<html></html>')
+		dv_helper.fetch_media = MagicMock(return_value=True)
+
+		with patch('dvhelper.MovieParser') as mock_movie_parser:
+			mock_movie_parser.parse_search_results.return_value = {
+				'detail_url': 'https://example.com/movie/123',
+				'title': 'Test Movie',
+				'fanart_url': 'https://example.com/image.jpg'
+			}
+			mock_movie_parser.parse_movie_details.side_effect = lambda html: dict(movie_info_dict)
+
+			with patch('dvhelper.NFOGenerator'), \
+				 patch('pathlib.Path.cwd', return_value=temp_dir), \
+				 patch('builtins.print') as mock_print, \
+				 patch('dvhelper.logger'):
+				keywords = ['bad-1', 'ABC-123', 'bad-2', 'abc123', 'ABC-123']
+				dv_helper.batch_process(keywords, jobs=3)
+
+				assert dv_helper.analyze_keyword.call_count == len(keywords)
+				assert dv_helper.fetch_media.call_count == 3
+
+				printed = [call.args[0] for call in mock_print.call_args_list if call.args]
+				assert printed[-2:] == ['    1.bad-1', '    2.bad-2']
+
+def test_dvhelper_batch_process_resume(dv_helper, temp_dir, movie_info_dict):
+	journal_file = temp_dir / 'journal.jsonl'
+	journal = dvhelper.ResumeJournal(journal_file)
+	journal.record('ABC-123', 'search', {'detail_url': 'https://example.com/movie/123', 'title': 'Test Movie', 'fanart_url': ''})
+	journal.record('ABC-123', 'details', movie_info_dict)
+	journal.record('XYZ-456', 'nfo', {'status': 'done'})
+	journal.close()
+
+	with patch('dvhelper.config') as mock_config:
+		mock_config.completed_path = 'completed'
+		mock_config.fanart_image = 'fanart.jpg'
+
+		dv_helper.journal = dvhelper.ResumeJournal(journal_file, resume=True)
+		dv_helper.analyze_keyword = MagicMock(return_value='ABC-123')
+		dv_helper.fetch_data = MagicMock()
+		dv_helper.fetch_media = MagicMock(return_value=True)
+
+		with patch('dvhelper.NFOGenerator'), \
+			 patch('pathlib.Path.cwd', return_value=temp_dir), \
+			 patch('builtins.print'), \
+			 patch('dvhelper.logger'):
+			dv_helper.batch_process(['XYZ-456', 'ABC-123'])
+
+		dv_helper.journal.close()
+
+		dv_helper.analyze_keyword.assert_called_once_with('ABC-123')
+		dv_helper.fetch_data.assert_not_called()
+		dv_helper.fetch_media.assert_called_once()
+
+	journal = dvhelper.ResumeJournal(journal_file, resume=True)
+	assert journal.has('ABC-123', 'cover')
+	assert journal.get('ABC-123', 'nfo') == {'status': 'done'}
+
+@pytest.mark.parametrize('refresh_metadata', [False, True])
+def test_dvhelper_batch_process_organized(dv_helper, temp_dir, movie_info_dict, refresh_metadata):
+	movie_path = temp_dir / dvhelper.config.completed_path / '==多演员==' / '[ABC-123](2023)'
+	movie_path.mkdir(parents=True)
+	(movie_path / dvhelper.config.fanart_image).write_bytes(b'fanart')
+	(movie_path / dvhelper.config.poster_image).write_bytes(b'poster')
+	nfo_file = movie_path / 'ABC-123.nfo'
+	dvhelper.NFOGenerator(dvhelper.MovieInfo(movie_info_dict)).save(nfo_file)
+	os.utime(nfo_file, (0, 0))
+
+	dv_helper.analyze_keyword = MagicMock(return_value='abc-123')
+	dv_helper.fetch_data = MagicMock(return_value=None)
+	dv_helper.fetch_media = MagicMock(return_value=True)
+
+	with patch('pathlib.Path.cwd', return_value=temp_dir), \
+		 patch('builtins.print'), \
+		 patch('dvhelper.logger'):
+		dv_helper.batch_process(['ABC-123'], refresh_metadata=refresh_metadata)
+
+	if refresh_metadata:
+		dv_helper.fetch_data.assert_called_once()
+	else:
+		# 已整理的影片直接使用目录中的NFO文件，不发出网络请求，NFO文件内容不变也不会改写
+		dv_helper.fetch_data.assert_not_called()
+		dv_helper.fetch_media.assert_not_called()
+		assert nfo_file.stat().st_mtime == 0
+
+@pytest.mark.parametrize('marker', [False, True])
+def test_dvhelper_batch_process_organized_gallery(dv_helper, temp_dir, movie_info_dict, marker):
+	# 页面没有剧照的影片，剧照下载完成的标记文件存在时不再重新获取
+	movie_path = temp_dir / dvhelper.config.completed_path / '==多演员==' / '[ABC-123](2023)'
+	movie_path.mkdir(parents=True)
+	(movie_path / dvhelper.config.fanart_image).write_bytes(b'fanart')
+	(movie_path / dvhelper.config.poster_image).write_bytes(b'poster')
+	dvhelper.NFOGenerator(dvhelper.MovieInfo(dict(movie_info_dict, galleries=[], trailer_url=''))).save(movie_path / 'ABC-123.nfo')
+
+	if marker:
+		(movie_path / dvhelper.config.gallery_marker).touch()
+
+	dv_helper.analyze_keyword = MagicMock(return_value='ABC-123')
+	dv_helper.fetch_data = MagicMock(return_value=None)
+
+	with patch('pathlib.Path.cwd', return_value=temp_dir), \
+		 patch('builtins.print'), \
+		 patch('dvhelper.logger'):
+		dv_helper.batch_process(['ABC-123'], gallery=True)
+
+	assert dv_helper.fetch_data.called is not marker
+
+def test_dvhelper_gallery_marker(dv_helper, temp_dir, movie_info_dict):
+	movie_info_dict.update(galleries=[], trailer_url='')
+	dv_helper.analyze_keyword = MagicMock(return_value='ABC-123')
+	dv_helper.fetch_data = MagicMock(return_value='<html></html>')
+	dv_helper.fetch_media = MagicMock(return_value=True)
+
+	with patch('dvhelper.MovieParser') as mock_movie_parser, \
+		 patch('pathlib.Path.cwd', return_value=temp_dir), \
+		 patch('builtins.print'), \
+		 patch('dvhelper.logger'):
+		mock_movie_parser.parse_search_results.return_value = {
+			'detail_url': 'https://example.com/movie/123',
+			'title': 'Test Movie',
+			'fanart_url': 'https://example.com/image.jpg'
+		}
+		mock_movie_parser.parse_movie_details.return_value = movie_info_dict
+		dv_helper.batch_process(['ABC-123'], gallery=True)
+
+	# 页面没有剧照和预告片时同样写入标记文件
+	assert [path.parent.name for path in temp_dir.rglob(dvhelper.config.gallery_marker)] == ['[ABC-123](2023)']
+
+def test_dvhelper_record_movie_path(dv_helper, temp_dir):
+	old_path = temp_dir / '演员A' / '[ABC-123](2023)'
+	old_path.mkdir(parents=True)
+	new_path = temp_dir / '演员B' / '[ABC-123](2023)'
+	new_path.mkdir(parents=True)
+
+	assert dv_helper._DVHelper__movie_path_index(temp_dir)['ABC-123'].parent.name in ('演员A', '演员B')
+	dv_helper._DVHelper__movie_path_index(temp_dir)['ABC-123'] = old_path
+
+	# 已有的目录仍然存在时保留
+	dv_helper._DVHelper__record_movie_path(temp_dir, 'abc-123', new_path)
+	assert dv_helper._DVHelper__movie_path_index(temp_dir)['ABC-123'] == old_path
+
+	# 已有的目录被移走后替换为新目录
+	old_path.rmdir()
+	dv_helper._DVHelper__record_movie_path(temp_dir, 'abc-123', new_path)
+	assert dv_helper._DVHelper__movie_path_index(temp_dir)['ABC-123'] == new_path
+
+def test_dvhelper_lock_path(dv_helper, temp_dir):
+	lock = dv_helper._DVHelper__lock_path(temp_dir / 'movie')
+
+	assert lock is dv_helper._DVHelper__lock_path(temp_dir / 'movie')
+	assert lock is not dv_helper._DVHelper__lock_path(temp_dir / 'other')
+
+	# 不再被引用的锁会被移除
+	del lock
+	assert len(dv_helper._DVHelper__path_locks) == 0
 #endregion
 
 #region main() function tests
@@ -366,6 +636,11 @@ def test_main_frozen_app():
 		 patch('dvhelper.Config') as mock_config_class, \
 		 patch('sys.argv', ['dvhelper.exe', 'ABC-123']), \
 		 patch('dvhelper.DVHelper'), \
+		 patch('dvhelper.ResponseCache'), \
+		 patch('dvhelper.ResumeJournal'), \
+		 patch('dvhelper.RateLimiter'), \
+		 patch('dvhelper.MovieCatalog'), \
+		 patch('dvhelper.ActressAliasIndex'), \
 		 patch('dvhelper.lazy_import'):
 
 		mock_config = MagicMock()
@@ -376,10 +651,16 @@ def test_main_frozen_app():
 		expected_dir = Path('.') / 'path' / 'to'
 		assert mock_config.actress_alias_file == expected_dir / 'actress_alias.json'
 		assert mock_config.cookies_file == expected_dir / 'cookies.json'
+		assert mock_config.catalog_file == expected_dir / 'catalog.db'
 
 def test_main_keyword_search():
 	with patch('sys.argv', ['dvhelper.py', 'ABC-123']), \
 		 patch('dvhelper.DVHelper'), \
+		 patch('dvhelper.ResponseCache'), \
+		 patch('dvhelper.ResumeJournal'), \
+		 patch('dvhelper.RateLimiter'), \
+		 patch('dvhelper.MovieCatalog'), \
+		 patch('dvhelper.ActressAliasIndex'), \
 		 patch('dvhelper.lazy_import') as mock_lazy_import, \
 		 patch('dvhelper.set_language'), \
 		 patch('dvhelper.Config') as mock_config_class:
@@ -394,11 +675,18 @@ def test_main_keyword_search():
 		mock_lazy_import.assert_called_once()
 		dvhelper.DVHelper.assert_called_once()
 		mock_dv_helper.initialize_session.assert_called_once()
-		mock_dv_helper.batch_process.assert_called_once_with(['ABC-123'], gallery=False)
+		mock_dv_helper.batch_process.assert_called_once_with(['ABC-123'], gallery=False, jobs=1, use_async=False, refresh_metadata=False)
+		mock_dv_helper.catalog.close.assert_called_once()
 
-def test_main_directory_processing(temp_dir):
+def test_main_directory_processing(temp_dir, capsys):
 	with patch('sys.argv', ['dvhelper.py', str(temp_dir)]), \
 		 patch('dvhelper.DVHelper'), \
+		 patch('dvhelper.ResponseCache'), \
+		 patch('dvhelper.ResumeJournal'), \
+		 patch('dvhelper.RateLimiter'), \
+		 patch('dvhelper.MovieCatalog'), \
+		 patch('dvhelper.ActressAliasIndex'), \
+		 patch('dvhelper.LibraryIndex') as mock_library_index, \
 		 patch('dvhelper.lazy_import') as mock_lazy_import, \
 		 patch('dvhelper.set_language'), \
 		 patch('dvhelper.Config') as mock_config_class:
@@ -408,18 +696,329 @@ def test_main_directory_processing(temp_dir):
 
 		mock_dv_helper = MagicMock()
 		dvhelper.DVHelper.return_value = mock_dv_helper
-		mock_dv_helper.list_video_files.return_value = [Path(temp_dir) / 'movie.mp4']
+		mock_dv_helper.iter_video_files.return_value = iter([Path(temp_dir) / 'movie1.mp4', Path(temp_dir) / 'movie2.mp4'])
+		mock_library_index.return_value.stats.return_value = {'total': 0, 'done': 0, 'failed': 0, 'ignored': 0}
+		mock_library_index.return_value.scan.side_effect = lambda files, changed_only: files
 		dvhelper.main()
 
+		assert mock_dv_helper.library is mock_library_index.return_value
+		assert mock_library_index.return_value.scan.call_args.kwargs['changed_only'] is False
+
 		mock_lazy_import.assert_called_once()
 		dvhelper.DVHelper.assert_called_once()
 		mock_dv_helper.initialize_session.assert_called_once()
-		mock_dv_helper.list_video_files.assert_called_once()
+		mock_dv_helper.iter_video_files.assert_called_once()
 		mock_dv_helper.batch_process.assert_called_once()
 
+		found_files = mock_dv_helper.batch_process.call_args.args[0]
+		assert list(found_files) == [Path(temp_dir) / 'movie1.mp4', Path(temp_dir) / 'movie2.mp4']
+
+		# 找到的文件在开始处理前依次列出
+		output = capsys.readouterr().out
+		assert '1.movie1.mp4' in output
+		assert '2.movie2.mp4' in output
+
+def test_main_directory_no_video_files(temp_dir):
+	with patch('sys.argv', ['dvhelper.py', str(temp_dir)]), \
+		 patch('dvhelper.DVHelper'), \
+		 patch('dvhelper.ResponseCache'), \
+		 patch('dvhelper.ResumeJournal'), \
+		 patch('dvhelper.RateLimiter'), \
+		 patch('dvhelper.MovieCatalog'), \
+		 patch('dvhelper.ActressAliasIndex'), \
+		 patch('dvhelper.lazy_import'), \
+		 patch('dvhelper.set_language'), \
+		 patch('dvhelper.logger') as mock_logger, \
+		 patch('dvhelper.Config') as mock_config_class:
+		mock_config = MagicMock()
+		mock_config.library_file = Path(temp_dir) / 'library.db'
+		mock_config_class.return_value = mock_config
+
+		mock_dv_helper = MagicMock()
+		dvhelper.DVHelper.return_value = mock_dv_helper
+		mock_dv_helper.iter_video_files.return_value = iter([])
+		dvhelper.main()
+
+		mock_dv_helper.batch_process.assert_not_called()
+		assert str(temp_dir) in mock_logger.info.call_args.args[0]
+
+def test_main_directory_changed_only(temp_dir):
+	movie_file = Path(temp_dir) / 'ABC-123.mp4'
+	movie_file.touch()
+
+	with patch('sys.argv', ['dvhelper.py', str(temp_dir), '--changed-only']), \
+		 patch('dvhelper.DVHelper'), \
+		 patch('dvhelper.ResponseCache'), \
+		 patch('dvhelper.ResumeJournal'), \
+		 patch('dvhelper.RateLimiter'), \
+		 patch('dvhelper.MovieCatalog'), \
+		 patch('dvhelper.ActressAliasIndex'), \
+		 patch('dvhelper.lazy_import'), \
+		 patch('dvhelper.set_language'), \
+		 patch('dvhelper.logger') as mock_logger, \
+		 patch('dvhelper.Config') as mock_config_class:
+		mock_config = MagicMock()
+		mock_config.library_file = Path(temp_dir) / 'library.db'
+		mock_config_class.return_value = mock_config
+
+		library = dvhelper.LibraryIndex(mock_config.library_file)
+		list(library.scan([movie_file]))
+		library.record(str(movie_file), 'ABC-123', 'done')
+		library.close()
+
+		mock_dv_helper = MagicMock()
+		dvhelper.DVHelper.return_value = mock_dv_helper
+		mock_dv_helper.iter_video_files.side_effect = lambda root_dir, max_depth: iter([movie_file])
+		dvhelper.main()
+
+		# 上次处理完成且没有变化的文件不再处理，也不提示目录中没有影片文件
+		mock_dv_helper.batch_process.assert_not_called()
+
+		messages = [call.args[0] for call in mock_logger.info.call_args_list]
+		assert len(messages) == 2
+		assert '1' in messages[0]
+		assert '1' in messages[-1]
+
+def test_main_directory_watch(temp_dir):
+	with patch('sys.argv', ['dvhelper.py', str(temp_dir), '--watch', '-d', '2']), \
+		 patch('dvhelper.DVHelper'), \
+		 patch('dvhelper.ResponseCache'), \
+		 patch('dvhelper.ResumeJournal'), \
+		 patch('dvhelper.RateLimiter'), \
+		 patch('dvhelper.MovieCatalog'), \
+		 patch('dvhelper.ActressAliasIndex'), \
+		 patch('dvhelper.LibraryIndex') as mock_library_index, \
+		 patch('dvhelper.DirectoryWatcher') as mock_watcher_class, \
+		 patch('dvhelper.lazy_import'), \
+		 patch('dvhelper.set_language'), \
+		 patch('dvhelper.logger'), \
+		 patch('dvhelper.Config') as mock_config_class:
+		mock_config_class.return_value = MagicMock()
+		mock_library_index.return_value.stats.return_value = {'total': 0, 'done': 0, 'failed': 0, 'ignored': 0}
+		mock_library_index.return_value.scan.side_effect = lambda files, changed_only: files
+		mock_watcher_class.return_value.watch.return_value = iter([Path(temp_dir) / 'movie.mp4'])
+
+		mock_dv_helper = MagicMock()
+		dvhelper.DVHelper.return_value = mock_dv_helper
+		dvhelper.main()
+
+		assert mock_watcher_class.call_args.args[:3] == (Path(temp_dir), 2, mock_dv_helper.iter_video_files)
+		mock_dv_helper.iter_video_files.assert_not_called()
+
+		found_files = mock_dv_helper.batch_process.call_args.args[0]
+		assert list(found_files) == [Path(temp_dir) / 'movie.mp4']
+		assert mock_dv_helper.batch_process.call_args.kwargs['dir_mode'] is True
+
+def test_main_serve():
+	with patch('sys.argv', ['dvhelper.py', '--serve', '--port', '9000', '-j', '4']), \
+		 patch('dvhelper.DVHelper'), \
+		 patch('dvhelper.ResponseCache'), \
+		 patch('dvhelper.ResumeJournal'), \
+		 patch('dvhelper.RateLimiter'), \
+		 patch('dvhelper.MovieCatalog'), \
+		 patch('dvhelper.ActressAliasIndex'), \
+		 patch('dvhelper.LibraryIndex'), \
+		 patch('dvhelper.MovieServer') as mock_server_class, \
+		 patch('dvhelper.lazy_import'), \
+		 patch('dvhelper.set_language'), \
+		 patch('dvhelper.logger'), \
+		 patch('dvhelper.Config') as mock_config_class:
+		mock_config = MagicMock()
+		mock_config.serve_host = '127.0.0.1'
+		mock_config.image_workers = 0
+		mock_config_class.return_value = mock_config
+		mock_server_class.return_value.address = ('127.0.0.1', 9000)
+
+		mock_dv_helper = MagicMock()
+		dvhelper.DVHelper.return_value = mock_dv_helper
+		dvhelper.main()
+
+		mock_dv_helper.initialize_session.assert_called_once()
+		mock_server_class.create_token.assert_called_once_with(mock_config.server_token_file)
+		mock_server_class.assert_called_once_with(mock_dv_helper, ('127.0.0.1', 9000), 4, mock_server_class.create_token.return_value)
+		mock_server_class.return_value.serve_forever.assert_called_once()
+		mock_server_class.return_value.close.assert_called_once()
+		mock_config.server_token_file.unlink.assert_called_once()
+		# 常驻服务不写入断点续传日志
+		assert dvhelper.ResumeJournal.call_args.args[0] is None
+		mock_dv_helper.batch_process.assert_not_called()
+
+def test_main_submit(capsys):
+	results = [{'item': 'ABC-123', 'status': 'done'}, {'item': 'DEF-456', 'status': 'failed'}, {'count': 2, 'failed': 1}]
+
+	with patch('sys.argv', ['dvhelper.py', 'ABC-123,DEF-456', '--submit', '-g']), \
+		 patch('dvhelper.DVHelper') as mock_dv_helper_class, \
+		 patch('dvhelper.MovieServer.submit', return_value=iter(results)) as mock_submit, \
+		 patch('dvhelper.lazy_import') as mock_lazy_import, \
+		 patch('dvhelper.set_language'), \
+		 patch('dvhelper.logger'), \
+		 patch('dvhelper.get_logger') as mock_get_logger:
+		dvhelper.main()
+
+		mock_lazy_import.assert_not_called()
+		mock_dv_helper_class.assert_not_called()
+		assert mock_submit.call_args.args == (('127.0.0.1', 8730), 'ABC-123,DEF-456')
+		assert mock_submit.call_args.kwargs['gallery'] is True
+		assert 'token' in mock_submit.call_args.kwargs
+		mock_get_logger.return_value.info.assert_called_once()
+
+	output = capsys.readouterr().out
+	assert '1.ABC-123' in output and '2.DEF-456' in output
+
+def test_main_submit_interrupted(capsys):
+	# 服务在处理过程中断开连接，没有返回最后的汇总
+	results = [{'item': 'ABC-123', 'status': 'failed', 'error': 'disk full'}]
+
+	with patch('sys.argv', ['dvhelper.py', 'ABC-123,DEF-456', '--submit']), \
+		 patch('dvhelper.MovieServer.submit', return_value=iter(results)), \
+		 patch('dvhelper.set_language'), \
+		 patch('dvhelper.logger'), \
+		 patch('dvhelper.get_logger') as mock_get_logger:
+		with pytest.raises(SystemExit) as exc_info:
+			dvhelper.main()
+
+		assert exc_info.value.code == 1
+		mock_get_logger.return_value.error.assert_called_once()
+
+	assert '1.ABC-123' in capsys.readouterr().out
+
+def test_main_submit_without_server():
+	with patch('sys.argv', ['dvhelper.py', 'ABC-123', '--submit']), \
+		 patch('dvhelper.MovieServer.submit', side_effect=ConnectionRefusedError()), \
+		 patch('dvhelper.set_language'), \
+		 patch('dvhelper.logger'), \
+		 patch('dvhelper.get_logger') as mock_get_logger:
+		with pytest.raises(SystemExit) as exc_info:
+			dvhelper.main()
+
+		assert exc_info.value.code == 1
+		mock_get_logger.return_value.error.assert_called_once()
+
+def test_main_missing_keywords():
+	with patch('sys.argv', ['dvhelper.py', '-g']), \
+		 patch('dvhelper.set_language'):
+		with pytest.raises(SystemExit) as exc_info:
+			dvhelper.main()
+
+		assert exc_info.value.code == 2
+
+def test_main_watch_with_async(temp_dir):
+	with patch('sys.argv', ['dvhelper.py', str(temp_dir), '--watch', '--async']), \
+		 patch('dvhelper.set_language'):
+		with pytest.raises(SystemExit) as exc_info:
+			dvhelper.main()
+
+		assert exc_info.value.code == 2
+
+def test_main_query(capsys, movie_info_dict):
+	query_fields = dvhelper.MovieCatalog.QUERY_FIELDS
+
+	with patch('sys.argv', ['dvhelper.py', '--query', 'studio=Studio Y', '--query', 'premiered=2023']), \
+		 patch('dvhelper.set_language'), \
+		 patch('dvhelper.DVHelper') as mock_dv_helper, \
+		 patch('dvhelper.MovieCatalog') as mock_catalog, \
+		 patch('dvhelper.logger'):
+		mock_catalog.QUERY_FIELDS = query_fields
+		mock_catalog.return_value.query.return_value = iter([dvhelper.FrozenMovieInfo(movie_info_dict)])
+		dvhelper.main()
+
+		mock_catalog.return_value.query.assert_called_once_with([('studio', 'Studio Y'), ('premiered', '2023')])
+		mock_catalog.return_value.close.assert_called_once()
+		mock_dv_helper.assert_not_called()
+
+	assert '1.[ABC-123](2023-01-01) Test Movie - Actress A, Actress B' in capsys.readouterr().out
+
+@pytest.mark.parametrize('argv', [
+	['dvhelper.py', '--query', 'title=Test'],
+	['dvhelper.py', '--query', 'studio='],
+	['dvhelper.py', 'ABC-123', '--rebuild-catalog'],
+])
+def test_main_query_invalid(argv):
+	with patch('sys.argv', argv), \
+		 patch('dvhelper.set_language'), \
+		 patch('dvhelper.MovieCatalog'):
+		with pytest.raises(SystemExit) as exc_info:
+			dvhelper.main()
+
+		assert exc_info.value.code == 2
+
+def test_main_rebuild_catalog(temp_dir):
+	with patch('sys.argv', ['dvhelper.py', str(temp_dir), '--rebuild-catalog']), \
+		 patch('dvhelper.set_language'), \
+		 patch('dvhelper.DVHelper') as mock_dv_helper, \
+		 patch('dvhelper.MovieCatalog') as mock_catalog, \
+		 patch('dvhelper.logger'):
+		mock_catalog.return_value.backfill.return_value = 3
+		mock_catalog.return_value.__len__.return_value = 5
+		dvhelper.main()
+
+		mock_catalog.return_value.backfill.assert_called_once_with(temp_dir)
+		mock_catalog.return_value.query.assert_not_called()
+		mock_dv_helper.assert_not_called()
+
+def test_main_export(temp_dir):
+	query_fields = dvhelper.MovieCatalog.QUERY_FIELDS
+	output_file = str(temp_dir / 'movies.jsonl')
+
+	with patch('sys.argv', ['dvhelper.py', '--export', output_file, '--query', 'tag=tag1']), \
+		 patch('dvhelper.set_language'), \
+		 patch('dvhelper.DVHelper') as mock_dv_helper, \
+		 patch('dvhelper.MovieCatalog') as mock_catalog, \
+		 patch('dvhelper.MovieExporter.export', return_value=0) as mock_export, \
+		 patch('dvhelper.logger'):
+		mock_catalog.QUERY_FIELDS = query_fields
+		dvhelper.main()
+
+		mock_catalog.return_value.query.assert_called_once_with([('tag', 'tag1')])
+		mock_export.assert_called_once_with(mock_catalog.return_value.query.return_value)
+		mock_dv_helper.assert_not_called()
+
+@pytest.mark.parametrize('output_file, available', [('movies.xlsx', True), ('movies.parquet', False)])
+def test_main_export_invalid(output_file, available):
+	with patch('sys.argv', ['dvhelper.py', '--export', output_file]), \
+		 patch('dvhelper.set_language'), \
+		 patch('dvhelper.MovieExporter.is_available', return_value=available), \
+		 patch('dvhelper.MovieCatalog') as mock_catalog:
+		with pytest.raises(SystemExit) as exc_info:
+			dvhelper.main()
+
+		assert exc_info.value.code == 2
+		mock_catalog.assert_not_called()
+
+@pytest.mark.parametrize('thumbnails, expected', [
+	('200, 400', (200, 400)),
+	('200,abc', None),
+	('0', None),
+])
+def test_main_thumbnails(thumbnails, expected):
+	with patch('sys.argv', ['dvhelper.py', 'ABC-123', '--thumbnails', thumbnails]), \
+		 patch('dvhelper.DVHelper'), \
+		 patch('dvhelper.ResponseCache'), \
+		 patch('dvhelper.ResumeJournal'), \
+		 patch('dvhelper.RateLimiter'), \
+		 patch('dvhelper.MovieCatalog'), \
+		 patch('dvhelper.ActressAliasIndex'), \
+		 patch('dvhelper.lazy_import'), \
+		 patch('dvhelper.set_language'), \
+		 patch('dvhelper.logger'):
+		if expected is None:
+			with pytest.raises(SystemExit) as exc_info:
+				dvhelper.main()
+
+			assert exc_info.value.code == 2
+		else:
+			dvhelper.main()
+
+			assert dvhelper.config.thumbnail_widths == expected
+
 def test_main_login_option():
 	with patch('sys.argv', ['dvhelper.py', 'ABC-123', '-l']), \
 		 patch('dvhelper.DVHelper'), \
+		 patch('dvhelper.ResponseCache'), \
+		 patch('dvhelper.ResumeJournal'), \
+		 patch('dvhelper.RateLimiter'), \
+		 patch('dvhelper.MovieCatalog'), \
+		 patch('dvhelper.ActressAliasIndex'), \
 		 patch('dvhelper.lazy_import'), \
 		 patch('dvhelper.set_language'), \
 		 patch('dvhelper.Config') as mock_config_class:
@@ -439,6 +1038,11 @@ def test_main_login_option():
 def test_main_login_failure(alias_file_exists):
 	with patch('sys.argv', ['dvhelper.py', 'ABC-123', '-l']), \
 		 patch('dvhelper.DVHelper'), \
+		 patch('dvhelper.ResponseCache'), \
+		 patch('dvhelper.ResumeJournal'), \
+		 patch('dvhelper.RateLimiter'), \
+		 patch('dvhelper.MovieCatalog'), \
+		 patch('dvhelper.ActressAliasIndex'), \
 		 patch('dvhelper.lazy_import'), \
 		 patch('dvhelper.set_language'), \
 		 patch('json.load') as mock_json_load, \
@@ -472,6 +1076,11 @@ def test_main_no_arguments():
 def test_main_english_language():
 	with patch('sys.argv', ['dvhelper.py', 'ABC-123', '--lang']), \
 		 patch('dvhelper.DVHelper'), \
+		 patch('dvhelper.ResponseCache'), \
+		 patch('dvhelper.ResumeJournal'), \
+		 patch('dvhelper.RateLimiter'), \
+		 patch('dvhelper.MovieCatalog'), \
+		 patch('dvhelper.ActressAliasIndex'), \
 		 patch('dvhelper.lazy_import'), \
 		 patch('dvhelper.set_language') as mock_set_language, \
 		 patch('dvhelper.Config') as mock_config_class:
@@ -0,0 +1,136 @@
+import os
+import sys
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dvhelper import ImageProcessor, StageTimer
+from test_movie_scraper import generate_cover
+
+@pytest.fixture
+def image_processor():
+	processor = ImageProcessor(workers=2, max_pending=1, timer=StageTimer())
+	yield processor
+	processor.close()
+
+def test_stage_timer():
+	timer = StageTimer()
+	timer.record('download', 1.5)
+	timer.record('download', 0.5)
+
+	with timer.measure('image'):
+		pass
+
+	with pytest.raises(ValueError):
+		with timer.measure('failed'):
+			raise ValueError()
+
+	stats = timer.stats()
+	assert stats['download'] == (2, 2.0)
+	assert stats['image'][0] == 1
+	assert 'failed' not in stats
+
+def test_crop_poster_converts_mode(temp_dir):
+	from PIL import Image
+
+	source = Path(temp_dir) / 'cover.png'
+	Image.new('RGBA', (800, 538)).save(source)
+	dest_file = Path(temp_dir) / 'poster.jpg'
+
+	assert ImageProcessor.crop_poster(source, dest_file) >= 0
+
+	with Image.open(dest_file) as poster:
+		assert poster.size == (379, 538)
+		assert poster.mode == 'RGB'
+
+@pytest.mark.parametrize('size, split', [
+	((800, 538), None),
+	((800, 538), 380),
+	((800, 538), 460),
+	((1600, 1076), 800),
+	((1200, 538), 700),
+])
+def test_find_poster_left(size, split):
+	import io
+	from PIL import Image
+
+	width, height = size
+	expected = width - 379 if split is None else split
+
+	with Image.open(io.BytesIO(generate_cover(width, height, split=split))) as image:
+		left = ImageProcessor.find_poster_left(image)
+
+	# 标准封面的分界线与估算位置完全一致，其它位置按缩小后的图片查找，允许一列的偏差
+	if split is None:
+		assert left == expected
+	else:
+		assert abs(left - expected) <= width // ImageProcessor.SCAN_WIDTH + 1
+
+def test_find_poster_left_fallback():
+	from PIL import Image
+
+	# 没有明显分界线时按海报宽高比估算，竖版封面直接使用整张图片
+	assert ImageProcessor.find_poster_left(Image.new('RGB', (800, 538), 'gray')) == 800 - 379
+	assert ImageProcessor.find_poster_left(Image.new('RGB', (400, 538), 'gray')) == 0
+
+def test_crop_poster_thumbnails(temp_dir):
+	from PIL import Image
+
+	dest_file = Path(temp_dir) / 'poster.jpg'
+	ImageProcessor.crop_poster(generate_cover(), dest_file, (100, 200, 1000), 'poster-{width}.jpg')
+
+	with Image.open(dest_file) as poster:
+		poster_width, poster_height = poster.size
+
+	for width in (100, 200):
+		with Image.open(Path(temp_dir) / f'poster-{width}.jpg') as thumbnail:
+			assert thumbnail.width == width
+			assert abs(thumbnail.height - poster_height * width / poster_width) <= 1
+
+	# 不超过海报宽度的缩略图才会生成
+	assert not (Path(temp_dir) / 'poster-1000.jpg').exists()
+
+def test_submit_and_wait(image_processor, temp_dir):
+	# 排队上限为1，第二次提交需要等待第一张图片处理完成后释放名额
+	dest_files = [Path(temp_dir) / f'poster_{i}.jpg' for i in range(2)]
+
+	for seed, dest_file in enumerate(dest_files):
+		image_processor.submit(generate_cover(seed=seed), dest_file)
+
+	for dest_file in dest_files:
+		assert image_processor.wait(dest_file) is True
+		assert dest_file.exists()
+
+	stats = image_processor.timer.stats()
+	assert stats['image'][0] == 2
+	assert stats['image_wait'][0] == 2
+
+def test_wait_failure(image_processor, temp_dir):
+	dest_file = Path(temp_dir) / 'poster.jpg'
+	image_processor.submit(b'not an image', dest_file)
+
+	with patch('dvhelper.logger') as mock_logger:
+		assert image_processor.wait(dest_file) is False
+		mock_logger.error.assert_called_once()
+
+	assert not dest_file.exists()
+	# 没有提交过的图片直接返回True
+	assert image_processor.wait(dest_file) is True
+
+def test_release_finished_without_wait(image_processor, temp_dir):
+	dest_file = Path(temp_dir) / 'poster.jpg'
+	failed_file = Path(temp_dir) / 'failed.jpg'
+
+	image_processor.submit(generate_cover(), dest_file).result()
+	future = image_processor.submit(b'not an image', failed_file)
+
+	with pytest.raises(Exception):
+		future.result()
+
+	# 成功的任务完成后立即释放，失败的任务保留到wait()报告错误
+	assert list(image_processor._ImageProcessor__futures) == [failed_file]
+
+	with patch('dvhelper.logger'):
+		assert image_processor.wait(failed_file) is False
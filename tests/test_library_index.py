@@ -0,0 +1,147 @@
+import os
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dvhelper import LibraryIndex
+
+def test_scan_new_changed_unchanged(temp_dir):
+	index_file = Path(temp_dir) / 'library.db'
+	movie1 = Path(temp_dir) / 'ABC-123.mp4'
+	movie2 = Path(temp_dir) / 'DEF-456.mp4'
+	movie1.write_bytes(b'1')
+	movie2.write_bytes(b'2')
+
+	library = LibraryIndex(index_file)
+
+	assert list(library.scan([movie1, movie2])) == [movie1, movie2]
+	assert (library.new, library.changed, library.unchanged) == (2, 0, 0)
+
+	library.record(str(movie1), 'ABC-123', 'done')
+	library.record(str(movie2), 'DEF-456', 'done')
+	library.close()
+
+	movie2.write_bytes(b'changed')
+	movie3 = Path(temp_dir) / 'GHI-789.mp4'
+	movie3.write_bytes(b'3')
+
+	library = LibraryIndex(index_file)
+
+	assert list(library.scan([movie1, movie2, movie3], changed_only=True)) == [movie2, movie3]
+	assert (library.new, library.changed, library.unchanged) == (1, 1, 1)
+
+	library.close()
+
+def test_scan_without_changed_only(temp_dir):
+	movie = Path(temp_dir) / 'ABC-123.mp4'
+	movie.touch()
+
+	library = LibraryIndex(Path(temp_dir) / 'library.db')
+	list(library.scan([movie]))
+	library.record(str(movie), 'ABC-123', 'done')
+
+	assert list(library.scan([movie])) == [movie]
+	assert library.unchanged == 1
+
+	library.close()
+
+def test_scan_retry_failed(temp_dir):
+	movie = Path(temp_dir) / 'ABC-123.mp4'
+	movie.touch()
+	ignored = Path(temp_dir) / 'readme.mp4'
+	ignored.write_bytes(b'ignored')
+
+	library = LibraryIndex(Path(temp_dir) / 'library.db')
+	list(library.scan([movie, ignored]))
+	library.record(str(movie), 'ABC-123', 'failed')
+	library.record(str(ignored), None, 'ignored')
+
+	# 上次处理失败的文件即使没有变化也会重新处理，被忽略的文件仍然跳过
+	assert list(library.scan([movie, ignored], changed_only=True)) == [movie]
+	assert (library.retried, library.unchanged) == (1, 1)
+
+	library.close()
+
+def test_scan_match_path_first(temp_dir):
+	# 两个文件大小和修改时间相同时，按路径找到各自的记录
+	movie1 = Path(temp_dir) / 'ABC-123.mp4'
+	movie2 = Path(temp_dir) / 'DEF-456.mp4'
+	movie1.write_bytes(b'movie')
+	movie2.write_bytes(b'movie')
+	os.utime(movie2, ns=(movie1.stat().st_atime_ns, movie1.stat().st_mtime_ns))
+
+	index_file = Path(temp_dir) / 'library.db'
+	library = LibraryIndex(index_file)
+	list(library.scan([movie1, movie2]))
+	library.record(str(movie1), 'ABC-123', 'failed')
+	library.record(str(movie2), 'DEF-456', 'done')
+	library.close()
+
+	library = LibraryIndex(index_file)
+	assert len(library) == 2
+	assert list(library.scan([movie1, movie2], changed_only=True)) == [movie1]
+	assert (library.retried, library.unchanged) == (1, 1)
+
+	library.close()
+
+def test_scan_skip_missing_file(temp_dir):
+	library = LibraryIndex(Path(temp_dir) / 'library.db')
+
+	assert list(library.scan([Path(temp_dir) / 'missing.mp4'])) == []
+	assert library.new == 0
+
+	library.close()
+
+def test_record_after_move(temp_dir):
+	movie = Path(temp_dir) / 'ABC-123.mp4'
+	movie.write_bytes(b'movie')
+
+	library = LibraryIndex(Path(temp_dir) / 'library.db')
+	list(library.scan([movie]))
+
+	# 处理完成的文件已经被移动，使用扫描时记录的大小和修改时间
+	movie.rename(Path(temp_dir) / 'moved.mp4')
+	library.record(str(movie), 'ABC-123', 'done')
+
+	# 没有经过扫描的文件不会被记录
+	library.record(str(Path(temp_dir) / 'other.mp4'), None, 'failed')
+
+	assert len(library) == 1
+	assert library.stats() == {'total': 1, 'done': 1, 'failed': 0, 'ignored': 0}
+
+	library.close()
+
+def test_scan_moved_file_unchanged(temp_dir):
+	movie = Path(temp_dir) / 'abc123.mp4'
+	movie.write_bytes(b'movie')
+
+	library = LibraryIndex(Path(temp_dir) / 'library.db')
+	list(library.scan([movie]))
+
+	moved = Path(temp_dir) / 'ABC-123.mp4'
+	movie.rename(moved)
+	library.record(str(movie), 'ABC-123', 'done')
+
+	# 移动并改名后的文件按大小和修改时间识别为未变化
+	assert list(library.scan([moved], changed_only=True)) == []
+	assert library.unchanged == 1
+
+	library.record(str(moved), 'ABC-123', 'done')
+	assert len(library) == 1
+
+	library.close()
+
+def test_dvhelper_records_status(dv_helper, temp_dir):
+	movie = Path(temp_dir) / 'ABC-123.mp4'
+	movie.touch()
+
+	dv_helper.library = LibraryIndex(Path(temp_dir) / 'library.db')
+	dv_helper.analyze_keyword = lambda keyword: None
+
+	with patch('builtins.print'), patch('dvhelper.logger'):
+		dv_helper.batch_process(dv_helper.library.scan([movie]), dir_mode=True, root_dir=Path(temp_dir))
+
+	assert dv_helper.library.stats()['failed'] == 1
+	dv_helper.library.close()
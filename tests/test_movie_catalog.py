@@ -0,0 +1,69 @@
+"""测试 MovieCatalog 类的功能"""
+import pytest
+from pathlib import Path
+from dvhelper import MovieCatalog, MovieInfo, NFOGenerator
+
+@pytest.fixture
+def catalog(temp_dir):
+	catalog = MovieCatalog(Path(temp_dir) / 'catalog.db')
+	yield catalog
+	catalog.close()
+
+def make_movie_info(movie_info_dict, **fields):
+	return MovieInfo(dict(movie_info_dict, **fields))
+
+def test_record_and_query(catalog, temp_dir, movie_info_dict):
+	catalog.record(make_movie_info(movie_info_dict), temp_dir / 'ABC-123')
+	catalog.record(make_movie_info(movie_info_dict, number='DEF-456', studio='Other', premiered='2024-02-01',
+								   tags=['tag2'], actresses=['Actress C']), temp_dir / 'DEF-456')
+
+	assert len(catalog) == 2
+	assert [movie.number for movie in catalog.query()] == ['DEF-456', 'ABC-123']
+
+	movies = list(catalog.query([('studio', 'studio y')]))
+	assert [movie.to_dict() for movie in movies] == [dict(movie_info_dict, galleries=[])]
+
+	assert [movie.number for movie in catalog.query([('actress', 'Actress C')])] == ['DEF-456']
+	assert [movie.number for movie in catalog.query([('tag', 'TAG2')], batch_size=1)] == ['DEF-456', 'ABC-123']
+	assert [movie.number for movie in catalog.query([('tag', 'tag2'), ('premiered', '2023')])] == ['ABC-123']
+	assert [movie.number for movie in catalog.query([('premiered', '2024-02')])] == ['DEF-456']
+	assert [movie.number for movie in catalog.query([('number', 'abc-123')])] == ['ABC-123']
+	assert list(catalog.query([('actress', 'Nobody')])) == []
+
+	with pytest.raises(ValueError):
+		list(catalog.query([('title', 'Test Movie')]))
+
+def test_record_replaces_movie(catalog, temp_dir, movie_info_dict):
+	catalog.record(make_movie_info(movie_info_dict), temp_dir)
+	catalog.record(make_movie_info(movie_info_dict, actresses=['Actress C'], tags=[]), temp_dir)
+
+	assert len(catalog) == 1
+	movie = next(catalog.query())
+	assert movie.actresses == ('Actress C',)
+	assert movie.tags == ()
+	assert list(catalog.query([('actress', 'Actress A')])) == []
+
+def test_backfill(catalog, temp_dir, movie_info_dict):
+	for number in ('ABC-123', 'DEF-456'):
+		movie_path = temp_dir / 'Actress A' / f'[{number}](2023)'
+		movie_path.mkdir(parents=True)
+		NFOGenerator(make_movie_info(movie_info_dict, number=number)).save(movie_path / f'{number}.nfo')
+
+	(temp_dir / 'broken.nfo').write_bytes(b'<movie>')
+
+	assert catalog.backfill(temp_dir) == 2
+	assert sorted(movie.number for movie in catalog.query([('actress', 'Actress B')])) == ['ABC-123', 'DEF-456']
+
+def test_backfill_removes_missing(catalog, temp_dir, movie_info_dict):
+	library_dir = temp_dir / 'library'
+	movie_path = library_dir / 'Actress A' / '[ABC-123](2023)'
+	movie_path.mkdir(parents=True)
+	NFOGenerator(make_movie_info(movie_info_dict)).save(movie_path / 'ABC-123.nfo')
+
+	catalog.record(make_movie_info(movie_info_dict, number='DEF-456'), library_dir / 'Actress A' / '[DEF-456](2023)')
+	catalog.record(make_movie_info(movie_info_dict, number='XYZ-789'), temp_dir / 'other' / '[XYZ-789](2023)')
+
+	# 目录下已经不存在的影片被删除，其它目录中的影片保留
+	assert catalog.backfill(library_dir) == 1
+	assert sorted(movie.number for movie in catalog.query()) == ['ABC-123', 'XYZ-789']
+	assert [movie.number for movie in catalog.query([('actress', 'Actress A')])] == ['ABC-123', 'XYZ-789']
@@ -0,0 +1,78 @@
+"""测试 MovieExporter 类的功能"""
+import csv
+import json
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+from dvhelper import MovieExporter, MovieInfo, FrozenMovieInfo
+
+def generate_movies(movie_info_dict: dict, count: int):
+	for i in range(count):
+		yield FrozenMovieInfo(dict(movie_info_dict, number=f'ABC-{i:03d}'))
+
+@pytest.mark.parametrize('file_name, expected', [
+	('movies.jsonl', 'jsonl'),
+	('movies.CSV', 'csv'),
+	('movies.parquet', 'parquet'),
+	('movies.feather', 'arrow'),
+	('movies.xlsx', None),
+])
+def test_format_of(file_name, expected):
+	assert MovieExporter.format_of(file_name) == expected
+
+def test_unsupported_format(temp_dir):
+	with pytest.raises(ValueError):
+		MovieExporter(Path(temp_dir) / 'movies.xlsx')
+
+def test_is_available():
+	assert MovieExporter.is_available('csv') is True
+
+	with patch('importlib.util.find_spec', return_value=None):
+		assert MovieExporter.is_available('parquet') is False
+
+def test_export_jsonl(temp_dir, movie_info_dict):
+	output_file = Path(temp_dir) / 'movies.jsonl'
+
+	assert MovieExporter(output_file, batch_size=2).export(generate_movies(movie_info_dict, 5)) == 5
+
+	records = [json.loads(line) for line in output_file.read_text(encoding='utf-8').splitlines()]
+	assert [record['number'] for record in records] == [f'ABC-{i:03d}' for i in range(5)]
+	assert list(records[0]) == list(MovieExporter.FIELDS)
+	assert MovieInfo.from_dict(records[0]) == MovieInfo(dict(movie_info_dict, number='ABC-000', galleries=[]))
+
+def test_export_csv(temp_dir, movie_info_dict):
+	output_file = Path(temp_dir) / 'movies.csv'
+	movie_info_dict['title'] = 'Title, with "quotes"'
+
+	assert MovieExporter(output_file, batch_size=2).export(generate_movies(movie_info_dict, 3)) == 3
+
+	with open(output_file, encoding='utf-8', newline='') as f:
+		rows = list(csv.DictReader(f))
+
+	assert len(rows) == 3
+	assert list(rows[0]) == list(MovieExporter.FIELDS)
+	assert 'galleries' not in rows[0]
+	assert rows[0]['title'] == 'Title, with "quotes"'
+	assert rows[0]['actresses'] == 'Actress A|Actress B'
+
+def test_export_empty(temp_dir):
+	output_file = Path(temp_dir) / 'movies.jsonl'
+
+	assert MovieExporter(output_file).export([]) == 0
+	assert output_file.read_text(encoding='utf-8') == ''
+
+@pytest.mark.parametrize('file_name', ['movies.parquet', 'movies.arrow'])
+def test_export_arrow(temp_dir, movie_info_dict, file_name):
+	pa = pytest.importorskip('pyarrow')
+	output_file = Path(temp_dir) / file_name
+
+	assert MovieExporter(output_file, batch_size=2).export(generate_movies(movie_info_dict, 5)) == 5
+
+	if file_name.endswith('.parquet'):
+		import pyarrow.parquet as pq
+		table = pq.read_table(output_file)
+	else:
+		table = pa.ipc.open_file(str(output_file)).read_all()
+
+	assert table.num_rows == 5
+	assert table.column('tags').to_pylist()[0] == movie_info_dict['tags']
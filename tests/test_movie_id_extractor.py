@@ -0,0 +1,115 @@
+"""测试 MovieIdExtractor 类的功能"""
+import re
+import random
+from pathlib import Path
+
+from dvhelper import Config, MovieIdExtractor
+
+
+LEGACY_IGNORED_PATTERN = re.compile(r'(144|240|360|480|720|1080)[Pp]|[24][Kk]|\w+2048\.com|Carib(beancom)?|[^a-z\d](f?hd|lt)[^a-z\d]')
+
+def legacy_analyze_keyword(config: Config, keyword: str):
+	"""改为规则表之前的逐条分支实现，作为结果一致性的基准"""
+	keyword = LEGACY_IGNORED_PATTERN.sub('', keyword).upper()
+
+	if 'FC2' in keyword:
+		match = config.fc2_movie_pattern.search(keyword)
+		if match:
+			return f'FC2-{match.group(2)}'
+	elif '259LUXU' in keyword:
+		match = config._259luxu_movie_pattern.search(keyword)
+		if match:
+			return f'259LUXU-{match.group(1)}'
+	elif '200GANA' in keyword:
+		match = config._200gana_movie_pattern.search(keyword)
+		if match:
+			return f'200GANA-{match.group(1)}'
+	elif '300MIUM' in keyword:
+		match = config._300mium_movie_pattern.search(keyword)
+		if match:
+			return f'300MIUM-{match.group(1)}'
+	else:
+		match = config.normal_movie_pattern.search(keyword)
+		if match:
+			return match.group(1) + '-' + match.group(2)
+
+		match = config.normal_movie_pattern2.search(keyword)
+		if match:
+			return match.group(1) + '-' + match.group(2)
+
+def generate_filenames(count: int, seed: int=2048):
+	"""生成模拟真实下载文件名的测试数据"""
+	rng = random.Random(seed)
+	letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+	prefixes = ['', 'hhd800.com@', 'bbs2048.com@', '[HD]', '【高清】', 'www.98T.la@', '(Carib)']
+	suffixes = ['', '-C', '_CH', '-UC', '.HD', ' 1080p', '-4K', ' [中文字幕]', '-cd1', ' FHD ']
+	extensions = ['.mp4', '.mkv', '.avi', '.wmv', '.ts']
+
+	def studio():
+		return ''.join(rng.choices(letters, k=rng.randint(2, 6)))
+
+	def title():
+		return ''.join(chr(rng.randint(0x4E00, 0x9FA5)) for _ in range(rng.randint(20, 60)))
+
+	def number(low: int=2, high: int=5):
+		return str(rng.randint(10 ** (low - 1), 10 ** high - 1)).zfill(low)
+
+	templates = [
+		lambda: f'{studio()}-{number(3, 3)}',
+		lambda: f'{studio().lower()}{number(3, 3)}',
+		lambda: f'{studio()}_{number(3, 4)}',
+		lambda: f'FC2-PPV-{number(6, 7)}',
+		lambda: f'fc2 ppv {number(6, 7)}',
+		lambda: f'FC2-{studio()}{number(3, 3)}',
+		lambda: f'259LUXU-{number(3, 4)}',
+		lambda: f'200GANA-{number(3, 4)}',
+		lambda: f'300MIUM-{number(3, 3)}',
+		lambda: f'Some Movie Title {rng.randint(1990, 2025)}',
+		lambda: f'{studio()}-{number(3, 3)} {title()}',
+		lambda: f'【{title()}】{studio()}{number(3, 3)}',
+		lambda: f'{studio()} {number(1, 1)}',
+		lambda: f'{studio().lower()}{number(2, 3)}{studio().lower()}2048.com@{studio()}-{number(3, 3)}',
+	]
+
+	return [
+		f'{rng.choice(prefixes)}{rng.choice(templates)()}{rng.choice(suffixes)}{rng.choice(extensions)}'
+		for _ in range(count)
+	]
+
+def test_movie_id_extractor_extract(config):
+	extractor = MovieIdExtractor(config.movie_id_rules, config.ignored_movie_pattern)
+
+	assert extractor.extract('abc-123') == 'ABC-123'
+	assert extractor.extract('bbs2048.com@ABC123-C 1080p') == 'ABC-123'
+	assert extractor.extract('1080pbbs2048.com@SSIS123.mp4') == 'SSIS-123'
+	assert extractor.extract('4Kabc2048.com@xyz123') == 'XYZ-123'
+	assert extractor.extract('FC2 PPV-123456') == 'FC2-123456'
+	assert extractor.extract('300MIUM-9012') == '300MIUM-9012'
+
+	# 包含触发关键词但规则不匹配时，不会退回到通用规则
+	assert extractor.extract('FC2-ABC456') is None
+	assert extractor.extract('259LUXU-ABC1234') is None
+	assert extractor.extract('Invalid Keyword') is None
+
+def test_movie_id_extractor_custom_rules(config):
+	rules = (
+		('HEYZO', re.compile(r'HEYZO[^\d]{0,3}(\d{4})', re.I), 'HEYZO-{1}'),
+		*config.movie_id_rules,
+	)
+	extractor = MovieIdExtractor(rules)
+
+	assert extractor.extract('heyzo_1234') == 'HEYZO-1234'
+	assert extractor.extract('HEYZO-ABC') is None
+	assert extractor.extract('ABC-123') == 'ABC-123'
+
+def test_movie_id_extractor_batch(config):
+	extractor = MovieIdExtractor(config.movie_id_rules, config.ignored_movie_pattern)
+	keywords = [Path('/movies/ABC-123.mp4'), Path('/movies/FC2-999/readme.mp4'), '259LUXU-1234']
+
+	assert extractor.extract_batch(keywords) == ['ABC-123', None, '259LUXU-1234']
+
+def test_movie_id_extractor_matches_legacy(config):
+	extractor = MovieIdExtractor(config.movie_id_rules, config.ignored_movie_pattern)
+	filenames = generate_filenames(20000)
+
+	assert extractor.extract_batch(filenames) == [legacy_analyze_keyword(config, filename) for filename in filenames]
@@ -1,5 +1,7 @@
 """测试 MovieInfo 类的功能"""
-from dvhelper import MovieInfo
+import pickle
+import pytest
+from dvhelper import MovieInfo, FrozenMovieInfo
 
 
 def test_movie_info_initialize(movie_info_dict, movie_info):
@@ -28,3 +30,39 @@ def test_movie_info_with_default_values():
 	assert movie_info.actresses == []
 	assert movie_info.country == '日本'
 	assert movie_info.mpaa == 'NC-17'
+
+def test_movie_info_round_trip(movie_info_dict):
+	movie_info = MovieInfo.from_dict(movie_info_dict)
+
+	assert not hasattr(movie_info, '__dict__')
+	assert movie_info.to_dict() == movie_info_dict
+	assert MovieInfo.from_dict(movie_info.to_dict()) == movie_info
+	assert pickle.loads(pickle.dumps(movie_info)) == movie_info
+
+	# 可变的影片信息按字段比较，不能作为字典键
+	with pytest.raises(TypeError):
+		hash(movie_info)
+
+def test_movie_info_interned_strings(movie_info_dict):
+	# 使用拼接生成的字符串模拟不同页面解析出的相同取值
+	other_dict = dict(movie_info_dict, studio=''.join(['Studio', ' Y']), tags=[''.join(['tag', '1'])])
+
+	assert MovieInfo(movie_info_dict).studio is MovieInfo(other_dict).studio
+	assert MovieInfo(movie_info_dict).tags[0] is MovieInfo(other_dict).tags[0]
+	# 不需要驻留的列表字段直接使用源字典中的列表
+	assert MovieInfo(movie_info_dict).galleries is movie_info_dict['galleries']
+
+def test_frozen_movie_info(movie_info_dict):
+	frozen = FrozenMovieInfo.from_dict(movie_info_dict)
+
+	assert frozen.tags == tuple(movie_info_dict['tags'])
+	assert FrozenMovieInfo({'number': 'ABC-123'}).galleries == ()
+	assert frozen.to_dict() == movie_info_dict
+	assert len({frozen, FrozenMovieInfo(movie_info_dict)}) == 1
+	assert pickle.loads(pickle.dumps(frozen)) == frozen
+
+	with pytest.raises(AttributeError):
+		frozen.title = 'New Title'
+
+	with pytest.raises(AttributeError):
+		del frozen.title
@@ -3,7 +3,7 @@ import os
 import sys
 import pytest
 from unittest.mock import patch
-from dvhelper import MovieParser
+from dvhelper import MovieParser, ActressAliasIndex
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -25,12 +25,104 @@ def test_parse_search_results(search_html, keyword, use_search_html, expected_re
 		else:
 			assert result is None
 
-def test_parse_movie_details(detail_html, actress_alias):
+SEARCH_TARGET_CLASS = 'flex flex-col relative hover:bg-zinc-100 hover:dark:bg-zinc-800'
+
+def search_card(movie_id: str, title: str='影片标题'):
+	"""生成与真实搜索页结构相同的影片卡片，封面链接和标题链接是两个 <a> 标签"""
+	return (
+		f'<div class="{SEARCH_TARGET_CLASS}">'
+		f'<a href="/movie/{movie_id}"><img src="https://example.com/{movie_id}.jpg"></a>'
+		f'<a href="/movie/{movie_id}" title="{movie_id} {title}">{movie_id} {title}</a>'
+		'</div>'
+	)
+
+@pytest.mark.parametrize('stream, content_type', [
+	(True, str),
+	(True, bytes),
+	(True, list),
+	(False, str),
+	(False, bytes),
+])
+def test_parse_search_results_card_layout(stream, content_type):
+	search_html = f'<html><body>{search_card("abc-1234")}{search_card("ABC-123", "测试影片")}</body></html>'
+
+	if content_type is bytes:
+		search_html = search_html.encode('utf-8')
+	elif content_type is list:
+		content = search_html.encode('utf-8')
+		search_html = [content[i:i + 7] for i in range(0, len(content), 7)]
+
+	with patch('dvhelper.config') as mock_config:
+		mock_config.search_target_class = SEARCH_TARGET_CLASS
+		mock_config.base_url = 'https://example.com'
+
+		result = MovieParser.parse_search_results(search_html, 'abc-123', stream=stream)
+
+		# 完整影片ID匹配优先于出现在前面的子串匹配
+		assert result == {
+			'detail_url': 'https://example.com/movie/ABC-123',
+			'title': 'ABC-123 测试影片',
+			'fanart_url': 'https://example.com/ABC-123.jpg'
+		}
+
+def test_parse_search_results_substring_fallback():
+	search_html = f'<html><body>{search_card("XYZ-1")}{search_card("ABC-1234")}{search_card("ABC-1235")}</body></html>'
+
+	with patch('dvhelper.config') as mock_config:
+		mock_config.search_target_class = SEARCH_TARGET_CLASS
+		mock_config.base_url = 'https://example.com'
+
+		result = MovieParser.parse_search_results(search_html, 'ABC-123')
+
+		assert result['detail_url'] == 'https://example.com/movie/ABC-1234'
+
+def test_parse_search_results_stop_early():
+	def chunks():
+		yield f'<html><body>{search_card("ABC-123")}'.encode('utf-8')
+		yield search_card('XYZ-456').encode('utf-8')
+		raise AssertionError('完整匹配之后的内容不应该被读取')
+
+	with patch('dvhelper.config') as mock_config:
+		mock_config.search_target_class = SEARCH_TARGET_CLASS
+		mock_config.base_url = 'https://example.com'
+
+		result = MovieParser.parse_search_results(chunks(), 'ABC-123')
+
+		assert result['detail_url'] == 'https://example.com/movie/ABC-123'
+
+@pytest.mark.parametrize('stream', [True, False])
+def test_parse_search_results_title(search_html, stream):
+	with patch('dvhelper.config') as mock_config:
+		mock_config.search_target_class = SEARCH_TARGET_CLASS
+		mock_config.base_url = 'https://example.com'
+
+		# 标题取卡片中第一个带 title 属性的 <a> 标签，不再固定读取第二个 <a> 标签，
+		# 只有一个 <a> 标签的卡片也能读取到标题
+		assert MovieParser.parse_search_results(search_html, 'ABC-123', stream=stream) == {
+			'detail_url': 'https://example.com/movie/123',
+			'title': 'ABC-123 Test Movie',
+			'fanart_url': 'https://example.com/image.jpg'
+		}
+
+@pytest.mark.parametrize('stream, content_type', [
+	(True, str),
+	(True, bytes),
+	(True, list),
+	(False, str),
+	(False, bytes),
+])
+def test_parse_movie_details(detail_html, actress_alias, stream, content_type):
+	if content_type is bytes:
+		detail_html = detail_html.encode('utf-8')
+	elif content_type is list:
+		content = detail_html.encode('utf-8')
+		detail_html = [content[i:i + 7] for i in range(0, len(content), 7)]
+
 	with patch('dvhelper.config') as mock_config:
 		mock_config.movie_target_class = 'flex flex-col gap-2'
-		mock_config.actress_alias = actress_alias
+		mock_config.actress_alias_index = ActressAliasIndex(aliases=actress_alias)
 
-		result = MovieParser.parse_movie_details(detail_html)
+		result = MovieParser.parse_movie_details(detail_html, stream=stream)
 
 		assert result is not None
 		assert result['number'] == 'ABC-123'
@@ -45,9 +137,51 @@ def test_parse_movie_details(detail_html, actress_alias):
 		assert result['trailer_url'] == 'https://example.com/trailer.mp4'
 		assert len(result['galleries']) == 2
 
-		result = MovieParser.parse_movie_details('')
+		result = MovieParser.parse_movie_details('', stream=stream)
 		assert result == {}
 
+def test_parse_movie_details_stop_early(detail_html):
+	def chunks():
+		yield f'<html><body><div>{detail_html}</div>'.encode('utf-8')
+		yield '<div class="related">'.encode('utf-8')
+		raise AssertionError('剧照链接之后的内容不应该被读取')
+
+	with patch('dvhelper.config') as mock_config:
+		mock_config.movie_target_class = 'flex flex-col gap-2'
+		mock_config.actress_alias_index = None
+
+		result = MovieParser.parse_movie_details(chunks())
+
+		assert result['number'] == 'ABC-123'
+		assert result['trailer_url'] == 'https://example.com/trailer.mp4'
+		assert result['galleries'] == ['https://example.com/gallery1.jpg', 'https://example.com/gallery2.jpg']
+
+INFO_LIST = '<ul class="flex flex-col gap-2"><li>番号:ABC-123复制</li></ul>'
+TRAILER = '<a href="https://example.com/trailer.mp4" data-fancybox="gallery" data-caption="预告片"></a>'
+GALLERY = '<a href="https://example.com/gallery1.jpg" data-fancybox="gallery"></a>'
+
+@pytest.mark.parametrize('stream', [True, False])
+@pytest.mark.parametrize('layout', [
+	# 剧照和预告片位于不同的容器中
+	f'<div>{INFO_LIST}<div>{GALLERY}</div><div>{TRAILER}</div></div>',
+	f'<div>{INFO_LIST}<div>{TRAILER}</div><div>{GALLERY}</div></div>',
+	f'<div><div>{TRAILER}</div>{INFO_LIST}<div><p>{GALLERY}</p></div></div>',
+])
+def test_parse_movie_details_media_containers(layout, stream):
+	def chunks():
+		yield f'<html><body>{layout}'.encode('utf-8')
+		yield '<div class="related">相关影片</div></body></html>'.encode('utf-8')
+
+	with patch('dvhelper.config') as mock_config:
+		mock_config.movie_target_class = 'flex flex-col gap-2'
+		mock_config.actress_alias_index = None
+
+		result = MovieParser.parse_movie_details(chunks() if stream else b''.join(chunks()), stream=stream)
+
+		assert result['number'] == 'ABC-123'
+		assert result['trailer_url'] == 'https://example.com/trailer.mp4'
+		assert result['galleries'] == ['https://example.com/gallery1.jpg']
+
 def test_extract_info_from_list():
 	content_list = [
 		'番号:ABC-123复制',
@@ -73,12 +207,11 @@ def test_extract_info_from_list():
 	assert result['tags'] == ['tag1', 'tag2']
 	assert result['actresses'] == ['Actress A', 'Actress B']
 
-def test_resolve_actress_alias(actress_alias):
+def test_parse_movie_details_resolve_actress_alias(detail_html):
 	with patch('dvhelper.config') as mock_config:
-		mock_config.actress_alias = actress_alias
+		mock_config.movie_target_class = 'flex flex-col gap-2'
+		mock_config.actress_alias_index = ActressAliasIndex(aliases={'Fixed A': ['Actress A']})
+
+		result = MovieParser.parse_movie_details(detail_html)
 
-		parser = MovieParser()
-		assert parser._MovieParser__resolve_actress_alias('Alias A1') == 'Actress A'
-		assert parser._MovieParser__resolve_actress_alias('Alias A2') == 'Actress A'
-		assert parser._MovieParser__resolve_actress_alias('Alias B1') == 'Actress B'
-		assert parser._MovieParser__resolve_actress_alias('Unknown Actress') == 'Unknown Actress'
+		assert result['actresses'] == ['Fixed A', 'Actress B']
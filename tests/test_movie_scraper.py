@@ -3,12 +3,45 @@ import os
 import sys
 from pathlib import Path
 from unittest.mock import MagicMock, patch
-from dvhelper import MovieScraper
+from dvhelper import MovieScraper, ResponseCache
 import pytest
 from selenium.common.exceptions import TimeoutException
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+def generate_cover(width: int=800, height: int=538, seed: int=0, split: int=None):
+	"""
+	生成由背面和正面两部分拼接而成的JPEG封面图片内容
+
+	Args:
+		width: 封面宽度
+		height: 封面高度
+		seed: 随机数种子
+		split: 正面部分的左边界，默认为标准封面的 width - 379
+	"""
+	import io
+	import random
+	from PIL import Image, ImageDraw
+
+	rng = random.Random(seed)
+	split = width - 379 if split is None else split
+	image = Image.linear_gradient('L').resize((width, height)).convert('RGB')
+	draw = ImageDraw.Draw(image)
+
+	# 背面和正面使用不同的底色
+	for box in ((0, 0, split, height), (split, 0, width, height)):
+		color = (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+		image.paste(Image.blend(image.crop(box), Image.new('RGB', (box[2] - box[0], height), color), 0.7), box[:2])
+
+	for _ in range(60):
+		x, y = rng.randrange(width), rng.randrange(height)
+		draw.ellipse((x, y, x + rng.randint(5, 80), y + rng.randint(5, 80)),
+					 fill=(rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+
+	buffer = io.BytesIO()
+	image.save(buffer, format='JPEG', quality=90)
+	return buffer.getvalue()
+
 def test_scraper_initialize():
 	with patch('dvhelper.requests') as mock_requests:
 		mock_session = MagicMock()
@@ -228,14 +261,19 @@ def create_driver_fallback_side_effect(mock_driver):
 	(True, '<html><body>Session Test Data</body></html>'),
 ])
 def test_scraper_fetch_data(use_session, expected_content):
-	if use_session:
+	mock_response = MagicMock()
+	mock_response.text = expected_content
+	mock_response.raise_for_status.return_value = None
+
+	with patch('dvhelper.requests') as mock_requests:
 		scraper = MovieScraper()
-		mock_session = MagicMock()
-		scraper._MovieScraper__session = mock_session
 
-		mock_response = MagicMock()
-		mock_response.text = expected_content
-		mock_response.raise_for_status.return_value = None
+		if use_session:
+			mock_session = MagicMock()
+			scraper._MovieScraper__session = mock_session
+		else:
+			mock_session = mock_requests.Session.return_value
+
 		mock_session.get.return_value = mock_response
 
 		result = scraper.fetch_data('https://example.com')
@@ -243,32 +281,21 @@ def test_scraper_fetch_data(use_session, expected_content):
 		assert result == expected_content
 		mock_session.get.assert_called_once()
 
+		if use_session:
+			mock_requests.Session.assert_not_called()
+		else:
+			mock_requests.Session.assert_called_once()
+
 		call_args = mock_session.get.call_args
 		assert call_args[1]['url'] == 'https://example.com'
 		assert 'timeout' in call_args[1]
 		assert 'headers' in call_args[1]
-	else:
-		with patch('dvhelper.requests.get') as mock_get:
-			mock_response = MagicMock()
-			mock_response.text = expected_content
-			mock_response.raise_for_status.return_value = None
-
-			mock_get.return_value = mock_response
-			scraper = MovieScraper()
-			result = scraper.fetch_data('https://example.com')
-
-			assert result == expected_content
-			mock_get.assert_called_once()
-
-			call_args = mock_get.call_args
-			assert call_args[1]['url'] == 'https://example.com'
-			assert 'timeout' in call_args[1]
-			assert 'headers' in call_args[1]
 
 def test_scraper_fetch_data_failure():
-	with patch('dvhelper.requests.get') as mock_get:
+	with patch('dvhelper.requests') as mock_requests:
 		from requests.exceptions import RequestException
 
+		mock_get = mock_requests.Session.return_value.get
 		mock_get.side_effect = RequestException("Connection error")
 		scraper = MovieScraper()
 		result = scraper.fetch_data('https://example.com', max_retries=2)
@@ -276,11 +303,67 @@ def test_scraper_fetch_data_failure():
 		assert result is None
 		assert mock_get.call_count == 2
 
+def test_scraper_fetch_data_raw(temp_dir):
+	with patch('dvhelper.requests') as mock_requests:
+		mock_response = mock_requests.Session.return_value.get.return_value
+		mock_response.status_code = 200
+		mock_response.content = '<html>页面</html>'.encode('utf-8')
+		mock_response.headers = {}
+
+		scraper = MovieScraper()
+		scraper.cache = ResponseCache(temp_dir / 'cache.db', ttl=60, max_size=1024)
+
+		assert scraper.fetch_data('https://example.com/page', raw=True) == mock_response.content
+		assert scraper.fetch_data('https://example.com/page', raw=True) == mock_response.content
+		assert scraper.cache.hits == 1
+		scraper.cache.close()
+
+def test_scraper_fetch_data_rate_limiter():
+	with patch('dvhelper.requests') as mock_requests:
+		mock_response = mock_requests.Session.return_value.get.return_value
+		mock_response.status_code = 429
+		mock_response.headers = {'Retry-After': '5'}
+
+		scraper = MovieScraper()
+		scraper.rate_limiter = MagicMock()
+		scraper.fetch_data('https://example.com/page')
+
+		scraper.rate_limiter.acquire.assert_called_once_with('https://example.com/page')
+		scraper.rate_limiter.feedback.assert_called_once_with('https://example.com/page', 429, '5')
+
+def test_scraper_create_session():
+	scraper = MovieScraper()
+
+	with patch('dvhelper.config') as mock_config:
+		mock_config.http_pool_size = 4
+		mock_config.http_retries = 1
+		mock_config.http_retry_backoff = 0.1
+
+		import requests
+		with patch('dvhelper.requests.Session', requests.Session):
+			session = scraper.create_session()
+
+	adapter = session.get_adapter('https://avfan.com')
+	assert adapter._pool_connections == 4
+	assert adapter._pool_maxsize == 4
+	assert adapter.max_retries.total == 1
+	assert not adapter.max_retries.respect_retry_after_header
+	assert session.get_adapter('https://img.example.com') is adapter
+	assert session.headers['User-Agent'] == MovieScraper.REQUESTS_HEADERS['User-Agent']
+
+def test_scraper_shared_session():
+	with patch('dvhelper.requests') as mock_requests:
+		scraper = MovieScraper()
+
+		assert scraper.session is scraper.session
+		mock_requests.Session.assert_called_once()
+
 @pytest.mark.parametrize('crop', [False, True])
 def test_scraper_fetch_media_success(temp_dir, crop):
-	with patch('dvhelper.requests.get') as mock_get:
+	with patch('dvhelper.requests') as mock_requests:
+		mock_get = mock_requests.Session.return_value.get
 		mock_response = MagicMock()
-		mock_response.headers = {'content-length': '10'}
+		mock_response.headers = {'content-length': '9'}
 		mock_response.iter_content.return_value = [b'test_data']
 		mock_get.return_value = mock_response
 
@@ -305,14 +388,114 @@ def test_scraper_fetch_media_success(temp_dir, crop):
 
 			if crop:
 				from dvhelper import config
-				mock_crop_image.assert_called_once_with(temp_dir / media_file, temp_dir / config.poster_image)
+				mock_crop_image.assert_called_once_with(b'test_data', temp_dir / config.poster_image)
 			else:
 				mock_crop_image.assert_not_called()
 
+def mock_media_response(status_code: int, headers: dict, chunks: list[bytes]):
+	response = MagicMock()
+	response.status_code = status_code
+	response.headers = headers
+	response.iter_content.return_value = chunks
+	return response
+
+def test_scraper_fetch_media_resume(temp_dir):
+	(temp_dir / 'trailer.mp4.part').write_bytes(b'test_')
+	(temp_dir / 'trailer.mp4.part.validator').write_text('"v1"')
+
+	with patch('dvhelper.requests') as mock_requests:
+		mock_get = mock_requests.Session.return_value.get
+		mock_get.return_value = mock_media_response(206, {'content-range': 'bytes 5-8/9', 'content-length': '4'}, [b'data'])
+
+		assert MovieScraper().fetch_media(temp_dir, 'trailer.mp4', 'https://example.com/trailer.mp4') is True
+
+		assert mock_get.call_args.kwargs['headers'] == {'Range': 'bytes=5-', 'If-Range': '"v1"'}
+
+	assert (temp_dir / 'trailer.mp4').read_bytes() == b'test_data'
+	assert not (temp_dir / 'trailer.mp4.part').exists()
+	assert not (temp_dir / 'trailer.mp4.part.validator').exists()
+
+def test_scraper_fetch_media_resume_ignored(temp_dir):
+	# 服务器不支持续传或文件已经变化时返回完整的文件，从头写入
+	(temp_dir / 'trailer.mp4.part').write_bytes(b'stale')
+	(temp_dir / 'trailer.mp4.part.validator').write_text('"v1"')
+
+	with patch('dvhelper.requests') as mock_requests:
+		mock_requests.Session.return_value.get.return_value = mock_media_response(200, {'content-length': '9'}, [b'test_data'])
+
+		assert MovieScraper().fetch_media(temp_dir, 'trailer.mp4', 'https://example.com/trailer.mp4') is True
+
+	assert (temp_dir / 'trailer.mp4').read_bytes() == b'test_data'
+	assert not (temp_dir / 'trailer.mp4.part.validator').exists()
+
+def test_scraper_fetch_media_resume_without_validator(temp_dir):
+	# 没有保存ETag或Last-Modified的临时文件无法确认是否有效，从头下载
+	(temp_dir / 'trailer.mp4.part').write_bytes(b'stale')
+
+	with patch('dvhelper.requests') as mock_requests:
+		mock_get = mock_requests.Session.return_value.get
+		mock_get.return_value = mock_media_response(200, {'content-length': '9'}, [b'test_data'])
+
+		assert MovieScraper().fetch_media(temp_dir, 'trailer.mp4', 'https://example.com/trailer.mp4') is True
+
+		assert mock_get.call_args.kwargs['headers'] is None
+
+	assert (temp_dir / 'trailer.mp4').read_bytes() == b'test_data'
+
+@pytest.mark.parametrize('headers, expected', [
+	({'etag': '"v1"', 'last-modified': 'Wed, 01 Jan 2025 00:00:00 GMT'}, '"v1"'),
+	({'etag': 'W/"v1"', 'last-modified': 'Wed, 01 Jan 2025 00:00:00 GMT'}, 'Wed, 01 Jan 2025 00:00:00 GMT'),
+	({'etag': 'W/"v1"'}, None),
+	({}, None),
+])
+def test_scraper_save_validator(temp_dir, headers, expected):
+	part_file = temp_dir / 'trailer.mp4.part'
+	part_file.write_bytes(b'test_')
+	MovieScraper.save_validator(part_file, headers)
+
+	if expected:
+		assert MovieScraper.resume_headers(part_file) == (5, {'Range': 'bytes=5-', 'If-Range': expected})
+	else:
+		assert MovieScraper.resume_headers(part_file) == (0, None)
+		assert not part_file.exists()
+
+def test_scraper_fetch_media_incomplete(temp_dir):
+	with patch('dvhelper.requests') as mock_requests, \
+		 patch('builtins.print'):
+		mock_get = mock_requests.Session.return_value.get
+		mock_get.side_effect = [
+			mock_media_response(200, {'content-length': '9', 'etag': '"v1"'}, [b'test_']),
+			mock_media_response(416, {}, []),
+			mock_media_response(200, {'content-length': '9', 'etag': '"v1"'}, [b'test_']),
+		]
+
+		assert MovieScraper().fetch_media(temp_dir, 'fanart.jpg', 'https://example.com/image.jpg', max_retries=3) is False
+
+		# 第二次请求续传，服务器返回416后删除未完成的文件，第三次从头下载
+		assert [call.kwargs['headers'] for call in mock_get.call_args_list] == [None, {'Range': 'bytes=5-', 'If-Range': '"v1"'}, None]
+
+	# 不完整的下载不会留下媒体文件，临时文件保留用于下次续传
+	assert not (temp_dir / 'fanart.jpg').exists()
+	assert (temp_dir / 'fanart.jpg.part').read_bytes() == b'test_'
+
+@pytest.mark.parametrize('status, headers, offset, expected', [
+	(200, {'content-length': '100'}, 0, (0, 100)),
+	(200, {'content-length': '100'}, 50, (0, 100)),
+	(200, {'content-length': '100', 'content-encoding': 'gzip'}, 0, (0, None)),
+	(200, {}, 0, (0, None)),
+	(206, {'content-range': 'bytes 50-99/100', 'content-length': '50'}, 50, (50, 100)),
+	(206, {'content-range': 'bytes 50-99/*', 'content-length': '50'}, 50, (50, 100)),
+	(206, {'content-range': 'bytes 0-99/100'}, 50, None),
+	(206, {}, 50, None),
+])
+def test_scraper_parse_download_range(status, headers, offset, expected):
+	assert MovieScraper.parse_download_range(status, headers, offset) == expected
+
 def test_scraper_fetch_media_failure(temp_dir):
-	with patch('dvhelper.requests.get') as mock_get:
+	with patch('dvhelper.requests') as mock_requests:
 		from requests.exceptions import RequestException
 
+		mock_get = mock_requests.Session.return_value.get
 		mock_get.side_effect = RequestException("Connection error")
 
 		scraper = MovieScraper()
@@ -325,25 +508,154 @@ def test_scraper_fetch_media_failure(temp_dir):
 		assert mock_get.call_count == 2
 #endregion
 
+def test_scraper_fetch_media_batch(temp_dir):
+	scraper = MovieScraper()
+	media_list = [
+		('gallery_00.jpg', 'https://img.example.com/1.jpg'),
+		('gallery_01.jpg', 'https://img.example.com/2.jpg'),
+		('ABC-123_trailer.mp4', 'https://video.example.com/trailer.mp4'),
+	]
+
+	with patch('dvhelper.config') as mock_config, \
+		 patch.object(scraper, 'fetch_media', side_effect=[True, False, True]) as mock_fetch_media:
+		mock_config.media_download_workers = 2
+		mock_config.media_connections_per_host = 1
+
+		assert scraper.fetch_media_batch(temp_dir, media_list) == 2
+		assert mock_fetch_media.call_count == 3
+
+		for call in mock_fetch_media.call_args_list:
+			assert call.args[0] == temp_dir
+			assert call.kwargs['progress'] is False
+
+		semaphores = scraper._MovieScraper__host_semaphores
+		assert set(semaphores) == {'img.example.com', 'video.example.com'}
+
+	assert scraper.fetch_media_batch(temp_dir, []) == 0
+
 def test_scraper_crop_image(crop_image):
 	scraper = MovieScraper()
 	src_file = crop_image['src_file']
 	dest_file = crop_image['dest_file']
 	src_file.touch()
 
-	with patch('PIL.Image.open') as mock_open:
+	with patch('PIL.Image.open') as mock_open, \
+		 patch('dvhelper.ImageProcessor.find_poster_left', return_value=1000 - 379) as mock_find_poster_left:
 		mock_image = MagicMock()
 		mock_image.size = (1000, 800)
+		mock_image.mode = 'RGB'
 		mock_image.crop.return_value = mock_image
 		mock_open.return_value.__enter__.return_value = mock_image
 
 		scraper.crop_image(src_file, dest_file)
 
+		mock_find_poster_left.assert_called_once_with(mock_image)
+
 		expected_left = 1000 - 379
 		expected_right = 1000
 		mock_image.crop.assert_called_with((expected_left, 0, expected_right, 800))
 
-		mock_image.save.assert_any_call(src_file, format='JPEG')
-		mock_image.save.assert_any_call(dest_file, format='JPEG')
+		# 只保存裁剪后的图片，源图片保持原始内容
+		mock_image.save.assert_called_once_with(dest_file, format='JPEG')
+
+def test_scraper_crop_image_from_memory(crop_image):
+	from PIL import Image
+
+	scraper = MovieScraper()
+	dest_file = crop_image['dest_file']
+	content = generate_cover()
+
+	scraper.crop_image(content, dest_file)
+
+	with Image.open(dest_file) as poster:
+		assert poster.size == (379, 538)
+		assert poster.format == 'JPEG'
+
+def test_scraper_fetch_media_keeps_original_cover(temp_dir):
+	content = generate_cover()
+
+	with patch('dvhelper.requests') as mock_requests:
+		mock_response = mock_requests.Session.return_value.get.return_value
+		mock_response.headers = {'content-length': str(len(content))}
+		mock_response.iter_content.return_value = [content[i:i + 8192] for i in range(0, len(content), 8192)]
+
+		from dvhelper import config
+		assert MovieScraper().fetch_media(temp_dir, config.fanart_image, 'https://example.com/cover.jpg', crop=True)
+
+	assert (temp_dir / config.fanart_image).read_bytes() == content
+	assert (temp_dir / config.poster_image).exists()
+
+#region response cache tests
+def test_scraper_fetch_data_cache_hit(temp_dir):
+
+	scraper = MovieScraper()
+	scraper.cache = ResponseCache(temp_dir / 'cache.db', ttl=60, max_size=1024)
+	scraper.cache.put('https://example.com', '<html>缓存</html>'.encode('utf-8'))
 
-		assert mock_image.save.call_count == 2
+	with patch('dvhelper.requests') as mock_requests:
+		assert scraper.fetch_data('https://example.com') == '<html>缓存</html>'
+		mock_requests.Session.return_value.get.assert_not_called()
+
+	assert scraper.cache.hits == 1
+	assert scraper.cache.misses == 0
+	scraper.cache.close()
+
+def test_scraper_fetch_data_cache_miss(temp_dir):
+
+	scraper = MovieScraper()
+	scraper.cache = ResponseCache(temp_dir / 'cache.db', ttl=60, max_size=1024)
+
+	with patch('dvhelper.requests') as mock_requests:
+		mock_response = MagicMock()
+		mock_response.status_code = 200
+		mock_response.text = '<html>A</html>'
+		mock_response.content = b'<html>A</html>'
+		mock_response.headers = {'ETag': '"abc"'}
+		mock_requests.Session.return_value.get.return_value = mock_response
+
+		assert scraper.fetch_data('https://example.com') == '<html>A</html>'
+
+	assert scraper.cache.misses == 1
+	assert scraper.cache.get('https://example.com')['etag'] == '"abc"'
+	scraper.cache.close()
+
+def test_scraper_fetch_data_sign_in_not_cached(temp_dir):
+	scraper = MovieScraper()
+	scraper.cache = ResponseCache(temp_dir / 'cache.db', ttl=60, max_size=1024)
+
+	with patch('dvhelper.requests') as mock_requests:
+		mock_response = MagicMock()
+		mock_response.status_code = 200
+		mock_response.text = '<html>登录</html>'
+		mock_response.url = 'https://example.com/zh-CN/sign_in'
+		mock_response.headers = {}
+		mock_requests.Session.return_value.get.return_value = mock_response
+
+		assert scraper.fetch_data('https://example.com/movie/123') == '<html>登录</html>'
+
+	assert scraper.cache.get('https://example.com/movie/123') is None
+	scraper.cache.close()
+
+def test_scraper_fetch_data_cache_revalidate(temp_dir):
+
+	scraper = MovieScraper()
+	scraper.cache = ResponseCache(temp_dir / 'cache.db', ttl=60, max_size=1024, refresh=True)
+	scraper.cache.put('https://example.com', b'<html>A</html>', etag='"abc"', last_modified='Mon, 01 Jan 2024 00:00:00 GMT')
+
+	with patch('dvhelper.requests') as mock_requests:
+		mock_response = MagicMock()
+		mock_response.status_code = 304
+		mock_get = mock_requests.Session.return_value.get
+		mock_get.return_value = mock_response
+
+		assert scraper.fetch_data('https://example.com') == '<html>A</html>'
+
+		headers = mock_get.call_args[1]['headers']
+		assert headers['If-None-Match'] == '"abc"'
+		assert headers['If-Modified-Since'] == 'Mon, 01 Jan 2024 00:00:00 GMT'
+		assert 'If-None-Match' not in MovieScraper.REQUESTS_HEADERS
+
+	assert scraper.cache.hits == 1
+	assert scraper.cache.revalidated == 1
+	scraper.cache.close()
+#endregion
@@ -0,0 +1,140 @@
+import os
+import sys
+import socket
+import threading
+import pytest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dvhelper import MovieServer
+
+@pytest.fixture
+def start_server(dv_helper):
+	"""在后台线程中运行服务，处理影片的方法替换为按关键词返回结果的模拟函数"""
+	servers = []
+
+	def start(jobs: int=2, token: str=None):
+		dv_helper.process_movie = MagicMock(side_effect=lambda index, total, item, **options:
+			'failed' if 'BAD' in str(item) else 'done')
+		server = MovieServer(dv_helper, ('127.0.0.1', 0), jobs, token)
+		thread = threading.Thread(target=server.serve_forever, daemon=True)
+		thread.start()
+		servers.append((server, thread))
+
+		return server
+
+	yield start
+
+	for server, thread in servers:
+		server.shutdown()
+		server.close()
+		thread.join(timeout=5)
+
+def test_submit_keywords(start_server):
+	server = start_server()
+
+	results = list(MovieServer.submit(server.address, 'ABC-123, BAD-456,DEF-789', gallery=True))
+
+	assert results == [
+		{'item': 'ABC-123', 'status': 'done'},
+		{'item': 'BAD-456', 'status': 'failed'},
+		{'item': 'DEF-789', 'status': 'done'},
+		{'count': 3, 'failed': 1},
+	]
+
+	for call in server.dv_helper.process_movie.call_args_list:
+		assert call.kwargs == {'gallery': True, 'dir_mode': False, 'root_dir': None, 'refresh_metadata': False}
+
+def test_submit_directory(start_server, temp_dir):
+	movie = Path(temp_dir) / 'ABC-123.mp4'
+	movie.touch()
+	(Path(temp_dir) / 'readme.txt').touch()
+
+	server = start_server()
+	results = list(MovieServer.submit(server.address, str(temp_dir)))
+
+	assert results == [{'item': str(movie), 'status': 'done'}, {'count': 1, 'failed': 0}]
+
+	args, kwargs = server.dv_helper.process_movie.call_args
+	assert args[2] == movie
+	assert kwargs['dir_mode'] is True
+	assert kwargs['root_dir'] == Path(temp_dir)
+
+def test_submit_processing_error(start_server):
+	server = start_server()
+
+	def process_movie(index, total, item, **options):
+		if item == 'ERR-001':
+			raise FileNotFoundError('moved by another task')
+		return 'done'
+
+	server.dv_helper.process_movie.side_effect = process_movie
+
+	# 处理时出现异常的影片记为失败，同一任务中的其它影片和汇总照常返回
+	with patch('dvhelper.logger') as mock_logger:
+		results = list(MovieServer.submit(server.address, 'ERR-001,ABC-123'))
+
+	assert results == [
+		{'item': 'ERR-001', 'status': 'failed', 'error': 'moved by another task'},
+		{'item': 'ABC-123', 'status': 'done'},
+		{'count': 2, 'failed': 1},
+	]
+	mock_logger.error.assert_called_once()
+
+def test_submit_scan_error(start_server, temp_dir):
+	server = start_server()
+	server.dv_helper.iter_video_files = MagicMock(side_effect=PermissionError('permission denied'))
+
+	with patch('dvhelper.logger'):
+		results = list(MovieServer.submit(server.address, str(temp_dir)))
+
+	assert results == [{'error': 'permission denied'}]
+
+def test_jobs_share_counter(start_server):
+	server = start_server()
+
+	list(MovieServer.submit(server.address, 'ABC-123'))
+	list(MovieServer.submit(server.address, 'DEF-456'))
+
+	indexes = [call.args[0] for call in server.dv_helper.process_movie.call_args_list]
+	assert indexes == [1, 2]
+
+def test_invalid_request(start_server):
+	server = start_server()
+
+	with socket.create_connection(server.address) as sock:
+		sock.sendall(b'not json\n')
+		response = sock.makefile('rb').readline()
+
+	assert b'error' in response
+
+def test_submit_with_token(start_server, temp_dir):
+	token_file = Path(temp_dir) / 'server.token'
+	token = MovieServer.create_token(token_file)
+	server = start_server(token=token)
+
+	assert MovieServer.read_token(token_file) == token
+	assert MovieServer.read_token(Path(temp_dir) / 'missing.token') is None
+
+	if os.name == 'posix':
+		assert token_file.stat().st_mode & 0o777 == 0o600
+
+	assert list(MovieServer.submit(server.address, 'ABC-123', token=token)) == [
+		{'item': 'ABC-123', 'status': 'done'},
+		{'count': 1, 'failed': 0},
+	]
+
+	# 没有令牌或令牌错误的请求不会被处理
+	assert list(MovieServer.submit(server.address, 'DEF-456')) == [{'error': 'invalid token'}]
+	assert list(MovieServer.submit(server.address, 'DEF-456', token='wrong')) == [{'error': 'invalid token'}]
+	assert server.dv_helper.process_movie.call_count == 1
+
+def test_submit_without_server():
+	with socket.socket() as sock:
+		sock.bind(('127.0.0.1', 0))
+		address = sock.getsockname()
+
+	with pytest.raises(OSError):
+		list(MovieServer.submit(address, 'ABC-123', timeout=1))
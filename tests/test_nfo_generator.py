@@ -99,3 +99,30 @@ def test_nfo_generator_save(nfo_save_file, movie_info):
 
 	premiered_node = root.getElementsByTagName('premiered')[0]
 	assert premiered_node.firstChild.nodeValue == movie_info.premiered
+
+def test_nfo_generator_save_escapes_text(nfo_save_file, movie_info):
+	movie_info.title = 'Tom & Jerry <Special>'
+	movie_info.fanart_url = 'https://example.com/cover.jpg?a=1&b=2'
+	NFOGenerator(movie_info).save(nfo_save_file)
+
+	xml_content = nfo_save_file.read_bytes()
+	assert xml_content.startswith(b"<?xml version='1.0' encoding='utf-8' standalone='yes'?>\n<movie>\n    <title>")
+	assert b'Tom &amp; Jerry &lt;Special&gt;' in xml_content
+
+	root = minidom.parseString(xml_content).documentElement
+	assert root.getElementsByTagName('title')[0].firstChild.nodeValue == movie_info.title
+	assert root.getElementsByTagName('thumb')[0].firstChild.nodeValue == movie_info.fanart_url
+
+def test_nfo_generator_save_skips_unchanged(nfo_save_file, movie_info):
+	assert NFOGenerator(movie_info).save(nfo_save_file) is True
+	os.utime(nfo_save_file, (0, 0))
+
+	# 内容相同时不写入文件，修改时间保持不变
+	assert NFOGenerator(movie_info).save(nfo_save_file) is False
+	assert nfo_save_file.stat().st_mtime == 0
+
+	movie_info.title = 'New Title'
+	assert NFOGenerator(movie_info).save(nfo_save_file) is True
+	assert nfo_save_file.stat().st_mtime != 0
+	assert b'<title>New Title</title>' in nfo_save_file.read_bytes()
+	assert [path.name for path in nfo_save_file.parent.iterdir()] == [nfo_save_file.name]
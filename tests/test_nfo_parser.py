@@ -0,0 +1,43 @@
+"""测试 NFOParser 类的功能"""
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dvhelper import NFOGenerator, NFOParser
+
+
+def test_nfo_parser_round_trip(nfo_save_file, movie_info):
+	NFOGenerator(movie_info).save(nfo_save_file)
+	parsed = NFOParser.parse(nfo_save_file)
+
+	for key in ('number', 'title', 'year', 'runtime', 'mpaa', 'country', 'director', 'studio',
+				'publisher', 'premiered', 'tags', 'actresses', 'fanart_url', 'trailer_url'):
+		assert getattr(parsed, key) == getattr(movie_info, key)
+
+	# 从NFO文件还原的影片信息重新生成的内容不变，不会改写文件
+	assert NFOGenerator(parsed).save(nfo_save_file) is False
+
+def test_nfo_parser_legacy_ampersand(nfo_save_file):
+	# 旧版本生成的NFO文件没有转义 & 字符
+	nfo_save_file.write_bytes(
+		b"<?xml version='1.0' encoding='utf-8' standalone='yes'?>\n"
+		b'<movie>\n    <title>Tom & Jerry &amp; Friends</title>\n'
+		b'    <uniqueid type="num" default="true">ABC-123</uniqueid>\n'
+		b'    <fanart>\n        <thumb>https://example.com/cover.jpg?a=1&b=2</thumb>\n    </fanart>\n</movie>\n'
+	)
+	parsed = NFOParser.parse(nfo_save_file)
+
+	assert parsed.title == 'Tom & Jerry & Friends'
+	assert parsed.fanart_url == 'https://example.com/cover.jpg?a=1&b=2'
+	assert parsed.actresses == []
+
+def test_nfo_parser_invalid(nfo_save_file):
+	assert NFOParser.parse(nfo_save_file) is None
+
+	nfo_save_file.write_bytes(b'<movie><title>Test</title>')
+	assert NFOParser.parse(nfo_save_file) is None
+
+	# 缺少影片编号时无法确定影片目录
+	nfo_save_file.write_bytes(b'<movie><title>Test</title></movie>')
+	assert NFOParser.parse(nfo_save_file) is None
@@ -0,0 +1,135 @@
+"""测试 RateLimiter 类的功能"""
+import os
+import sys
+import asyncio
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dvhelper import RateLimiter
+
+
+URL = 'https://example.com/search?q=ABC-123'
+
+def test_rate_limiter_burst():
+	limiter = RateLimiter(rate=10, burst=2)
+
+	assert limiter.reserve(URL) == 0
+	assert limiter.reserve(URL) == 0
+	assert limiter.reserve(URL) == pytest.approx(0.1, abs=0.01)
+	assert limiter.reserve(URL) == pytest.approx(0.2, abs=0.01)
+
+	# 不同主机使用独立的令牌桶
+	assert limiter.reserve('https://cdn.example.com/image.jpg') == 0
+
+	stats = limiter.stats()['example.com']
+	assert stats['requests'] == 4
+	assert stats['queued'] == 2
+	assert stats['throttled'] == pytest.approx(0.3, abs=0.02)
+
+def test_rate_limiter_disabled():
+	limiter = RateLimiter(rate=0, burst=1)
+
+	for _ in range(10):
+		assert limiter.reserve(URL) == 0
+
+	# 不限速时不调整速率，但仍然遵守服务器返回的 Retry-After
+	with patch('dvhelper.logger') as mock_logger:
+		limiter.feedback(URL, 429)
+		mock_logger.warning.assert_not_called()
+
+		limiter.feedback(URL, 429, '60')
+		mock_logger.warning.assert_called_once()
+
+	assert limiter.reserve(URL) == pytest.approx(60, abs=0.05)
+	assert limiter.stats()['example.com']['limited'] == 1
+
+def test_rate_limiter_throttle_and_recover():
+	limiter = RateLimiter(rate=4, burst=4)
+
+	with patch('dvhelper.logger') as mock_logger:
+		limiter.feedback(URL, 429, '2')
+		mock_logger.warning.assert_called_once()
+
+	stats = limiter.stats()['example.com']
+	assert stats['rate'] == 2
+	assert stats['limited'] == 1
+	assert limiter.reserve(URL) == pytest.approx(2, abs=0.05)
+
+	with patch('dvhelper.logger'):
+		limiter.feedback(URL, 503)
+
+	assert limiter.stats()['example.com']['rate'] == 1
+
+	for _ in range(100):
+		limiter.feedback(URL, 200)
+
+	assert limiter.stats()['example.com']['rate'] == 4
+
+def test_rate_limiter_min_rate():
+	limiter = RateLimiter(rate=1, burst=1, min_rate=0.5)
+
+	with patch('dvhelper.logger'):
+		for _ in range(5):
+			limiter.feedback(URL, 429, '0')
+
+	assert limiter.stats()['example.com']['rate'] == 0.5
+
+@pytest.mark.parametrize('value, expected', [
+	('120', 120),
+	('-5', 0),
+	(None, None),
+	('soon', None),
+])
+def test_rate_limiter_parse_retry_after(value, expected):
+	assert RateLimiter.parse_retry_after(value) == expected
+
+def test_rate_limiter_parse_retry_after_date():
+	retry_time = datetime.now(timezone.utc) + timedelta(seconds=30)
+
+	assert RateLimiter.parse_retry_after(format_datetime(retry_time, usegmt=True)) == pytest.approx(30, abs=2)
+
+def test_rate_limiter_acquire():
+	limiter = RateLimiter(rate=10, burst=1)
+
+	with patch('dvhelper.time.sleep') as mock_sleep:
+		limiter.acquire(URL)
+		mock_sleep.assert_not_called()
+
+		limiter.acquire(URL)
+		mock_sleep.assert_called_once()
+		assert mock_sleep.call_args[0][0] == pytest.approx(0.1, abs=0.01)
+
+	assert limiter.stats()['example.com']['queued'] == 0
+
+def test_rate_limiter_acquire_async():
+	limiter = RateLimiter(rate=50, burst=1)
+
+	async def acquire_all():
+		await asyncio.gather(*(limiter.acquire_async(URL) for _ in range(4)))
+
+	asyncio.run(acquire_all())
+
+	stats = limiter.stats()['example.com']
+	assert stats['requests'] == 4
+	assert stats['queued'] == 0
+	assert stats['throttled'] == pytest.approx(0.02 + 0.04 + 0.06, abs=0.01)
+
+def test_rate_limiter_exempt_hosts():
+	limiter = RateLimiter(rate=10, burst=1, sites=['https://example.com'])
+	media_url = 'https://cdn.example.com/image.jpg'
+
+	assert limiter.reserve(URL) == 0
+	assert limiter.reserve(URL) == pytest.approx(0.1, abs=0.01)
+
+	# 不在列表中的主机不主动限速，但仍遵守服务器返回的 Retry-After
+	for _ in range(5):
+		assert limiter.reserve(media_url) == 0
+
+	with patch('dvhelper.logger'):
+		limiter.feedback(media_url, 429, '2')
+
+	assert limiter.reserve(media_url) == pytest.approx(2, abs=0.05)
@@ -0,0 +1,75 @@
+"""测试 ResponseCache 类的功能"""
+import os
+import sys
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dvhelper import ResponseCache
+
+
+def test_response_cache_put_and_get(temp_dir):
+	cache = ResponseCache(temp_dir / 'cache.db', ttl=60, max_size=1024)
+	cache.put('https://example.com/a', b'<html>A</html>', etag='"abc"', last_modified='Mon, 01 Jan 2024 00:00:00 GMT')
+
+	entry = cache.get('https://example.com/a')
+
+	assert entry['content'] == b'<html>A</html>'
+	assert entry['etag'] == '"abc"'
+	assert entry['last_modified'] == 'Mon, 01 Jan 2024 00:00:00 GMT'
+	assert entry['fresh'] is True
+	assert cache.get('https://example.com/b') is None
+
+	cache.close()
+
+def test_response_cache_persistent(temp_dir):
+	cache = ResponseCache(temp_dir / 'cache.db', ttl=60, max_size=1024)
+	cache.put('https://example.com/a', b'A')
+	cache.close()
+
+	cache = ResponseCache(temp_dir / 'cache.db', ttl=60, max_size=1024)
+	assert cache.get('https://example.com/a')['content'] == b'A'
+	cache.close()
+
+def test_response_cache_expired_and_touch(temp_dir):
+	cache = ResponseCache(temp_dir / 'cache.db', ttl=60, max_size=1024)
+
+	with patch('dvhelper.time.time', return_value=1000):
+		cache.put('https://example.com/a', b'A', etag='"abc"')
+
+	with patch('dvhelper.time.time', return_value=1100):
+		assert cache.get('https://example.com/a')['fresh'] is False
+		cache.touch('https://example.com/a')
+		assert cache.get('https://example.com/a')['fresh'] is True
+
+	cache.close()
+
+def test_response_cache_refresh(temp_dir):
+	cache = ResponseCache(temp_dir / 'cache.db', ttl=60, max_size=1024, refresh=True)
+	cache.put('https://example.com/a', b'A')
+
+	assert cache.get('https://example.com/a')['fresh'] is False
+	cache.close()
+
+def test_response_cache_discard(temp_dir):
+	cache = ResponseCache(temp_dir / 'cache.db', ttl=60, max_size=1024)
+	cache.put('https://example.com/a', b'A')
+	cache.discard('https://example.com/a')
+	cache.discard('https://example.com/b')
+
+	assert cache.get('https://example.com/a') is None
+	cache.close()
+
+def test_response_cache_lru_eviction(temp_dir):
+	cache = ResponseCache(temp_dir / 'cache.db', ttl=60, max_size=10)
+
+	with patch('dvhelper.time.time', side_effect=[1, 2, 3, 4]):
+		cache.put('https://example.com/a', b'AAAA')
+		cache.put('https://example.com/b', b'BBBB')
+		cache.get('https://example.com/a')
+		cache.put('https://example.com/c', b'CCCC')
+
+	assert cache.get('https://example.com/a') is not None
+	assert cache.get('https://example.com/b') is None
+	assert cache.get('https://example.com/c') is not None
+	cache.close()
@@ -0,0 +1,83 @@
+"""测试 ResumeJournal 类的功能"""
+import os
+import sys
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dvhelper import ResumeJournal
+
+
+def test_resume_journal_record_and_replay(temp_dir):
+	journal_file = temp_dir / 'journal.jsonl'
+
+	journal = ResumeJournal(journal_file)
+	journal.record('ABC-123', 'search', {'detail_url': 'https://example.com/movie/123'})
+	journal.record('ABC-123', 'cover')
+	journal.close()
+
+	journal = ResumeJournal(journal_file, resume=True)
+
+	assert len(journal) == 1
+	assert journal.has('ABC-123', 'search')
+	assert journal.has('ABC-123', 'cover')
+	assert not journal.has('ABC-123', 'nfo')
+	assert journal.get('ABC-123', 'search') == {'detail_url': 'https://example.com/movie/123'}
+	assert journal.get('XYZ-456', 'search') is None
+
+	journal.record('ABC-123', 'nfo', {'status': 'done'})
+	assert not journal.has('ABC-123', 'nfo')
+	journal.close()
+
+	assert ResumeJournal(journal_file, resume=True).has('ABC-123', 'nfo')
+
+def test_resume_journal_ignore_incomplete_record(temp_dir):
+	journal_file = temp_dir / 'journal.jsonl'
+	journal_file.write_text(
+		'{"item": "ABC-123", "step": "search", "data": null}\n{"item": "ABC-123", "st',
+		encoding='utf-8'
+	)
+
+	journal = ResumeJournal(journal_file, resume=True)
+
+	assert journal.has('ABC-123', 'search')
+	assert len(journal) == 1
+	journal.close()
+
+def test_resume_journal_truncate_incomplete_record(temp_dir):
+	journal_file = temp_dir / 'journal.jsonl'
+	journal_file.write_text(
+		'{"item": "ABC-123", "step": "search", "data": null}\n{"item": "ABC-123", "st',
+		encoding='utf-8'
+	)
+
+	journal = ResumeJournal(journal_file, resume=True)
+	journal.record('ABC-123', 'cover')
+	journal.close()
+
+	journal = ResumeJournal(journal_file, resume=True)
+
+	assert journal.has('ABC-123', 'search')
+	assert journal.has('ABC-123', 'cover')
+	journal.close()
+
+def test_resume_journal_without_resume(temp_dir):
+	journal_file = temp_dir / 'journal.jsonl'
+	journal_file.write_text('{"item": "ABC-123", "step": "search", "data": null}\n', encoding='utf-8')
+
+	with patch('dvhelper.logger') as mock_logger:
+		journal = ResumeJournal(journal_file)
+
+		mock_logger.warning.assert_called_once()
+
+	assert len(journal) == 0
+	assert journal_file.read_text(encoding='utf-8') == ''
+	journal.close()
+
+def test_resume_journal_in_memory():
+	journal = ResumeJournal()
+	journal.record('ABC-123', 'search')
+
+	assert len(journal) == 0
+	assert not journal.has('ABC-123', 'search')
+	journal.close()
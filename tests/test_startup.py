@@ -0,0 +1,69 @@
+"""测试命令行启动路径的导入开销
+
+启动时不应导入只有处理影片时才用到的重量级模块
+"""
+import os
+import sys
+import subprocess
+import pytest
+from pathlib import Path
+
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+DEFERRED_MODULES = (
+	'asyncio',
+	'concurrent.futures',
+	'json',
+	'sqlite3',
+	'lxml.etree',
+	'requests',
+	'tqdm',
+	'aiohttp',
+	'colorama',
+)
+
+def import_time(*args: str):
+	"""
+	在子进程中以 -X importtime 运行 Python，返回导入的模块及其累计耗时
+
+	Returns:
+		dict[str, int]: 模块名到累计导入耗时（微秒）的映射
+	"""
+	result = subprocess.run(
+		[sys.executable, '-X', 'importtime', *args],
+		cwd=PROJECT_DIR, capture_output=True, text=True, encoding='utf-8',
+		env={**os.environ, 'PYTHONIOENCODING': 'utf-8'}
+	)
+	assert result.returncode == 0, result.stderr
+
+	modules = {}
+	for line in result.stderr.splitlines():
+		if not line.startswith('import time:') or 'cumulative' in line:
+			continue
+		_, cumulative, name = line[len('import time:'):].split('|')
+		modules[name.strip()] = int(cumulative)
+
+	return modules
+
+
+@pytest.mark.parametrize('args', [
+	('-c', 'import dvhelper'),
+	('dvhelper.py', '--version'),
+])
+def test_startup_defers_heavy_imports(args):
+	modules = import_time(*args)
+
+	assert [module for module in DEFERRED_MODULES if module in modules] == []
+
+def test_import_defers_help_formatter():
+	modules = import_time('-c', 'import dvhelper')
+
+	assert 'dvhelper' in modules
+	assert 'rich_argparse' not in modules
+
+def test_lazy_import_loads_deferred_modules():
+	modules = import_time('-c', 'import dvhelper; dvhelper.lazy_import()')
+
+	for module in ('asyncio', 'json', 'sqlite3', 'lxml.etree', 'requests', 'tqdm'):
+		assert module in modules